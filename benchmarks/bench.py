@@ -0,0 +1,272 @@
+# bench.py
+# Python ≥ 3.8  |  Linux
+#
+# Benchmark do GeProp: inicialização da janela, latência de uma proposta
+# para os três templates, vazão do lote (10/100/1000 propostas) e
+# numeração com pastas grandes. O Excel é trocado pelo xlwings_simulado
+# (latência fixa por chamada COM), então roda em qualquer máquina Linux;
+# o motor Python é medido de verdade.
+#
+#   python benchmarks/bench.py                    mede e compara com baseline.json
+#   python benchmarks/bench.py --rapido           sem o lote de 1000 e a pasta de 50 mil
+#   python benchmarks/bench.py --salvar-baseline  grava o resultado como nova referência
+#
+# O resultado vai para um JSON (--saida). Sai com código 1 se alguma
+# métrica piorar mais que --tolerancia em relação à referência.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PASTA_BENCH = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(PASTA_BENCH)
+SRC = os.path.join(RAIZ, "src")
+BASELINE = os.path.join(PASTA_BENCH, "baseline.json")
+
+sys.path.insert(0, SRC)
+sys.path.insert(0, PASTA_BENCH)
+
+import xlwings_simulado  # noqa: E402
+
+sys.modules["xlwings"] = xlwings_simulado
+# Cada proposta é renderizada de verdade (sem o cache de PDFs)
+os.environ["GEPROP_CACHE_MB"] = "0"
+
+DADOS_EXEMPLO = {
+    "Data": "01/02/2025",
+    "N° da Proposta": "1",
+    "Nome do Cliente": "CLIENTE DE TESTE",
+    "Telefone": "37 99999-0000",
+    "Logradouro": "RUA",
+    "Endereço": "DAS FLORES",
+    "Cidade": "NOVA SERRANA",
+    "Estado": "MG",
+    "Consultor": "KLEYTON DE PÁDUA",
+    "Quantidade de Painéis": "12",
+    "Potência dos Painéis (W)": "550",
+    "Quantidade de Inversores": "1",
+    "Potência Inversor 1 (W)": "5000 LV",
+    "Estrutura Para": "TELHADO METÁLICO",
+    "Produção Média Mensal": "850",
+    "Preço": "18500.00",
+    "Quantidade de Painéis 2": "8",
+    "Potência dos Painéis (W) 2": "550",
+    "Quantidade de Inversores 2": "1",
+    "Potência Inversor 1 (W) 2": "3000 LV",
+    "Estrutura Para 2": "SOLO",
+    "Produção Média Mensal 2": "560",
+    "Preço 2": "13200.00",
+    "Preço dos Equipamentos": "15000.00",
+    "Preço da Mão de Obra": "3500.00",
+    "Preço Total": "18500.00",
+}
+
+CODIGO_INICIALIZACAO = r"""
+import json, sys, time
+inicio = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+import proposta_gui
+importado = time.perf_counter()
+app = QApplication(sys.argv)
+janela = proposta_gui.PropostaWindow()
+pronto = time.perf_counter()
+print(json.dumps({"importacoes": importado - inicio, "janela": pronto - importado,
+                  "modulos": len(sys.modules)}))
+"""
+
+
+def resumo(tempos):
+    tempos = sorted(tempos)
+    p95 = tempos[min(len(tempos) - 1, int(round(0.95 * (len(tempos) - 1))))]
+    return statistics.median(tempos) * 1000, p95 * 1000
+
+
+def bench_inicializacao(repeticoes, pasta):
+    try:
+        import PyQt6  # noqa: F401
+    except ImportError:
+        print("  PyQt6 ausente: inicialização não medida", file=sys.stderr)
+        return {}
+    ambiente = dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONPATH=SRC)
+    medidas = []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, "-c", CODIGO_INICIALIZACAO], cwd=pasta, env=ambiente,
+                               capture_output=True, text=True, check=True)
+        medidas.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+    return {
+        "inicializacao.importacoes_ms": statistics.median(m["importacoes"] for m in medidas) * 1000,
+        "inicializacao.janela_ms": statistics.median(m["janela"] for m in medidas) * 1000,
+        "inicializacao.modulos": medidas[-1]["modulos"],
+    }
+
+
+def bench_proposta(repeticoes, pasta):
+    from renderizador import TIPOS_PROPOSTA, aquecer, gerar_pdf
+
+    resultados = {}
+    for motor, vezes in (("excel", repeticoes * 4), ("python", repeticoes)):
+        aquecer(motor)
+        for tipo in TIPOS_PROPOSTA:
+            n = tipo.split("-")[0]
+            destino = os.path.join(pasta, f"proposta_{n}_{motor}.pdf")
+            gerar_pdf(tipo, DADOS_EXEMPLO, destino, numero_end="100", motor=motor)   # aquece o template
+            xlwings_simulado.zerar()
+            tempos = []
+            for _ in range(vezes):
+                inicio = time.perf_counter()
+                gerar_pdf(tipo, DADOS_EXEMPLO, destino, numero_end="100", motor=motor)
+                tempos.append(time.perf_counter() - inicio)
+            mediana, p95 = resumo(tempos)
+            resultados[f"proposta.{n}.{motor}.mediana_ms"] = mediana
+            resultados[f"proposta.{n}.{motor}.p95_ms"] = p95
+            if motor == "excel":
+                resultados[f"proposta.{n}.excel.chamadas_com"] = sum(xlwings_simulado.CHAMADAS.values()) / vezes
+                for etapa, segundos in sorted(xlwings_simulado.ETAPAS.items()):
+                    resultados[f"proposta.{n}.excel.etapa.{etapa}_ms"] = segundos / vezes * 1000
+    return resultados
+
+
+def bench_lote(tamanhos, processos, pasta):
+    from lote import gerar_lote
+
+    resultados = {}
+    for tamanho in tamanhos:
+        saida = os.path.join(pasta, f"lote_{tamanho}")
+        linhas = [dict(DADOS_EXEMPLO, **{"N° da Proposta": "", "Nome do Cliente": f"CLIENTE {i}",
+                                         "Tipo de Proposta": str(i % 3 + 1)})
+                  for i in range(tamanho)]
+        inicio = time.perf_counter()
+        relatorio = gerar_lote(linhas, saida=saida, processos=processos, motor="excel")
+        segundos = time.perf_counter() - inicio
+        falhas = [r for r in relatorio if r["status"] != "ok"]
+        if falhas:
+            raise RuntimeError(f"lote de {tamanho}: {len(falhas)} falhas, ex.: {falhas[0]['erro']}")
+        resultados[f"lote.{tamanho}.total_ms"] = segundos * 1000
+        resultados[f"lote.{tamanho}.propostas_por_s"] = tamanho / segundos
+    return resultados
+
+
+def bench_numeracao(tamanhos, pasta):
+    from numeracao import alocar, consultar_proximo, maior_numero_na_pasta
+
+    resultados = {}
+    for tamanho in tamanhos:
+        saida = os.path.join(pasta, f"numeracao_{tamanho}")
+        os.makedirs(saida)
+        for i in range(1, tamanho + 1):
+            open(os.path.join(saida, f"{i}PROPOSTA CLIENTE {i}.pdf"), "wb").close()
+
+        inicio = time.perf_counter()
+        maior_numero_na_pasta(saida)        # o que get_next_proposal_number fazia antes
+        resultados[f"numeracao.{tamanho}.varredura_ms"] = (time.perf_counter() - inicio) * 1000
+
+        inicio = time.perf_counter()
+        consultar_proximo(saida)            # primeira vez: cria a sequência a partir da pasta
+        resultados[f"numeracao.{tamanho}.primeira_consulta_ms"] = (time.perf_counter() - inicio) * 1000
+
+        for nome, funcao in (("consulta", consultar_proximo), ("alocacao", alocar)):
+            tempos = []
+            for _ in range(20):
+                inicio = time.perf_counter()
+                funcao(saida)
+                tempos.append(time.perf_counter() - inicio)
+            resultados[f"numeracao.{tamanho}.{nome}_ms"] = resumo(tempos)[0]
+    return resultados
+
+
+def comparar(resultados, referencia, tolerancia, folga_ms=2.0):
+    # Devolve a lista de regressões (métrica, referência, atual)
+    regressoes = []
+    for metrica, antes in referencia.items():
+        agora = resultados.get(metrica)
+        if agora is None or metrica.endswith("p95_ms"):
+            # p95 com poucas repetições varia demais para servir de trava
+            continue
+        if metrica.endswith("_por_s"):
+            piorou = agora < antes * (1 - tolerancia)
+        elif metrica.endswith("_ms"):
+            piorou = agora > antes * (1 + tolerancia) and agora - antes > folga_ms
+        elif metrica.endswith("chamadas_com"):
+            piorou = agora > antes
+        else:
+            continue
+        if piorou:
+            regressoes.append((metrica, antes, agora))
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do GeProp.")
+    parser.add_argument("--saida", default=None, help="JSON com o resultado (padrão: só na tela)")
+    parser.add_argument("--baseline", default=BASELINE, help="JSON de referência")
+    parser.add_argument("--salvar-baseline", action="store_true", help="grava o resultado como referência")
+    parser.add_argument("--tolerancia", type=float, default=0.30, help="piora aceita (0.30 = 30%%)")
+    parser.add_argument("--rapido", action="store_true", help="sem o lote de 1000 e a pasta de 50 mil")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--latencia-com", type=float, default=xlwings_simulado.LATENCIA_COM * 1000,
+                        help="ms por chamada COM no Excel simulado")
+    args = parser.parse_args(argv)
+
+    xlwings_simulado.LATENCIA_COM = args.latencia_com / 1000
+    lotes = (10, 100) if args.rapido else (10, 100, 1000)
+    pastas = (1000, 10000) if args.rapido else (1000, 10000, 50000)
+
+    resultados = {}
+    with tempfile.TemporaryDirectory(prefix="geprop-bench-") as pasta:
+        # OUTPUT_DIR ("propostas") é relativo: tudo fica na pasta temporária
+        os.chdir(pasta)
+        for nome, etapa in (
+            ("inicialização", lambda: bench_inicializacao(max(1, args.repeticoes // 2), pasta)),
+            ("proposta", lambda: bench_proposta(args.repeticoes, pasta)),
+            ("lote", lambda: bench_lote(lotes, args.processos, pasta)),
+            ("numeração", lambda: bench_numeracao(pastas, pasta)),
+        ):
+            inicio = time.perf_counter()
+            resultados.update(etapa())
+            print(f"  {nome}: {time.perf_counter() - inicio:.1f}s", file=sys.stderr)
+        os.chdir(RAIZ)
+
+    documento = {
+        "maquina": {
+            "python": platform.python_version(),
+            "sistema": platform.platform(),
+            "cpus": os.cpu_count(),
+            "latencia_com_ms": args.latencia_com,
+        },
+        "resultados": {k: round(v, 3) for k, v in sorted(resultados.items())},
+    }
+    texto = json.dumps(documento, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+    if args.salvar_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+        print(f"Referência gravada em {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Sem referência para comparar (use --salvar-baseline)", file=sys.stderr)
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        referencia = json.load(f)["resultados"]
+    regressoes = comparar(documento["resultados"], referencia, args.tolerancia)
+    for metrica, antes, agora in regressoes:
+        print(f"✖ {metrica}: {antes:.3f} -> {agora:.3f}", file=sys.stderr)
+    if not regressoes:
+        print("✔ Nenhuma regressão em relação à referência", file=sys.stderr)
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# xlwings_simulado.py
+# Substituto do xlwings para medir o caminho do Excel no Linux.
+#
+# Imita só a parte da API que o GeProp usa (App, books.open, sheets[0],
+# range(...).value/.formula, to_pdf, close, quit). Cada chamada "COM"
+# espera LATENCIA_COM segundos e é contada; o tempo gasto em cada etapa
+# (abrir o Excel, abrir o livro, preencher, exportar, fechar) fica em ETAPAS.
+
+import time
+from collections import defaultdict
+
+LATENCIA_COM = 0.002
+LATENCIA_APP = 0.0      # abrir/fechar o Excel
+LATENCIA_PDF = 0.0      # exportar o PDF
+
+ETAPAS = defaultdict(float)
+CHAMADAS = defaultdict(int)
+
+PDF_MINIMO = (
+    b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+    b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+    b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 595 842]>>endobj\n"
+    b"trailer<</Root 1 0 R>>\n%%EOF\n"
+)
+
+
+def zerar():
+    ETAPAS.clear()
+    CHAMADAS.clear()
+
+
+def _com(etapa, espera=None):
+    CHAMADAS[etapa] += 1
+    inicio = time.perf_counter()
+    time.sleep(LATENCIA_COM if espera is None else espera)
+    ETAPAS[etapa] += time.perf_counter() - inicio
+
+
+class _Api:
+    Ready = True
+
+
+class Range:
+    def __init__(self, planilha, endereco):
+        self.planilha = planilha
+        self.endereco = endereco
+
+    @property
+    def value(self):
+        _com("ler")
+        return self.planilha.celulas.get(self.endereco)
+
+    @value.setter
+    def value(self, valor):
+        _com("preencher")
+        self.planilha.celulas[self.endereco] = valor
+
+    @property
+    def formula(self):
+        _com("ler")
+        return self.planilha.celulas.get(self.endereco, "")
+
+    @formula.setter
+    def formula(self, valor):
+        _com("restaurar")
+        self.planilha.celulas[self.endereco] = valor
+
+
+class Sheet:
+    def __init__(self):
+        self.celulas = {}
+
+    def range(self, endereco):
+        return Range(self, endereco)
+
+
+class Book:
+    def __init__(self, books, caminho):
+        self.books = books
+        self.caminho = caminho
+        self.sheets = [Sheet()]
+
+    def to_pdf(self, caminho):
+        _com("exportar", LATENCIA_PDF)
+        with open(caminho, "wb") as f:
+            f.write(PDF_MINIMO)
+
+    def close(self):
+        _com("fechar")
+        self.books.livros.remove(self)
+
+
+class Books:
+    def __init__(self):
+        self.livros = []
+
+    def open(self, caminho, **_):
+        _com("abrir_livro")
+        livro = Book(self, caminho)
+        self.livros.append(livro)
+        return livro
+
+    def __len__(self):
+        return len(self.livros)
+
+
+class App:
+    def __init__(self, visible=True, add_book=True):
+        _com("abrir_excel", LATENCIA_APP)
+        self.books = Books()
+        self.api = _Api()
+        self.display_alerts = True
+        self.screen_updating = True
+
+    def quit(self):
+        _com("fechar", LATENCIA_APP)
+
+    def kill(self):
+        pass
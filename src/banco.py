@@ -0,0 +1,24 @@
+# banco.py
+# Banco SQLite do GeProp, guardado junto com os PDFs na pasta de saída.
+# Usado pela numeração das propostas e pelos demais índices do acervo.
+
+import os
+import sqlite3
+
+from preencher import OUTPUT_DIR
+
+NOME_BANCO = ".geprop.db"
+
+
+def caminho_banco(pasta=OUTPUT_DIR):
+    return os.path.join(pasta, NOME_BANCO)
+
+
+def conectar(pasta=OUTPUT_DIR):
+    os.makedirs(pasta, exist_ok=True)
+    # isolation_level=None: as transações são abertas explicitamente
+    # (BEGIN IMMEDIATE) por quem precisa de atomicidade
+    conexao = sqlite3.connect(caminho_banco(pasta), timeout=30, isolation_level=None)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute("PRAGMA synchronous=NORMAL")
+    return conexao
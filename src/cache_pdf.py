@@ -0,0 +1,156 @@
+# cache_pdf.py
+# Cache em disco dos PDFs já gerados, endereçado pelo conteúdo.
+#
+# A chave é o hash do arquivo do template + a assinatura do motor (nome,
+# versão do desenho e opções que mudam o PDF, como GEPROP_FUNDO) + as
+# células preenchidas (já normalizadas por montar_celulas) + VERSAO_CHAVE.
+# Gerar de novo a mesma proposta só copia o PDF guardado; qualquer mudança
+# no template ou no motor muda a chave e as entradas antigas deixam de ser
+# usadas (e saem pelo LRU).
+#
+#   GEPROP_CACHE_MB  tamanho máximo do cache em MB (padrão 200, 0 desliga)
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from preencher import OUTPUT_DIR
+
+PASTA_CACHE = ".cache_pdf"
+VERSAO_CHAVE = "2"   # formato da chave e das células normalizadas
+LIMITE_PADRAO_MB = 200
+
+_hashes = {}
+_hashes_lock = threading.Lock()
+
+
+def hash_arquivo(caminho):
+    # sha256 do arquivo, recalculado só quando o mtime/tamanho mudam
+    st = os.stat(caminho)
+    assinatura = (st.st_mtime_ns, st.st_size)
+    with _hashes_lock:
+        guardado = _hashes.get(caminho)
+        if guardado and guardado[0] == assinatura:
+            return guardado[1]
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    with _hashes_lock:
+        _hashes[caminho] = (assinatura, h.hexdigest())
+    return h.hexdigest()
+
+
+def _normalizar(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, str):
+        return valor.strip()
+    return valor
+
+
+class CachePDF:
+    def __init__(self, pasta=None, limite_mb=LIMITE_PADRAO_MB):
+        self.pasta = pasta or os.path.join(OUTPUT_DIR, PASTA_CACHE)
+        self.limite = int(limite_mb * 1024 * 1024)
+        self._tamanho = None   # total em bytes, calculado no primeiro uso
+        self._lock = threading.Lock()
+        os.makedirs(self.pasta, exist_ok=True)
+
+    def chave(self, template, celulas, motor=""):
+        conteudo = json.dumps(
+            {cell.upper(): _normalizar(v) for cell, v in celulas.items()},
+            sort_keys=True, ensure_ascii=False, default=str)
+        h = hashlib.sha256(VERSAO_CHAVE.encode() + b"\0")
+        h.update(hash_arquivo(template).encode())
+        h.update(b"\0" + motor.encode() + b"\0")
+        h.update(conteudo.encode("utf-8"))
+        return h.hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.pasta, chave[:2], chave + ".pdf")
+
+    def copiar(self, chave, output_path):
+        # True se a chave estava no cache (o PDF foi copiado para output_path)
+        origem = self._caminho(chave)
+        try:
+            shutil.copyfile(origem, output_path)
+        except FileNotFoundError:
+            return False
+        try:
+            os.utime(origem)   # mtime = último uso, para o LRU
+        except OSError:
+            pass
+        return True
+
+    def guardar(self, chave, pdf_path):
+        destino = self._caminho(chave)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        fd, temporario = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(destino))
+        os.close(fd)
+        try:
+            shutil.copyfile(pdf_path, temporario)
+            os.replace(temporario, destino)
+        except OSError:
+            try:
+                os.remove(temporario)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            if self._tamanho is None:
+                self._tamanho = self._medir()
+            else:
+                self._tamanho += os.path.getsize(destino)
+            if self._tamanho > self.limite:
+                self._tamanho = self._despejar()
+
+    def _entradas(self):
+        for sub in os.scandir(self.pasta):
+            if sub.is_dir():
+                for e in os.scandir(sub.path):
+                    if e.name.endswith(".pdf"):
+                        yield e
+
+    def _medir(self):
+        return sum(e.stat().st_size for e in self._entradas())
+
+    def _despejar(self):
+        # Remove os menos usados até ficar em 90% do limite
+        entradas = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in self._entradas()))
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        alvo = self.limite * 0.9
+        for _, tamanho, caminho in entradas:
+            if total <= alvo:
+                break
+            try:
+                os.remove(caminho)
+                total -= tamanho
+            except OSError:
+                pass
+        return total
+
+    def limpar(self):
+        shutil.rmtree(self.pasta, ignore_errors=True)
+        os.makedirs(self.pasta, exist_ok=True)
+        with self._lock:
+            self._tamanho = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def obter_cache():
+    # None quando o cache está desligado (GEPROP_CACHE_MB=0)
+    global _cache
+    limite_mb = float(os.environ.get("GEPROP_CACHE_MB", LIMITE_PADRAO_MB))
+    if limite_mb <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = CachePDF(limite_mb=limite_mb)
+        return _cache
@@ -0,0 +1,250 @@
+# catalogo.py
+# Python ≥ 3.8
+#
+# Catálogo de equipamentos (painéis, inversores e estruturas, com potência,
+# preço e ficha técnica) de json/equipamentos.json, com busca por prefixo
+# rápida o bastante para rodar a cada tecla:
+#
+#   catalogo = obter_catalogo()
+#   catalogo.buscar("jinko 580")          # painéis JINKO de 580 W
+#   catalogo.buscar("deye 5k", "inversores")
+#   catalogo.buscar("jnko")               # erro de digitação: busca aproximada
+#
+#   python catalogo.py deye mono
+#
+# O arquivo que vem no programa só tem modelos e fichas, sem preço. Com a
+# tabela do distribuidor (o mesmo formato, com "preco") em GEPROP_CATALOGO,
+# os preços passam a aparecer e a ser somados no formulário.
+#
+# Cada item vira uma lista de palavras normalizadas (sem acento, maiúsculas:
+# fabricante, partes do modelo, potência, categoria e valores da ficha). O
+# índice é o vocabulário ordenado dessas palavras, cada uma com os itens em
+# que aparece: uma palavra da busca é procurada como prefixo com bisect e as
+# palavras da busca são combinadas por interseção. Só a palavra que não for
+# prefixo de nada passa pela busca aproximada (trigramas + difflib), e o
+# resultado de cada prefixo fica em cache, então digitar "j", "ji", "jin"...
+# não refaz o trabalho das teclas anteriores.
+
+import argparse
+import difflib
+import heapq
+import json
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+
+from dinheiro import dinheiro, soma
+from preencher import resource_path
+
+ARQUIVO = "json/equipamentos.json"
+
+# Chave no JSON -> nome da categoria (na ordem em que aparecem na busca)
+CATEGORIAS = {"paineis": "Painel", "inversores": "Inversor", "estruturas": "Estrutura"}
+
+LIMITE = 15
+
+# Semelhança mínima (difflib) para uma palavra valer na busca aproximada
+SEMELHANCA = 0.75
+
+_SEPARADOR = re.compile(r"[^0-9A-Z]+")
+
+
+@lru_cache(maxsize=8192)
+def normalizar(texto):
+    # "Monofásico 220 V" -> "MONOFASICO 220 V"
+    texto = unicodedata.normalize("NFKD", str(texto or ""))
+    return "".join(c for c in texto if not unicodedata.combining(c)).upper()
+
+
+def palavras(texto):
+    return [p for p in _SEPARADOR.split(normalizar(texto)) if p]
+
+
+def _trigramas(palavra):
+    # "^^" marca o começo: o início da palavra pesa mais que o meio
+    marcada = f"^^{palavra}"
+    return {marcada[i:i + 3] for i in range(len(marcada) - 2)}
+
+
+class Equipamento:
+    __slots__ = ("categoria", "modelo", "fabricante", "potencia", "preco", "tipo", "ficha", "rotulo")
+
+    def __init__(self, categoria, item):
+        self.categoria = categoria
+        self.modelo = str(item.get("modelo", "")).strip().upper()
+        self.fabricante = str(item.get("fabricante", "")).strip().upper()
+        self.potencia = int(item["potencia"]) if item.get("potencia") else None
+        # sem preço no catálogo: None, nunca zero
+        preco = str(item.get("preco") or "").strip()
+        self.preco = dinheiro(preco) if preco else None
+        self.tipo = str(item.get("tipo", "")).strip().upper()   # estruturas: "Estrutura Para"
+        self.ficha = dict(item.get("ficha") or {})
+        partes = [f"{CATEGORIAS[categoria]}: {self.fabricante} {self.modelo}".strip()]
+        if self.categoria == "estruturas":
+            partes[0] += f" ({self.tipo})"
+            if self.preco is not None:
+                partes.append(f"{self.preco.brl}/painel")
+        else:
+            partes.append(f"{self.potencia} W")
+            if self.preco is not None:
+                partes.append(self.preco.brl)
+        self.rotulo = " · ".join(partes)
+
+    def palavras(self):
+        textos = [CATEGORIAS[self.categoria], self.fabricante, self.modelo, self.tipo, *self.ficha.values()]
+        resultado = set()
+        for texto in textos:
+            resultado.update(palavras(texto))
+        # modelo sem separadores: "SUN5K" acha "SUN-5K-G04"
+        resultado.add("".join(palavras(self.modelo)))
+        if self.potencia:
+            resultado.update((str(self.potencia), f"{self.potencia}W"))
+        resultado.discard("")
+        return resultado
+
+    def descricao(self):
+        # Ficha técnica em linhas (dica do item na janela)
+        linhas = [self.rotulo]
+        linhas += [f"{nome.capitalize()}: {valor}" for nome, valor in self.ficha.items()]
+        return "\n".join(linhas)
+
+    def __repr__(self):
+        return f"Equipamento({self.categoria!r}, {self.fabricante} {self.modelo})"
+
+
+class Catalogo:
+    def __init__(self, tabela):
+        itens = [Equipamento(categoria, item)
+                 for categoria in CATEGORIAS for item in tabela.get(categoria, [])]
+        # A posição no catálogo já é a ordem do resultado: categoria,
+        # fabricante, potência e modelo
+        ordem = list(CATEGORIAS)
+        itens.sort(key=lambda e: (ordem.index(e.categoria), e.fabricante, e.potencia or 0, e.modelo))
+        self.itens = itens
+        self.por_categoria = {c: frozenset(i for i, e in enumerate(itens) if e.categoria == c)
+                              for c in CATEGORIAS}
+
+        indice = {}
+        for i, item in enumerate(itens):
+            for palavra in item.palavras():
+                indice.setdefault(palavra, []).append(i)
+        self.vocabulario = sorted(indice)
+        self.postagens = [indice[p] for p in self.vocabulario]
+        self.trigramas = {}
+        for posicao, palavra in enumerate(self.vocabulario):
+            if not palavra.isdigit():
+                for trigrama in _trigramas(palavra):
+                    self.trigramas.setdefault(trigrama, []).append(posicao)
+        self._lock = threading.Lock()
+        self._prefixo = lru_cache(maxsize=2048)(self._itens_do_prefixo)
+
+    def __len__(self):
+        return len(self.itens)
+
+    def _itens_do_prefixo(self, prefixo):
+        # Itens com alguma palavra começando por `prefixo`
+        encontrados = set()
+        posicao = bisect_left(self.vocabulario, prefixo)
+        while posicao < len(self.vocabulario) and self.vocabulario[posicao].startswith(prefixo):
+            encontrados.update(self.postagens[posicao])
+            posicao += 1
+        if not encontrados and len(prefixo) >= 3 and not prefixo.isdigit():
+            encontrados = self._aproximados(prefixo)
+        return frozenset(encontrados)
+
+    def _aproximados(self, palavra):
+        # Palavras do vocabulário parecidas com `palavra` (ou com o início
+        # delas, já que a busca está sendo digitada)
+        trigramas = _trigramas(palavra)
+        contagem = Counter(p for t in trigramas for p in self.trigramas.get(t, ()))
+        minimo = max(1, len(trigramas) // 3)
+        encontrados = set()
+        for posicao, comuns in contagem.items():
+            if comuns < minimo:
+                continue
+            candidata = self.vocabulario[posicao]
+            semelhanca = max(difflib.SequenceMatcher(None, palavra, candidata).ratio(),
+                             difflib.SequenceMatcher(None, palavra, candidata[:len(palavra)]).ratio())
+            if semelhanca >= SEMELHANCA:
+                encontrados.update(self.postagens[posicao])
+        return encontrados
+
+    def buscar(self, consulta, categoria=None, limite=LIMITE):
+        # Itens com todas as palavras da consulta (como prefixo), na ordem do
+        # catálogo; consulta vazia não acha nada
+        termos = sorted(set(palavras(consulta)), key=len, reverse=True)
+        if not termos:
+            return []
+        with self._lock:   # o lru_cache do prefixo é compartilhado
+            conjuntos = [self._prefixo(t) for t in termos]
+        if categoria:
+            conjuntos.append(self.por_categoria[categoria])
+        conjuntos.sort(key=len)
+        resultado = set(conjuntos[0])
+        for conjunto in conjuntos[1:]:
+            resultado &= conjunto
+            if not resultado:
+                return []
+        return [self.itens[i] for i in heapq.nsmallest(limite, resultado)]
+
+    def por_rotulo(self, rotulo):
+        for item in self.itens:
+            if item.rotulo == rotulo:
+                return item
+        return None
+
+
+def preco_equipamentos(painel=None, quantidade=0, inversores=(), estrutura=None):
+    # Painéis × quantidade + inversores + estrutura (preço por painel); None
+    # se algum dos escolhidos não tiver preço no catálogo (um total parcial
+    # seria um preço errado na proposta)
+    parcelas = [(painel, quantidade), *((i, 1) for i in inversores), (estrutura, quantidade)]
+    parcelas = [(item, n) for item, n in parcelas if item is not None]
+    if not parcelas or any(item.preco is None for item, _ in parcelas):
+        return None
+    return soma(item.preco.valor * n for item, n in parcelas)
+
+
+_catalogos = {}
+_catalogos_lock = threading.Lock()
+
+
+def obter_catalogo(caminho=None):
+    # Lido uma vez por processo; relido se o arquivo mudar
+    chave = os.path.abspath(caminho or os.environ.get("GEPROP_CATALOGO") or resource_path(ARQUIVO))
+    mtime = os.path.getmtime(chave)
+    with _catalogos_lock:
+        item = _catalogos.get(chave)
+        if item is None or item[0] != mtime:
+            with open(chave, "r", encoding="utf-8") as f:
+                item = (mtime, Catalogo(json.load(f)))
+            _catalogos[chave] = item
+        return item[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Busca no catálogo de equipamentos.")
+    parser.add_argument("consulta", nargs="+", help="palavras (ou começo delas) do fabricante, modelo, potência...")
+    parser.add_argument("--categoria", choices=list(CATEGORIAS), default=None)
+    parser.add_argument("--catalogo", default=None, help=f"arquivo JSON (padrão: GEPROP_CATALOGO ou {ARQUIVO})")
+    parser.add_argument("--limite", type=int, default=LIMITE)
+    args = parser.parse_args(argv)
+
+    catalogo = obter_catalogo(args.catalogo)
+    inicio = time.perf_counter()
+    itens = catalogo.buscar(" ".join(args.consulta), args.categoria, args.limite)
+    duracao = (time.perf_counter() - inicio) * 1000
+    for item in itens:
+        print(item.rotulo)
+    print(f"{len(itens)} de {len(catalogo)} itens em {duracao:.2f} ms", file=sys.stderr)
+    return 0 if itens else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+# configuracoes.py
+# Configurações da janela (consultores, estados, estruturas, logradouros,
+# tema e último consultor) num único objeto em memória.
+#
+# Os seis arquivos de json/ são lidos uma vez, na primeira vez que alguém
+# pede as configurações. Depois disso a janela só lê e altera a memória; as
+# alterações são gravadas em segundo plano, agrupadas (uma gravação por
+# arquivo alterado depois de ATRASO_GRAVACAO segundos sem mudanças) e de
+# forma atômica (arquivo temporário + os.replace). Ao sair do programa o
+# que estiver pendente é gravado. A gravação mantém a quebra de linha e o
+# recuo do arquivo que já existe (os de json/ são CRLF, com 4 espaços).
+
+import atexit
+import copy
+import json
+import os
+import re
+import tempfile
+import threading
+
+from preencher import resource_path
+from saida import permissoes_padrao
+
+ATRASO_GRAVACAO = 0.5
+
+# nome -> (arquivo, chave dentro do JSON, valor padrão)
+ARQUIVOS = {
+    "consultores": ("json/consultores.json", "consultores", ["KLEYTON DE PÁDUA"]),
+    "estados": ("json/estados.json", "estados", ["MG", "SP", "RJ", "ES"]),
+    "estruturas": ("json/estruturas.json", "estruturas", ["TELHADO METÁLICO", "TELHADO CERÂMICO", "SOLO"]),
+    "logradouros": ("json/logradouros.json", "logradouros", ["RUA", "AVENIDA", "TRAVESSA", "ALAMEDA", "PRAÇA", "RODOVIA"]),
+    "tema": ("json/tema.json", "tema", "sistema"),
+    "ultimo_consultor": ("json/ultimo_consultor.json", "ultimo_consultor", None),
+}
+
+
+def _formato(caminho):
+    # Quebra de linha e recuo do arquivo atual; arquivo novo: os do sistema
+    # e 4 espaços, como antes
+    try:
+        with open(caminho, "rb") as f:
+            atual = f.read()
+    except OSError:
+        return None, 4
+    quebra = "\r\n" if b"\r\n" in atual else "\n"
+    recuo = re.search(rb"\n( +)\S", atual)
+    return quebra, len(recuo.group(1)) if recuo else 4
+
+
+def gravar_json_atomico(caminho, dados):
+    # Grava num temporário da mesma pasta e troca de uma vez: quem ler o
+    # arquivo (ou um travamento no meio) nunca vê um JSON pela metade
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(pasta, exist_ok=True)
+    quebra, recuo = _formato(caminho)
+    fd, temporario = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=pasta)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline=quebra) as f:
+            json.dump(dados, f, ensure_ascii=False, indent=recuo)
+            f.flush()
+            os.fsync(f.fileno())
+        permissoes_padrao(temporario)   # o mkstemp cria só para o dono
+        os.replace(temporario, caminho)
+    except BaseException:
+        try:
+            os.remove(temporario)
+        except OSError:
+            pass
+        raise
+
+
+class Configuracoes:
+    def __init__(self, atraso=ATRASO_GRAVACAO):
+        self.atraso = atraso
+        self._valores = {}
+        self._pendentes = set()
+        self._lock = threading.Lock()
+        self._timer = None
+        for nome in ARQUIVOS:
+            self._valores[nome] = self._ler(nome)
+
+    def _ler(self, nome):
+        arquivo, chave, padrao = ARQUIVOS[nome]
+        try:
+            with open(resource_path(arquivo), "r", encoding="utf-8") as f:
+                valor = json.load(f).get(chave, padrao)
+        except (FileNotFoundError, ValueError):
+            valor = copy.copy(padrao)
+        if isinstance(valor, list):
+            valor.sort()
+        return valor
+
+    def obter(self, nome):
+        # As listas são devolvidas por referência: quem alterar a lista no
+        # lugar deve chamar salvar(nome) depois
+        return self._valores[nome]
+
+    def definir(self, nome, valor):
+        self._valores[nome] = valor
+        self.salvar(nome)
+
+    def salvar(self, nome):
+        # Marca o arquivo como alterado e (re)agenda a gravação
+        with self._lock:
+            self._pendentes.add(nome)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.atraso, self.gravar)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def gravar(self):
+        # Grava agora tudo o que estiver pendente
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pendentes = {nome: copy.copy(self._valores[nome]) for nome in self._pendentes}
+            self._pendentes.clear()
+        for nome, valor in pendentes.items():
+            arquivo, chave, _ = ARQUIVOS[nome]
+            gravar_json_atomico(resource_path(arquivo), {chave: valor})
+
+
+_configuracoes = None
+_configuracoes_lock = threading.Lock()
+
+
+def configuracoes():
+    # Instância única do processo, carregada no primeiro uso
+    global _configuracoes
+    with _configuracoes_lock:
+        if _configuracoes is None:
+            _configuracoes = Configuracoes()
+            atexit.register(_configuracoes.gravar)
+        return _configuracoes
@@ -0,0 +1,211 @@
+# desenhos.py
+# Lê os objetos de desenho (imagens, retângulos, linhas e caixas de texto)
+# da primeira planilha de um .xlsx. O openpyxl só traz as imagens e perde o
+# recorte (srcRect) e as formas, então o motor Python lê o XML direto.
+
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+
+NS = {
+    "xdr": "http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing",
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+    "main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+}
+
+# Cores do tema padrão do Office para schemeClr
+CORES_ESQUEMA = {
+    "bg1": "FFFFFF", "lt1": "FFFFFF", "tx1": "000000", "dk1": "000000",
+    "bg2": "E7E6E6", "lt2": "E7E6E6", "tx2": "44546A", "dk2": "44546A",
+    "accent1": "4472C4", "accent2": "ED7D31", "accent3": "A5A5A5",
+    "accent4": "FFC000", "accent5": "5B9BD5", "accent6": "70AD47",
+}
+
+
+class Ancora:
+    # Posição no grid: coluna/linha (base 0) + deslocamento em EMU
+    __slots__ = ("col", "col_off", "lin", "lin_off")
+
+    def __init__(self, col, col_off, lin, lin_off):
+        self.col = col
+        self.col_off = col_off
+        self.lin = lin
+        self.lin_off = lin_off
+
+
+class Desenho:
+    # tipo: "imagem", "forma" ou "linha"
+    def __init__(self, tipo, origem, destino=None, extensao=None):
+        self.tipo = tipo
+        self.origem = origem
+        self.destino = destino
+        self.extensao = extensao  # (cx, cy) em EMU quando não há destino
+        self.imagem = None        # bytes da mídia
+        self.recorte = None       # (l, t, r, b) em frações de 0 a 1
+        self.preenchimento = None  # "RRGGBB" ou lista de (posição, "RRGGBB")
+        self.contorno = None
+        self.espessura = 0.75
+        self.paragrafos = []      # [(alinhamento, [(texto, tamanho, negrito, cor)])]
+
+
+def _ancora(no):
+    return Ancora(
+        int(no.find("xdr:col", NS).text), int(no.find("xdr:colOff", NS).text),
+        int(no.find("xdr:row", NS).text), int(no.find("xdr:rowOff", NS).text),
+    )
+
+
+def _cor(no):
+    # Resolve srgbClr/schemeClr com lumMod/lumOff/shade/tint aproximados
+    if no is None:
+        return None
+    cor = no.find("a:srgbClr", NS)
+    if cor is not None:
+        base = cor.get("val")
+    else:
+        cor = no.find("a:schemeClr", NS)
+        if cor is None:
+            return None
+        base = CORES_ESQUEMA.get(cor.get("val"), "000000")
+    canais = [int(base[i:i + 2], 16) for i in (0, 2, 4)]
+    for ajuste in cor:
+        nome = ajuste.tag.split("}")[-1]
+        fator = int(ajuste.get("val", "100000")) / 100000
+        if nome in ("lumMod", "shade"):
+            canais = [c * fator for c in canais]
+        elif nome == "lumOff":
+            canais = [c + 255 * fator for c in canais]
+        elif nome == "tint":
+            canais = [c + (255 - c) * (1 - fator) for c in canais]
+    return "".join(f"{max(0, min(255, int(round(c)))):02X}" for c in canais)
+
+
+def _preenchimento(sppr):
+    if sppr is None or sppr.find("a:noFill", NS) is not None:
+        return None
+    solido = sppr.find("a:solidFill", NS)
+    if solido is not None:
+        return _cor(solido)
+    gradiente = sppr.find("a:gradFill", NS)
+    if gradiente is not None:
+        paradas = []
+        for gs in gradiente.findall("a:gsLst/a:gs", NS):
+            cor = _cor(gs)
+            if cor:
+                paradas.append((int(gs.get("pos", "0")) / 100000, cor))
+        paradas.sort()
+        return paradas or None
+    return None
+
+
+def _contorno(sppr):
+    if sppr is None:
+        return None, 0.75
+    ln = sppr.find("a:ln", NS)
+    if ln is None or ln.find("a:noFill", NS) is not None:
+        return None, 0.75
+    espessura = int(ln.get("w", "9525")) / 12700
+    return _cor(ln.find("a:solidFill", NS)), espessura
+
+
+def _paragrafos(txbody):
+    paragrafos = []
+    if txbody is None:
+        return paragrafos
+    for p in txbody.findall("a:p", NS):
+        ppr = p.find("a:pPr", NS)
+        alinhamento = ppr.get("algn", "l") if ppr is not None else "l"
+        trechos = []
+        for r in p.findall("a:r", NS):
+            rpr = r.find("a:rPr", NS)
+            tamanho = int(rpr.get("sz", "1100")) / 100 if rpr is not None else 11.0
+            negrito = rpr is not None and rpr.get("b") == "1"
+            cor = _cor(rpr.find("a:solidFill", NS)) if rpr is not None else None
+            trechos.append((r.findtext("a:t", "", NS), tamanho, negrito, cor or "000000"))
+        paragrafos.append((alinhamento, trechos))
+    if not any(trechos for _, trechos in paragrafos):
+        return []
+    return paragrafos
+
+
+def _caminho_rel(base, alvo):
+    return posixpath.normpath(posixpath.join(posixpath.dirname(base), alvo))
+
+
+def _relacoes(arquivo, caminho):
+    rels = posixpath.join(posixpath.dirname(caminho), "_rels", posixpath.basename(caminho) + ".rels")
+    if rels not in arquivo.namelist():
+        return {}
+    raiz = ET.fromstring(arquivo.read(rels))
+    return {
+        rel.get("Id"): _caminho_rel(caminho, rel.get("Target"))
+        for rel in raiz.findall("rel:Relationship", NS)
+    }
+
+
+def caminho_planilha(arquivo, indice_planilha=0):
+    # Caminho do XML da planilha dentro do .xlsx (None se não existir)
+    livro = ET.fromstring(arquivo.read("xl/workbook.xml"))
+    rels_livro = _relacoes(arquivo, "xl/workbook.xml")
+    planilhas = livro.findall("main:sheets/main:sheet", NS)
+    if indice_planilha >= len(planilhas):
+        return None
+    return rels_livro[planilhas[indice_planilha].get(f"{{{NS['r']}}}id")]
+
+
+def ler_desenhos(caminho_xlsx, indice_planilha=0):
+    with zipfile.ZipFile(caminho_xlsx) as arquivo:
+        caminho = caminho_planilha(arquivo, indice_planilha)
+        if caminho is None:
+            return []
+        planilha = ET.fromstring(arquivo.read(caminho))
+        no_desenho = planilha.find("main:drawing", NS)
+        if no_desenho is None:
+            return []
+        rels_planilha = _relacoes(arquivo, caminho)
+        caminho_desenho = rels_planilha[no_desenho.get(f"{{{NS['r']}}}id")]
+        rels_desenho = _relacoes(arquivo, caminho_desenho)
+        raiz = ET.fromstring(arquivo.read(caminho_desenho))
+
+        desenhos = []
+        for ancora in raiz:
+            tag = ancora.tag.split("}")[-1]
+            if tag not in ("oneCellAnchor", "twoCellAnchor"):
+                continue
+            origem = _ancora(ancora.find("xdr:from", NS))
+            destino = None
+            extensao = None
+            if tag == "twoCellAnchor":
+                destino = _ancora(ancora.find("xdr:to", NS))
+            else:
+                ext = ancora.find("xdr:ext", NS)
+                extensao = (int(ext.get("cx")), int(ext.get("cy")))
+
+            pic = ancora.find("xdr:pic", NS)
+            forma = ancora.find("xdr:sp", NS)
+            conector = ancora.find("xdr:cxnSp", NS)
+            if pic is not None:
+                blip = pic.find("xdr:blipFill/a:blip", NS)
+                alvo = rels_desenho.get(blip.get(f"{{{NS['r']}}}embed")) if blip is not None else None
+                if alvo is None:
+                    continue
+                d = Desenho("imagem", origem, destino, extensao)
+                d.imagem = arquivo.read(alvo)
+                recorte = pic.find("xdr:blipFill/a:srcRect", NS)
+                if recorte is not None:
+                    d.recorte = tuple(int(recorte.get(k, "0")) / 100000 for k in ("l", "t", "r", "b"))
+            elif forma is not None:
+                sppr = forma.find("xdr:spPr", NS)
+                d = Desenho("forma", origem, destino, extensao)
+                d.preenchimento = _preenchimento(sppr)
+                d.contorno, d.espessura = _contorno(sppr)
+                d.paragrafos = _paragrafos(forma.find("xdr:txBody", NS))
+            elif conector is not None:
+                d = Desenho("linha", origem, destino, extensao)
+                d.contorno, d.espessura = _contorno(conector.find("xdr:spPr", NS))
+            else:
+                continue
+            desenhos.append(d)
+        return desenhos
@@ -0,0 +1,130 @@
+# dinheiro.py
+# Valor em reais sobre Decimal, com o texto pt-BR ("R$ 1.234,56") montado
+# uma vez só, na criação.
+#
+#   preco = dinheiro("1.234,5")     # mesma leitura de preencher.ler_preco
+#   preco.brl                       # "R$ 1.234,50"
+#   str(preco)                      # "1234.50" (formato dos dados/planilha)
+#   float(preco)                    # 1234.5 (vai para a célula como número)
+#   soma(precos)                    # total exato, sem erro de float
+
+from decimal import Decimal
+from functools import lru_cache, total_ordering
+
+from preencher import CENTAVO, TOTAIS, ler_preco
+
+
+def formatar_brl(valor):
+    # Decimal -> "R$ 1.234,56" (negativo: "-R$ 1.234,56")
+    texto = f"{abs(valor):,.2f}".translate(str.maketrans(",.", ".,"))
+    return f"-R$ {texto}" if valor < 0 else f"R$ {texto}"
+
+
+@total_ordering
+class Dinheiro:
+    # Imutável: as instâncias saem do cache de dinheiro() e são compartilhadas
+    __slots__ = ("valor", "brl")
+
+    def __init__(self, valor=0):
+        if isinstance(valor, Dinheiro):
+            valor = valor.valor
+        elif not isinstance(valor, Decimal):
+            valor = ler_preco(valor)
+        valor = valor.quantize(CENTAVO)
+        object.__setattr__(self, "valor", valor)
+        object.__setattr__(self, "brl", formatar_brl(valor))
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError("Dinheiro é imutável")
+
+    def __reduce__(self):
+        # pickle (registros enviados a outro processo) sem passar por __setattr__
+        return (Dinheiro, (self.valor,))
+
+    def __add__(self, outro):
+        if isinstance(outro, Dinheiro):
+            return Dinheiro(self.valor + outro.valor)
+        if outro == 0:  # sum() começa em 0
+            return self
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, outro):
+        if isinstance(outro, Dinheiro):
+            return Dinheiro(self.valor - outro.valor)
+        return NotImplemented
+
+    def __eq__(self, outro):
+        if isinstance(outro, Dinheiro):
+            return self.valor == outro.valor
+        return NotImplemented
+
+    def __lt__(self, outro):
+        if isinstance(outro, Dinheiro):
+            return self.valor < outro.valor
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.valor)
+
+    def __bool__(self):
+        return bool(self.valor)
+
+    def __float__(self):
+        return float(self.valor)
+
+    def __str__(self):
+        return f"{self.valor:.2f}"
+
+    def __repr__(self):
+        return f"Dinheiro('{self}')"
+
+
+ZERO = Dinheiro()
+
+
+@lru_cache(maxsize=4096)
+def _de_texto(texto):
+    return Dinheiro(texto)
+
+
+def dinheiro(valor):
+    # Mesmo texto, mesma instância: lido e formatado uma vez por processo
+    if isinstance(valor, Dinheiro):
+        return valor
+    if isinstance(valor, str) or valor is None:
+        return _de_texto(valor or "")
+    return Dinheiro(valor)
+
+
+def soma(valores):
+    # Soma em Decimal (cada parcela já em centavos): exata para qualquer
+    # quantidade de propostas
+    return Dinheiro(sum((dinheiro(v).valor for v in valores), Decimal(0)))
+
+
+def celula(valor):
+    # Valor de preço como vai para a planilha: número, ou vazio se não houver
+    if valor is None or valor == "":
+        return None
+    return float(dinheiro(valor))
+
+
+def calcular_totais(dados):
+    # Preenche os totais em branco ou zerados com a soma das parcelas (uma
+    # vez, ao montar os dados); total digitado à mão (desconto) é mantido
+    for total, parcelas in TOTAIS.items():
+        if total in dados and not dinheiro(dados[total]):
+            dados[total] = str(soma(dados.get(p) for p in parcelas))
+    return dados
+
+
+def valor_proposta(dados):
+    # Valor da proposta: o total (tipo 3) ou a soma das propostas da dupla.
+    # None se nenhum preço foi informado.
+    for total in TOTAIS:
+        if dados.get(total):
+            return dinheiro(dados[total])
+    precos = [dados[c] for c in ("Preço", "Preço 2") if dados.get(c)]
+    return soma(precos) if precos else None
@@ -0,0 +1,244 @@
+# fila_render.py
+# Fila de geração de PDFs em segundo plano para a janela do GeProp.
+#
+# O formulário só tira uma cópia dos dados, reserva o número e entrega a
+# proposta para a fila; a renderização roda num QThreadPool e a janela
+# continua livre para digitar a próxima. O PainelFila mostra o andamento
+# de cada proposta (na fila, gerando, pronta ou erro). As prontas podem ser
+# impressas juntas, num trabalho só (impressao.py).
+
+import os
+import sys
+import threading
+import time
+
+from PyQt6.QtCore import QObject, QRunnable, Qt, QThreadPool, QTimer, QUrl, pyqtSignal
+from PyQt6.QtGui import QDesktopServices
+from PyQt6.QtWidgets import (QAbstractItemView, QLabel, QListWidget, QListWidgetItem,
+                             QMenu, QProgressBar, QVBoxLayout, QWidget)
+
+from impressao import ENVIADO, FilaImpressao
+from instrumentacao import registrar
+from preencher import OUTPUT_DIR
+
+
+class SinaisTarefa(QObject):
+    # Emitidos pela thread de trabalho e entregues na thread da janela
+    iniciada = pyqtSignal(int)
+    concluida = pyqtSignal(int, str, float)
+    falhou = pyqtSignal(int, str)
+
+
+def _iniciar_com():
+    # O Excel (xlwings) exige COM inicializado em cada thread que o usa
+    if sys.platform != "win32":
+        return None
+    try:
+        import pythoncom
+    except ImportError:
+        return None
+    pythoncom.CoInitialize()
+    return pythoncom
+
+
+class TarefaRenderizacao(QRunnable):
+    def __init__(self, id_tarefa, tipo, dados, output_path, numero_end, sinais):
+        super().__init__()
+        self.id_tarefa = id_tarefa
+        self.tipo = tipo
+        self.dados = dict(dados)
+        self.output_path = output_path
+        self.numero_end = numero_end
+        self.sinais = sinais
+        self.criada = time.perf_counter()
+
+    def run(self):
+        from renderizador import gerar_pdf
+
+        inicio = time.perf_counter()
+        registrar("fila.espera", self.criada, inicio - self.criada)
+        self.sinais.iniciada.emit(self.id_tarefa)
+        com = _iniciar_com()
+        try:
+            gerar_pdf(self.tipo, self.dados, self.output_path, numero_end=self.numero_end)
+        except Exception as e:
+            self.sinais.falhou.emit(self.id_tarefa, str(e))
+        else:
+            fim = time.perf_counter()
+            registrar("proposta.total", self.criada, fim - self.criada, {"tipo": self.tipo})
+            self.sinais.concluida.emit(self.id_tarefa, self.output_path, fim - inicio)
+        finally:
+            if com is not None:
+                com.CoUninitialize()
+
+
+class FilaRenderizacao(QObject):
+    # Nº de propostas geradas ao mesmo tempo (GEPROP_FILA_THREADS, padrão 1:
+    # o Excel e o reportlab não ganham nada disputando a mesma CPU)
+    adicionada = pyqtSignal(int, str)
+
+    def __init__(self, parent=None, threads=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(threads or int(os.environ.get("GEPROP_FILA_THREADS", "1")))
+        self.sinais = SinaisTarefa(self)
+        self.sinais.concluida.connect(self._finalizada)
+        self.sinais.falhou.connect(self._finalizada)
+        self._proximo_id = 0
+        self.pendentes = set()
+
+    def enviar(self, tipo, dados, output_path, numero_end=None):
+        self._proximo_id += 1
+        id_tarefa = self._proximo_id
+        self.pendentes.add(id_tarefa)
+        self.adicionada.emit(id_tarefa, output_path)
+        self.pool.start(TarefaRenderizacao(id_tarefa, tipo, dados, output_path, numero_end, self.sinais))
+        return id_tarefa
+
+    def _finalizada(self, id_tarefa, *_):
+        self.pendentes.discard(id_tarefa)
+
+    def aguardar(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
+
+
+def abrir_pdf(caminho):
+    QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(caminho)))
+
+
+PAPEL_CAMINHO = Qt.ItemDataRole.UserRole
+PAPEL_ESTADO = Qt.ItemDataRole.UserRole + 1
+
+
+class PainelFila(QWidget):
+    # Lista das propostas enviadas nesta sessão, com o estado de cada uma.
+    # Duplo clique abre o PDF; botão direito oferece visualizar/imprimir
+    # (várias selecionadas saem num trabalho de impressão só).
+    # GEPROP_IMPRESSORA = impressora (padrão do sistema se não definida).
+
+    # Vem da thread da fila de impressão a cada mudança de um trabalho
+    impressao_mudou = pyqtSignal(object)
+
+    def __init__(self, fila, parent=None):
+        super().__init__(parent)
+        self.fila = fila
+        self.itens = {}
+        self.total = 0
+        self.prontas = 0
+        self._impressao = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(QLabel("<b>FILA DE GERAÇÃO</b>"))
+        self.progresso = QProgressBar()
+        self.progresso.setFormat("%v de %m")
+        self.progresso.setRange(0, 1)
+        self.progresso.setValue(0)
+        layout.addWidget(self.progresso)
+        self.lista = QListWidget()
+        self.lista.setMaximumHeight(140)
+        self.lista.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.lista.itemDoubleClicked.connect(self._abrir_item)
+        self.lista.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.lista.customContextMenuRequested.connect(self._menu_item)
+        layout.addWidget(self.lista)
+        self.estado_impressao = QLabel()
+        self.estado_impressao.hide()
+        layout.addWidget(self.estado_impressao)
+        # Enquanto houver trabalho no spooler, consulta o estado dele
+        self.consulta_spooler = QTimer(self)
+        self.consulta_spooler.setInterval(5000)
+        self.consulta_spooler.timeout.connect(self._consultar_spooler)
+        self.impressao_mudou.connect(self._impressao_mudou)
+
+        fila.adicionada.connect(self.adicionada)
+        fila.sinais.iniciada.connect(self.iniciada)
+        fila.sinais.concluida.connect(self.concluida)
+        fila.sinais.falhou.connect(self.falhou)
+
+    def _atualizar_progresso(self):
+        self.progresso.setRange(0, max(self.total, 1))
+        self.progresso.setValue(self.prontas)
+
+    def adicionada(self, id_tarefa, output_path):
+        item = QListWidgetItem(f"⏳ {os.path.basename(output_path)}")
+        item.setData(PAPEL_CAMINHO, output_path)
+        item.setData(PAPEL_ESTADO, "fila")
+        self.lista.insertItem(0, item)
+        self.itens[id_tarefa] = item
+        self.total += 1
+        self._atualizar_progresso()
+
+    def iniciada(self, id_tarefa):
+        item = self.itens[id_tarefa]
+        item.setText(f"⚙ Gerando {os.path.basename(item.data(PAPEL_CAMINHO))}…")
+        item.setData(PAPEL_ESTADO, "gerando")
+
+    def concluida(self, id_tarefa, output_path, segundos):
+        item = self.itens[id_tarefa]
+        item.setText(f"✔ {os.path.basename(output_path)}  ({segundos:.1f}s)")
+        item.setData(PAPEL_ESTADO, "pronta")
+        self.prontas += 1
+        self._atualizar_progresso()
+
+    def falhou(self, id_tarefa, erro):
+        item = self.itens[id_tarefa]
+        item.setText(f"✖ {os.path.basename(item.data(PAPEL_CAMINHO))}: {erro}")
+        item.setToolTip(erro)
+        item.setData(PAPEL_ESTADO, "erro")
+        self.prontas += 1
+        self._atualizar_progresso()
+
+    def _pronto(self, item):
+        return item is not None and item.data(PAPEL_ESTADO) == "pronta"
+
+    def _abrir_item(self, item):
+        if self._pronto(item):
+            abrir_pdf(item.data(PAPEL_CAMINHO))
+
+    def _prontas(self, itens):
+        # Caminhos na ordem em que foram enviadas (a lista mostra a mais nova no topo)
+        itens = sorted(itens, key=self.lista.row, reverse=True)
+        return [i.data(PAPEL_CAMINHO) for i in itens if self._pronto(i)]
+
+    def _menu_item(self, pos):
+        item = self.lista.itemAt(pos)
+        if not self._pronto(item):
+            return
+        selecionadas = self._prontas(self.lista.selectedItems()) or [item.data(PAPEL_CAMINHO)]
+        todas = self._prontas([self.lista.item(i) for i in range(self.lista.count())])
+        menu = QMenu()
+        visualizar_acao = menu.addAction("Visualizar PDF")
+        if len(selecionadas) > 1:
+            imprimir_acao = menu.addAction(f"Imprimir {len(selecionadas)} PDFs (um trabalho)")
+        else:
+            imprimir_acao = menu.addAction("Imprimir PDF")
+        todas_acao = menu.addAction(f"Imprimir todas as prontas ({len(todas)})") if len(todas) > 1 else None
+        acao = menu.exec(self.lista.mapToGlobal(pos))
+        if acao == visualizar_acao:
+            abrir_pdf(item.data(PAPEL_CAMINHO))
+        elif acao == imprimir_acao:
+            self.imprimir(selecionadas)
+        elif acao is not None and acao == todas_acao:
+            self.imprimir(todas)
+
+    def imprimir(self, caminhos):
+        # Um trabalho com todos os PDFs; o andamento aparece abaixo da lista
+        if self._impressao is None:
+            self._impressao = FilaImpressao(OUTPUT_DIR, os.environ.get("GEPROP_IMPRESSORA"),
+                                            avisar=self.impressao_mudou.emit)
+        return self._impressao.imprimir(caminhos)
+
+    def _impressao_mudou(self, trabalho):
+        self.estado_impressao.setText(f"🖨 {trabalho.descricao()}")
+        self.estado_impressao.setToolTip(trabalho.erro)
+        self.estado_impressao.show()
+        if trabalho.estado == ENVIADO:
+            self.consulta_spooler.start()
+
+    def _consultar_spooler(self):
+        if not any(t.estado == ENVIADO for t in self._impressao.trabalhos):
+            self.consulta_spooler.stop()
+            return
+        # lpstat pode demorar: fora da thread da janela
+        threading.Thread(target=self._impressao.atualizar, daemon=True).start()
@@ -0,0 +1,642 @@
+# formulario.py
+# Formulário da janela montado a partir dos mapeamentos (TIPOS_PROPOSTA em
+# preencher.py), sem código de interface por template.
+#
+# esquema(tipo) descreve os campos de um tipo de proposta, em seções, na
+# ordem do MAPPING. O tipo de cada campo (data, telefone, lista editável,
+# preço...) vem de CAMPOS, pelo rótulo sem o número do grupo ("Preço 2" ->
+# "Preço"); o que não estiver lá é texto simples.
+#
+# Formulario mostra o tipo e os dados do cliente (iguais em todos os tipos)
+# e, abaixo, um QStackedWidget com uma página por tipo. A página é montada
+# na primeira vez que o tipo é escolhido e fica guardada: trocar de tipo só
+# troca a página visível (e copia os valores dos campos em comum).
+#
+# Cada grupo da proposta começa com a busca no catálogo de equipamentos
+# (catalogo.py): escolher um painel, inversor ou estrutura preenche a
+# potência, as linhas de inversores ou a estrutura e, se o catálogo tiver
+# preços, sugere o "Preço dos Equipamentos" (proposta com mão de obra).
+
+import re
+from collections import Counter
+from datetime import date
+from functools import lru_cache
+
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QIntValidator, QStandardItem, QStandardItemModel
+from PyQt6.QtWidgets import (QComboBox, QCompleter, QFormLayout, QInputDialog, QLabel,
+                             QLineEdit, QMenu, QMessageBox, QSizePolicy, QStackedWidget, QStyle,
+                             QVBoxLayout, QWidget)
+
+from dinheiro import calcular_totais, soma
+from mascaras import ValidadorData, ValidadorPreco, ValidadorTelefone, valor_aceito
+from preencher import TIPOS_PROPOSTA, TOTAIS, PrecoInvalido, normalize_price
+
+# Rótulo (sem o número do grupo) -> como o campo é montado e lido
+#   tipo: texto | data | telefone | lista | inversores | preco | total | producao
+#         | catalogo
+CAMPOS = {
+    "Data": {"tipo": "data"},
+    "Telefone": {"tipo": "telefone"},
+    "Logradouro": {"tipo": "lista", "lista": "logradouros", "padrao": "RUA"},
+    "Estado": {"tipo": "lista", "lista": "estados", "padrao": "MG"},
+    "Cidade": {"padrao": "NOVA SERRANA"},
+    "Consultor": {"tipo": "lista", "lista": "consultores", "padrao_config": "ultimo_consultor"},
+    "Estrutura Para": {"tipo": "lista", "lista": "estruturas", "padrao": "TELHADO METÁLICO"},
+    "Potência Inversor 1 (W)": {"tipo": "inversores", "quantidade": "Quantidade de Inversores"},
+    "Preço": {"tipo": "preco"},
+    "Preço dos Equipamentos": {"tipo": "preco"},
+    "Preço da Mão de Obra": {"tipo": "preco"},
+    "Preço Total": {"tipo": "total", "parcelas": TOTAIS["Preço Total"]},
+    "Produção Média Mensal": {"tipo": "producao", "paineis": "Quantidade de Painéis",
+                              "potencia": "Potência dos Painéis (W)", "estrutura": "Estrutura Para"},
+    "Equipamento": {"tipo": "catalogo", "paineis": "Quantidade de Painéis",
+                    "potencia": "Potência dos Painéis (W)", "inversores": "Potência Inversor 1 (W)",
+                    "estrutura": "Estrutura Para", "preco": "Preço dos Equipamentos"},
+}
+
+# Tipo de campo -> (validador, tamanho máximo)
+VALIDADORES = {
+    "data": (ValidadorData, 10),
+    "telefone": (ValidadorTelefone, 14),
+    "preco": (ValidadorPreco, None),
+    "total": (ValidadorPreco, None),
+}
+
+# Campos fora do MAPPING, inseridos logo depois de outro campo
+EXTRAS = {"Endereço": "Número"}
+
+# Máximo de linhas de potência por grupo de inversores
+MAX_INVERSORES = 50
+
+# Primeiro campo dos dados da proposta; os anteriores são do cliente
+INICIO_PROPOSTA = "Quantidade de Painéis"
+
+# Busca no catálogo de equipamentos, fora do MAPPING, no começo de cada grupo
+CATALOGO = "Equipamento"
+
+# Listas editáveis (json/*.json via configuracoes.py): textos dos diálogos
+LISTAS = {
+    "logradouros": {"item": "Logradouro", "artigo": "o", "novo": ("Novo Logradouro", "Tipo de logradouro:"),
+                    "editar": "Novo tipo de logradouro:"},
+    "estados": {"item": "Estado", "artigo": "o", "novo": ("Novo Estado", "Sigla do estado:"),
+                "editar": "Nova sigla do estado:"},
+    "consultores": {"item": "Consultor", "artigo": "o", "novo": ("Novo Consultor", "Nome do consultor:"),
+                    "editar": "Novo nome do consultor:"},
+    "estruturas": {"item": "Estrutura", "artigo": "a", "novo": ("Nova Estrutura", "Tipo de estrutura:"),
+                   "editar": "Nova estrutura:"},
+}
+
+_GRUPO = re.compile(r"^(.*\S) (\d+)$")
+
+
+class Campo:
+    # Um campo do formulário: chave em `dados` e como é montado
+    __slots__ = ("chave", "rotulo", "grupo", "tipo", "opcoes")
+
+    def __init__(self, chave, rotulo, grupo, opcoes):
+        self.chave = chave
+        self.rotulo = rotulo
+        self.grupo = grupo
+        self.opcoes = opcoes
+        self.tipo = opcoes.get("tipo", "texto")
+
+    def chave_de(self, rotulo):
+        # Outro campo do mesmo grupo ("Quantidade de Inversores" -> "... 2")
+        return rotulo if self.grupo == 1 else f"{rotulo} {self.grupo}"
+
+    def __repr__(self):
+        return f"Campo({self.chave!r}, {self.tipo})"
+
+
+class Secao:
+    __slots__ = ("titulo", "campos")
+
+    def __init__(self, titulo, campos):
+        self.titulo = titulo
+        self.campos = campos
+
+
+def _rotulo_e_grupo(chave):
+    # "Preço 2" -> ("Preço", 2) se "Preço" existir sem número em algum
+    # mapeamento; "Potência Inversor 1 (W)" -> (o próprio rótulo, 1)
+    m = _GRUPO.match(chave)
+    if m and any(m.group(1) in mapping for _, mapping in TIPOS_PROPOSTA.values()):
+        return m.group(1), int(m.group(2))
+    return chave, 1
+
+
+@lru_cache(maxsize=None)
+def esquema(tipo):
+    # [Secao] do tipo: cliente e um grupo de proposta por número
+    _, mapping = TIPOS_PROPOSTA[tipo]
+    # Rótulo cuja célula é reaproveitada por um rótulo seguinte (o "Preço"
+    # herdado do MAPPING_00001 na proposta 3) não aparece: o valor seria
+    # sobrescrito
+    ultimo = {celula: chave for chave, celula in mapping.items()}
+    cliente, grupos = [], {}
+    na_proposta = False
+    for chave, celula in mapping.items():
+        if ultimo[celula] != chave:
+            continue
+        rotulo, grupo = _rotulo_e_grupo(chave)
+        na_proposta = na_proposta or rotulo == INICIO_PROPOSTA
+        if rotulo == INICIO_PROPOSTA:
+            chave_busca = CATALOGO if grupo == 1 else f"{CATALOGO} {grupo}"
+            grupos.setdefault(grupo, []).append(Campo(chave_busca, CATALOGO, grupo, CAMPOS[CATALOGO]))
+        campo = Campo(chave, rotulo, grupo, CAMPOS.get(rotulo, {}))
+        (grupos.setdefault(grupo, []) if na_proposta else cliente).append(campo)
+        if chave in EXTRAS:
+            cliente.append(Campo(EXTRAS[chave], EXTRAS[chave], 1, {}))
+    secoes = [Secao("DADOS DO CLIENTE", cliente)]
+    for grupo, campos in sorted(grupos.items()):
+        titulo = "DADOS DA PROPOSTA" if len(grupos) == 1 else f"DADOS DA PROPOSTA {grupo}"
+        secoes.append(Secao(titulo, campos))
+    return secoes
+
+
+def texto_inversores(valores):
+    # ["5000", "5000", "3000"] -> "3000 LV E 2 de 5000 LV"
+    contagem = Counter(v.strip().replace(',', '.') for v in valores if v.strip())
+    partes = [f"{qtd} de {val} LV" if qtd > 1 else f"{val} LV"
+              for val, qtd in sorted(contagem.items(), key=lambda x: float(x[0]))]
+    if not partes:
+        return ""
+    if len(partes) == 1:
+        return partes[0]
+    return ", ".join(partes[:-1]) + " E " + partes[-1]
+
+
+class ListasEditaveis:
+    # Combos das listas (consultores, estruturas...): o primeiro item adiciona
+    # um valor novo e o menu de contexto edita/exclui. Todos os combos da
+    # mesma lista, em qualquer página, são atualizados juntos.
+    def __init__(self, janela, config):
+        self.janela = janela
+        self.config = config
+        self.combos = {nome: [] for nome in LISTAS}
+
+    def _adicionar_item(self, nome):
+        return f"Adicionar {LISTAS[nome]['item']}"
+
+    def criar(self, nome, padrao=None):
+        itens = self.config.obter(nome)
+        combo = QComboBox()
+        combo.setEditable(False)
+        combo.addItem(self._adicionar_item(nome))
+        combo.addItems(itens)
+        if padrao and padrao in itens:
+            combo.setCurrentText(padrao)
+        else:
+            combo.setCurrentText(itens[0] if itens else self._adicionar_item(nome))
+        combo.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        combo.customContextMenuRequested.connect(lambda pos: self._menu(nome, combo, pos))
+        combo.currentTextChanged.connect(lambda texto: self._escolhido(nome, combo, texto))
+        self.combos[nome].append(combo)
+        return combo
+
+    def _recarregar(self, nome, combo, selecionado):
+        # Recarrega todos os combos da lista; os outros mantêm a seleção
+        itens = self.config.obter(nome)
+        for outro in self.combos[nome]:
+            atual = selecionado if outro is combo else outro.currentText()
+            outro.blockSignals(True)
+            outro.clear()
+            outro.addItem(self._adicionar_item(nome))
+            outro.addItems(itens)
+            if atual in itens:
+                outro.setCurrentText(atual)
+            else:
+                outro.setCurrentText(itens[0] if itens else self._adicionar_item(nome))
+            outro.blockSignals(False)
+
+    def _escolhido(self, nome, combo, texto):
+        if texto != self._adicionar_item(nome):
+            return
+        titulo, pergunta = LISTAS[nome]["novo"]
+        novo, ok = QInputDialog.getText(self.janela, titulo, pergunta)
+        if ok and novo.strip():
+            novo = novo.strip().upper()
+            itens = self.config.obter(nome)
+            if novo not in itens:
+                itens.append(novo)
+                self.config.salvar(nome)
+                self._recarregar(nome, combo, novo)
+
+    def _menu(self, nome, combo, pos):
+        textos = LISTAS[nome]
+        atual = combo.currentText()
+        if atual == self._adicionar_item(nome):
+            return
+        menu = QMenu()
+        editar_acao = menu.addAction(f"Editar {textos['item']}")
+        excluir_acao = menu.addAction(f"Excluir {textos['item']}")
+        acao = menu.exec(combo.mapToGlobal(pos))
+        itens = self.config.obter(nome)
+
+        if acao == editar_acao:
+            novo_nome, ok = QInputDialog.getText(
+                self.janela, f"Editar {textos['item']}", textos["editar"], text=atual
+            )
+            if ok and novo_nome.strip():
+                novo_nome = novo_nome.strip().upper()
+                if novo_nome != atual:
+                    itens.remove(atual)
+                    itens.append(novo_nome)
+                    self.config.salvar(nome)
+                    self._recarregar(nome, combo, novo_nome)
+        elif acao == excluir_acao:
+            resposta = QMessageBox.question(
+                self.janela,
+                "Confirmar Exclusão",
+                f"Tem certeza que deseja excluir {textos['artigo']} {textos['item'].lower()} {atual}?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if resposta == QMessageBox.StandardButton.Yes:
+                itens.remove(atual)
+                self.config.salvar(nome)
+                self._recarregar(nome, combo, None)
+
+
+class LinhasInversores:
+    # Uma linha "Potência do Inversor N (W)" por inversor, logo abaixo do
+    # campo de quantidade. As linhas criadas ficam guardadas: aumentar a
+    # quantidade só cria as que faltam, diminuir só esconde as do fim, e o
+    # que já foi digitado nelas volta se a quantidade aumentar de novo.
+    def __init__(self, form, campo_quantidade, limite=MAX_INVERSORES):
+        self.form = form
+        self.campo_quantidade = campo_quantidade
+        self.limite = limite
+        self.campos = []      # QLineEdit de cada linha criada, na ordem
+        self.visiveis = 0
+        campo_quantidade.setValidator(QIntValidator(0, limite, campo_quantidade))
+        campo_quantidade.setToolTip(f"Até {limite} inversores")
+        campo_quantidade.textChanged.connect(self.atualizar)
+
+    def atualizar(self, text):
+        try:
+            quantidade = min(int(text) if text else 0, self.limite)
+        except ValueError:
+            return
+        # As linhas ocupam as posições logo abaixo da quantidade, pelo índice
+        inicio = self.form.getWidgetPosition(self.campo_quantidade)[0] + 1
+        while len(self.campos) < quantidade:
+            i = len(self.campos)
+            campo = QLineEdit()
+            self.form.insertRow(inicio + i, Pagina.rotulo(f"Potência do Inversor {i+1} (W)"), campo)
+            self.campos.append(campo)
+        for i in range(min(self.visiveis, quantidade), max(self.visiveis, quantidade)):
+            self.form.setRowVisible(inicio + i, i < quantidade)
+        self.visiveis = quantidade
+
+    def valores(self):
+        return [campo.text() for campo in self.campos[:self.visiveis]]
+
+    def definir(self, valores):
+        for campo, valor in zip(self.campos, valores):
+            campo.setText(valor)
+
+
+class BuscaCatalogo:
+    # Sugestões do catálogo (catalogo.py) num campo de texto. A lista do
+    # QCompleter é refeita a cada tecla pela busca do índice (por prefixo,
+    # com erro de digitação) e mostrada como veio, sem o filtro do Qt;
+    # escolher um item chama escolhido(item) e limpa a busca.
+    def __init__(self, campo, escolhido):
+        self.campo = campo
+        self.escolhido = escolhido
+        self.itens = {}
+        self.modelo = QStandardItemModel(campo)
+        self.completer = QCompleter(self.modelo, campo)
+        self.completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        campo.setCompleter(self.completer)
+        campo.setPlaceholderText("Fabricante, modelo ou potência do painel, inversor ou estrutura")
+        campo.textEdited.connect(self.buscar)
+        self.completer.activated[str].connect(self._escolher)
+
+    def buscar(self, texto):
+        try:
+            # o catálogo só é lido quando alguém digita aqui
+            from catalogo import obter_catalogo
+            itens = obter_catalogo().buscar(texto)
+        except (OSError, ValueError):
+            itens = []
+        self.itens = {item.rotulo: item for item in itens}
+        self.modelo.clear()
+        for item in itens:
+            linha = QStandardItem(item.rotulo)
+            linha.setToolTip(item.descricao())
+            self.modelo.appendRow(linha)
+        if itens:
+            self.completer.complete()
+        else:
+            self.completer.popup().hide()
+
+    def _escolher(self, rotulo):
+        item = self.itens.get(rotulo)
+        if item is not None:
+            self.escolhido(item)
+            # depois que o QLineEdit copiar o texto escolhido
+            QTimer.singleShot(0, self.campo.clear)
+
+
+class Pagina(QWidget):
+    # Campos de uma lista de seções num QFormLayout; self.campos: chave -> widget
+    largura_rotulo = 0   # mesma coluna de rótulos em todas as páginas
+
+    def __init__(self, secoes, listas, padroes, parent=None):
+        super().__init__(parent)
+        self.form = QFormLayout(self)
+        self.form.setContentsMargins(0, 0, 0, 0)
+        self.campos = {}
+        self.esquema = {}
+        self.subtitulos = []
+        for secao in secoes:
+            if not secao.campos:
+                continue
+            self.form.addRow(QLabel())
+            subtitulo = QLabel(f"<b>{secao.titulo}</b>")
+            self.subtitulos.append(subtitulo)
+            self.form.addRow(subtitulo, QLabel())
+            for campo in secao.campos:
+                widget = self._criar(campo, listas, padroes)
+                self.esquema[campo.chave] = campo
+                self.campos[campo.chave] = widget
+                if isinstance(widget, QWidget):
+                    self.form.addRow(self.rotulo(campo.rotulo), widget)
+        # Produção estimada (producao.py) como sugestão no campo, que só vai
+        # para a proposta se for aceita; cidade e estado vêm de fora da
+        # página, por self.local()
+        self.local = None
+        self.producao = []
+        self.estimadas = {}
+        self.aceitar = {}
+        # Equipamentos escolhidos no catálogo, por campo de busca, e o preço
+        # sugerido a partir deles (mantido enquanto não for digitado à mão)
+        self.buscas = {}
+        self.escolhas = {}
+        self.sugeridos = {}
+        for campo in self.esquema.values():
+            if campo.tipo == "total":
+                parcelas = [self.campos[campo.chave_de(p)] for p in campo.opcoes["parcelas"]]
+                for parcela in parcelas:
+                    parcela.textChanged.connect(
+                        lambda _, total=self.campos[campo.chave], parcelas=parcelas: self._somar(total, parcelas))
+            elif campo.tipo == "producao":
+                self.producao.append(campo)
+                widget = self.campos[campo.chave]
+                acao = widget.addAction(self.style().standardIcon(QStyle.StandardPixmap.SP_DialogApplyButton),
+                                        QLineEdit.ActionPosition.TrailingPosition)
+                acao.setVisible(False)
+                acao.triggered.connect(lambda _=False, campo=campo: self.aceitar_estimativa(campo))
+                self.aceitar[campo.chave] = acao
+                widget.textChanged.connect(lambda _, campo=campo: self._mostrar_aceitar(campo))
+                for chave in ("paineis", "potencia", "estrutura"):
+                    widget = self.campos[campo.chave_de(campo.opcoes[chave])]
+                    sinal = widget.currentTextChanged if isinstance(widget, QComboBox) else widget.textChanged
+                    sinal.connect(lambda _: self.estimar_producao())
+            elif campo.tipo == "catalogo":
+                self.buscas[campo.chave] = BuscaCatalogo(
+                    self.campos[campo.chave], lambda item, campo=campo: self.escolher(campo, item))
+                for chave in ("paineis", "inversores"):
+                    widget = self.campos[campo.chave_de(campo.opcoes[chave])]
+                    if isinstance(widget, LinhasInversores):
+                        widget = widget.campo_quantidade
+                    widget.textChanged.connect(lambda _, campo=campo: self.precificar(campo))
+
+    @classmethod
+    def rotulo(cls, texto):
+        label = QLabel(texto)
+        label.setMinimumWidth(cls.largura_rotulo)
+        return label
+
+    def _criar(self, campo, listas, padroes):
+        opcoes = campo.opcoes
+        if campo.tipo == "lista":
+            padrao = padroes.get(opcoes.get("padrao_config")) or opcoes.get("padrao")
+            return listas.criar(opcoes["lista"], padrao)
+        if campo.tipo == "inversores":
+            return LinhasInversores(self.form, self.campos[campo.chave_de(opcoes["quantidade"])])
+        widget = QLineEdit(padroes.get(campo.chave) or opcoes.get("padrao", ""))
+        if campo.tipo in VALIDADORES:
+            validador, tamanho = VALIDADORES[campo.tipo]
+            widget.setValidator(validador(widget))
+            if tamanho:
+                widget.setMaxLength(tamanho)
+        return widget
+
+    @staticmethod
+    def _somar(total, parcelas):
+        try:
+            valor = soma(p.text() for p in parcelas)
+        except PrecoInvalido:
+            return
+        total.setText(str(valor))
+
+    def estimar_producao(self):
+        # A irradiação de json/irradiacao.json é de referência: a estimativa
+        # aparece no campo vazio e no botão ✓, e quem aceita é o usuário
+        cidade, estado = self.local() if self.local is not None else ("", "")
+        for campo in self.producao:
+            widget = self.campos[campo.chave]
+            opcoes = campo.opcoes
+            paineis = self.valor(campo.chave_de(opcoes["paineis"]))
+            potencia = self.valor(campo.chave_de(opcoes["potencia"]))
+            kwh = None
+            if paineis.strip() and potencia.strip():
+                # numpy e a tabela só são carregados quando há o que estimar
+                from producao import estimar
+                kwh = estimar(paineis, potencia, cidade, estado, self.valor(campo.chave_de(opcoes["estrutura"])))
+            texto = "" if kwh is None else str(kwh)
+            self.estimadas[campo.chave] = texto
+            widget.setPlaceholderText(f"Estimativa: {texto} kWh/mês" if texto else "")
+            self.aceitar[campo.chave].setToolTip(
+                f"Usar a estimativa de {texto} kWh/mês (irradiação média de referência; confira)")
+            self._mostrar_aceitar(campo)
+
+    def _mostrar_aceitar(self, campo):
+        estimada = self.estimadas.get(campo.chave)
+        self.aceitar[campo.chave].setVisible(bool(estimada) and self.campos[campo.chave].text() != estimada)
+
+    def aceitar_estimativa(self, campo):
+        self.campos[campo.chave].setText(self.estimadas.get(campo.chave, ""))
+
+    def escolher(self, campo, item):
+        # Equipamento escolhido no catálogo: preenche a potência (ou a
+        # estrutura) do grupo e refaz o preço dos equipamentos
+        opcoes = campo.opcoes
+        escolhas = self.escolhas.setdefault(campo.chave, {"inversores": {}})
+        if item.categoria == "paineis":
+            escolhas["painel"] = item
+            self.campos[campo.chave_de(opcoes["potencia"])].setText(str(item.potencia))
+        elif item.categoria == "inversores":
+            # primeira linha de inversor em branco, ou uma linha a mais
+            linhas = self.campos[campo.chave_de(opcoes["inversores"])]
+            valores = linhas.valores()
+            livre = next((i for i, v in enumerate(valores) if not v.strip()), len(valores))
+            if livre >= linhas.limite:
+                return
+            if livre == len(valores):
+                linhas.campo_quantidade.setText(str(livre + 1))
+            escolhas["inversores"][livre] = item
+            linhas.campos[livre].setText(str(item.potencia))
+        else:
+            escolhas["estrutura"] = item
+            combo = self.campos[campo.chave_de(opcoes["estrutura"])]
+            if combo.findText(item.tipo) >= 0:
+                combo.setCurrentText(item.tipo)
+        self.precificar(campo)
+
+    def precificar(self, campo):
+        # Preço dos equipamentos escolhidos (painéis × quantidade, inversores
+        # ainda nas suas linhas, estrutura por painel) em "Preço dos
+        # Equipamentos", se o template tiver esse campo e ele estiver vazio ou
+        # com a sugestão anterior. "Preço" (o valor da proposta) nunca é
+        # tocado, e sem preço de distribuidor no catálogo não há sugestão.
+        escolhas = self.escolhas.get(campo.chave)
+        opcoes = campo.opcoes
+        alvo = campo.chave_de(opcoes["preco"])
+        if not escolhas or alvo not in self.campos:
+            return
+        widget = self.campos[alvo]
+        if widget.text() not in ("", self.sugeridos.get(alvo)):
+            return  # digitado à mão
+        valores = self.valor(campo.chave_de(opcoes["inversores"]))
+        inversores = [item for i, item in escolhas["inversores"].items()
+                      if i < len(valores) and valores[i].strip() == str(item.potencia)]
+        paineis = self.valor(campo.chave_de(opcoes["paineis"])).strip()
+        from catalogo import preco_equipamentos
+        preco = preco_equipamentos(escolhas.get("painel"), int(paineis) if paineis.isdigit() else 0,
+                                   inversores, escolhas.get("estrutura"))
+        texto = "" if preco is None else str(preco)
+        self.sugeridos[alvo] = texto
+        widget.setText(texto)
+
+    def valor(self, chave):
+        # Valor como está na tela (para copiar entre páginas)
+        widget = self.campos[chave]
+        if isinstance(widget, QComboBox):
+            return widget.currentText()
+        if isinstance(widget, LinhasInversores):
+            return widget.valores()
+        return widget.text()
+
+    def definir(self, chave, valor):
+        widget = self.campos[chave]
+        if isinstance(widget, QComboBox):
+            widget.setCurrentText(valor)
+        elif isinstance(widget, LinhasInversores):
+            widget.definir(valor)
+        else:
+            widget.setText(valor)
+
+    def coletar(self, dados):
+        # Campo com validador só passa completo: "12/0" ou "1.2345" não chegam
+        # ao PDF
+        for chave, campo in self.esquema.items():
+            if campo.tipo == "catalogo":
+                continue  # só ajuda a preencher os outros campos
+            valor = self.valor(chave)
+            if campo.tipo in VALIDADORES and not valor_aceito(self.campos[chave]):
+                raise ValueError(f"Valor inválido em {campo.rotulo}: {valor}")
+            if campo.tipo == "lista":
+                dados[chave] = valor
+            elif campo.tipo == "inversores":
+                dados[chave] = texto_inversores(valor)
+            elif campo.tipo in ("preco", "total"):
+                dados[chave] = normalize_price(valor)
+            else:
+                valor = valor.strip().upper()
+                if campo.tipo == "data" and not valor:
+                    valor = date.today().strftime("%d/%m/%Y")
+                dados[chave] = valor
+        return calcular_totais(dados)
+
+
+class Formulario(QWidget):
+    # Tipo + dados do cliente (fixos) e uma página guardada por tipo
+    def __init__(self, janela, config, numero_sugerido, parent=None):
+        super().__init__(parent)
+        self.listas = ListasEditaveis(janela, config)
+        self.padroes = {
+            "Data": date.today().strftime("%d/%m/%Y"),
+            "N° da Proposta": numero_sugerido,
+            "ultimo_consultor": config.obter("ultimo_consultor"),
+        }
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        tipos = list(TIPOS_PROPOSTA)
+        rotulos = {c.rotulo for t in tipos for s in esquema(t) for c in s.campos}
+        rotulos.add("Potência do Inversor 99 (W)")
+        Pagina.largura_rotulo = max(self.fontMetrics().horizontalAdvance(r) for r in rotulos) + 8
+        self.combo_tipo = QComboBox()
+        self.combo_tipo.setEditable(False)
+        self.combo_tipo.addItems(tipos)
+        topo = QFormLayout()
+        topo.addRow(Pagina.rotulo("Tipo de Proposta"), self.combo_tipo)
+        layout.addLayout(topo)
+
+        # Dados do cliente: iguais em todos os tipos, ficam fora das páginas
+        secoes = esquema(tipos[0])
+        self.cliente = Pagina(secoes[:1], self.listas, self.padroes)
+        layout.addWidget(self.cliente)
+
+        self.paginas = {}
+        self.pilha = QStackedWidget()
+        layout.addWidget(self.pilha)
+        layout.addStretch()
+        self.combo_tipo.currentTextChanged.connect(self.mostrar_tipo)
+        self.mostrar_tipo(self.combo_tipo.currentText())
+        self.cliente.campos["Cidade"].textChanged.connect(lambda _: self.pagina().estimar_producao())
+        self.cliente.campos["Estado"].currentTextChanged.connect(lambda _: self.pagina().estimar_producao())
+
+    def tipo(self):
+        return self.combo_tipo.currentText()
+
+    def local(self):
+        # (cidade, estado) do cliente, para a estimativa de produção
+        return self.cliente.valor("Cidade"), self.cliente.valor("Estado")
+
+    def pagina(self, tipo=None):
+        tipo = tipo or self.tipo()
+        pagina = self.paginas.get(tipo)
+        if pagina is None:
+            secoes = list(esquema(tipo)[1:])
+            # campos de cliente que só este tipo tem
+            proprios = [c for c in esquema(tipo)[0].campos if c.chave not in self.cliente.campos]
+            if proprios:
+                secoes.insert(0, Secao("", proprios))
+            pagina = Pagina(secoes, self.listas, self.padroes)
+            pagina.local = self.local
+            self.paginas[tipo] = pagina
+            self.pilha.addWidget(pagina)
+        return pagina
+
+    def mostrar_tipo(self, tipo):
+        anterior = self.pilha.currentWidget()
+        pagina = self.pagina(tipo)
+        if anterior is not None and anterior is not pagina:
+            # leva o que já foi digitado nos campos em comum (na ordem da
+            # página: a quantidade de inversores antes das potências)
+            for chave in pagina.campos:
+                if chave in anterior.campos:
+                    pagina.definir(chave, anterior.valor(chave))
+            anterior.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        # a pilha só ocupa o tamanho da página visível
+        pagina.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Preferred)
+        self.pilha.setCurrentWidget(pagina)
+        self.pilha.adjustSize()
+
+    def campo(self, chave):
+        if chave in self.cliente.campos:
+            return self.cliente.campos[chave]
+        return self.pagina().campos[chave]
+
+    def coletar(self):
+        # (dados no formato dos MAPPING_*, número do endereço)
+        dados = {"Tipo de Proposta": self.tipo()}
+        self.cliente.coletar(dados)
+        self.pagina().coletar(dados)
+        numero_end = dados.pop("Número", "")
+        return dados, numero_end
@@ -0,0 +1,284 @@
+# impressao.py
+# Python ≥ 3.8  |  pip install pypdf
+#
+# Fila de impressão: várias propostas viram um único PDF e um único
+# trabalho no spooler do sistema, em vez de um diálogo por arquivo.
+#
+#   Linux/macOS  CUPS: `lp` envia, `lpstat` acompanha o trabalho
+#   Windows      verbo "print" do programa associado a PDFs; o estado vem
+#                do win32print quando o pywin32 está instalado
+#
+#   python impressao.py propostas/*.pdf --impressora HP_LaserJet --aguardar
+#
+# Os PDFs de um mesmo template repetem as imagens do fundo: ao juntar, os
+# objetos idênticos são guardados uma vez só, então o trabalho de 50
+# propostas fica pouco maior que o de uma. O arquivo juntado fica em
+# propostas/.impressao (o spooler do Windows o lê depois) e é apagado no
+# dia seguinte.
+
+import argparse
+import itertools
+import os
+import queue
+import re
+import subprocess
+import sys
+import threading
+import time
+
+from instrumentacao import etapa
+from preencher import OUTPUT_DIR
+from saida import gravacao_atomica
+
+PASTA_IMPRESSAO = ".impressao"
+PASSADAS_DEDUPLICACAO = 3
+
+# Estados de um trabalho
+NA_FILA = "na fila"
+JUNTANDO = "juntando"
+ENVIADO = "no spooler"
+IMPRESSO = "impresso"
+CANCELADO = "cancelado"
+ERRO = "erro"
+
+_ID_CUPS = re.compile(r"request id is (\S+)")
+
+
+class ErroImpressao(RuntimeError):
+    pass
+
+
+class Trabalho:
+    _ids = itertools.count(1)
+    __slots__ = ("id", "caminhos", "impressora", "titulo", "estado", "arquivo",
+                 "id_spooler", "paginas", "erro", "criado")
+
+    def __init__(self, caminhos, impressora=None, titulo=None):
+        self.id = next(Trabalho._ids)
+        self.caminhos = list(caminhos)
+        self.impressora = impressora or None
+        self.titulo = titulo or f"GeProp - {len(self.caminhos)} proposta(s)"
+        self.estado = NA_FILA
+        self.arquivo = None
+        self.id_spooler = None
+        self.paginas = 0
+        self.erro = ""
+        self.criado = time.time()
+
+    def descricao(self):
+        texto = f"Impressão {self.id}: {len(self.caminhos)} PDF(s), {self.estado}"
+        if self.id_spooler:
+            texto += f" ({self.id_spooler})"
+        return f"{texto}: {self.erro}" if self.erro else texto
+
+    def __repr__(self):
+        return f"Trabalho({self.id}, {self.estado!r}, {len(self.caminhos)} PDFs)"
+
+
+def juntar(caminhos, destino):
+    # Um PDF com as páginas de todos, na ordem; devolve o nº de páginas
+    from pypdf import PdfWriter
+
+    escritor = PdfWriter()
+    for caminho in caminhos:
+        escritor.append(caminho)
+    if hasattr(escritor, "compress_identical_objects"):  # pypdf ≥ 4.2
+        # cada passada junta um nível (máscara -> imagem -> recursos)
+        for _ in range(PASSADAS_DEDUPLICACAO):
+            escritor.compress_identical_objects()
+    with gravacao_atomica(destino) as temporario, open(temporario, "wb") as f:
+        escritor.write(f)
+    return len(escritor.pages)
+
+
+def _executar(comando):
+    try:
+        return subprocess.run(comando, capture_output=True, text=True, timeout=60)
+    except FileNotFoundError:
+        raise ErroImpressao(f"{comando[0]} não encontrado (o CUPS está instalado?)") from None
+    except subprocess.TimeoutExpired:
+        raise ErroImpressao(f"{comando[0]} não respondeu") from None
+
+
+def enviar(caminho, impressora=None, titulo=None):
+    # Entrega o PDF ao spooler; devolve o id do trabalho nele
+    if sys.platform == "win32":
+        if impressora:
+            import win32api
+            win32api.ShellExecute(0, "printto", caminho, f'"{impressora}"', ".", 0)
+        else:
+            os.startfile(caminho, "print")
+        return os.path.basename(caminho)
+    comando = ["lp"]
+    if impressora:
+        comando += ["-d", impressora]
+    if titulo:
+        comando += ["-t", titulo]
+    resultado = _executar(comando + ["--", caminho])
+    if resultado.returncode != 0:
+        raise ErroImpressao((resultado.stderr or resultado.stdout).strip() or "lp falhou")
+    encontrado = _ID_CUPS.search(resultado.stdout)
+    return encontrado.group(1) if encontrado else resultado.stdout.strip()
+
+
+def estado_spooler(id_spooler, impressora=None):
+    # ENVIADO, IMPRESSO, CANCELADO ou None se não dá para saber
+    if sys.platform == "win32":
+        try:
+            import win32print
+        except ImportError:
+            return None
+        nome = impressora or win32print.GetDefaultPrinter()
+        aberta = win32print.OpenPrinter(nome)
+        try:
+            trabalhos = win32print.EnumJobs(aberta, 0, -1, 1)
+        finally:
+            win32print.ClosePrinter(aberta)
+        pendente = any(id_spooler in (t.get("pDocument") or "") for t in trabalhos)
+        return ENVIADO if pendente else IMPRESSO
+    pendentes = _executar(["lpstat", "-W", "not-completed", "-o"])
+    if pendentes.returncode != 0:
+        return None
+    if any(linha.split(" ", 1)[0] == id_spooler for linha in pendentes.stdout.splitlines()):
+        return ENVIADO
+    concluidos = _executar(["lpstat", "-W", "completed", "-o"])
+    if any(linha.split(" ", 1)[0] == id_spooler for linha in concluidos.stdout.splitlines()):
+        return IMPRESSO
+    return CANCELADO
+
+
+def _arquivo_trabalho(pasta, trabalho):
+    return os.path.join(pasta, PASTA_IMPRESSAO,
+                        f"impressao_{time.strftime('%Y%m%d_%H%M%S')}_{trabalho.id}.pdf")
+
+
+def processar(trabalho, pasta=OUTPUT_DIR, avisar=None):
+    # Junta e envia; o estado vai sendo gravado no trabalho (e avisado)
+    def mudar(estado, **extra):
+        trabalho.estado = estado
+        for nome, valor in extra.items():
+            setattr(trabalho, nome, valor)
+        if avisar:
+            avisar(trabalho)
+
+    try:
+        if not trabalho.caminhos:
+            raise ErroImpressao("nenhum PDF para imprimir")
+        faltando = [c for c in trabalho.caminhos if not os.path.isfile(c)]
+        if faltando:
+            raise ErroImpressao(f"PDF não encontrado: {faltando[0]}")
+        mudar(JUNTANDO)
+        if len(trabalho.caminhos) == 1:
+            arquivo = trabalho.caminhos[0]
+        else:
+            arquivo = _arquivo_trabalho(pasta, trabalho)
+            with etapa("impressao.juntar", pdfs=len(trabalho.caminhos)):
+                trabalho.paginas = juntar(trabalho.caminhos, arquivo)
+        trabalho.arquivo = arquivo
+        with etapa("impressao.enviar"):
+            id_spooler = enviar(arquivo, trabalho.impressora, trabalho.titulo)
+        if arquivo not in trabalho.caminhos and sys.platform != "win32":
+            # o CUPS guarda a própria cópia ao aceitar o trabalho
+            os.remove(arquivo)
+        mudar(ENVIADO, id_spooler=id_spooler)
+    except Exception as e:
+        if trabalho.arquivo and trabalho.arquivo not in trabalho.caminhos:
+            # o spooler não aceitou o PDF juntado: ninguém mais vai lê-lo
+            try:
+                os.remove(trabalho.arquivo)
+            except OSError:
+                pass
+        mudar(ERRO, erro=str(e))
+    return trabalho
+
+
+def limpar(pasta=OUTPUT_DIR, idade=86400):
+    # PDFs juntados que o spooler já teve tempo de ler
+    limite = time.time() - idade
+    try:
+        entradas = list(os.scandir(os.path.join(pasta, PASTA_IMPRESSAO)))
+    except FileNotFoundError:
+        return
+    for entrada in entradas:
+        try:
+            if entrada.stat().st_mtime < limite:
+                os.remove(entrada.path)
+        except OSError:
+            pass
+
+
+class FilaImpressao:
+    # Trabalhos processados um de cada vez numa thread; avisar(trabalho) é
+    # chamado dessa thread a cada mudança de estado
+
+    def __init__(self, pasta=OUTPUT_DIR, impressora=None, avisar=None):
+        self.pasta = pasta
+        self.impressora = impressora
+        self.avisar = avisar
+        self.trabalhos = []
+        self._fila = queue.Queue()
+        self._thread = threading.Thread(target=self._trabalhar, daemon=True, name="impressao")
+        self._thread.start()
+
+    def imprimir(self, caminhos, titulo=None):
+        trabalho = Trabalho(caminhos, self.impressora, titulo)
+        self.trabalhos.append(trabalho)
+        if self.avisar:
+            self.avisar(trabalho)
+        self._fila.put(trabalho)
+        return trabalho
+
+    def _trabalhar(self):
+        limpar(self.pasta)
+        while True:
+            trabalho = self._fila.get()
+            if trabalho is None:
+                return
+            processar(trabalho, self.pasta, self.avisar)
+
+    def pendentes(self):
+        return [t for t in self.trabalhos if t.estado in (NA_FILA, JUNTANDO, ENVIADO)]
+
+    def atualizar(self):
+        # Consulta o spooler pelos trabalhos enviados; devolve os que mudaram
+        mudaram = []
+        for trabalho in self.trabalhos:
+            if trabalho.estado != ENVIADO:
+                continue
+            try:
+                estado = estado_spooler(trabalho.id_spooler, trabalho.impressora)
+            except ErroImpressao:
+                estado = None
+            if estado and estado != trabalho.estado:
+                trabalho.estado = estado
+                mudaram.append(trabalho)
+                if self.avisar:
+                    self.avisar(trabalho)
+        return mudaram
+
+    def encerrar(self, esperar=None):
+        self._fila.put(None)
+        self._thread.join(esperar)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Imprime vários PDFs de propostas num trabalho só.")
+    parser.add_argument("pdfs", nargs="+", help="PDFs na ordem de impressão")
+    parser.add_argument("--impressora", default=None, help="nome da impressora (padrão do sistema se omitido)")
+    parser.add_argument("--aguardar", action="store_true", help="acompanha o trabalho até sair do spooler")
+    args = parser.parse_args(argv)
+
+    trabalho = processar(Trabalho(args.pdfs, args.impressora), avisar=lambda t: print(t.descricao()))
+    while args.aguardar and trabalho.estado == ENVIADO:
+        time.sleep(2)
+        estado = estado_spooler(trabalho.id_spooler, trabalho.impressora)
+        if estado is None:
+            break
+        if estado != trabalho.estado:
+            trabalho.estado = estado
+            print(trabalho.descricao())
+    return 1 if trabalho.estado == ERRO else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
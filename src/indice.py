@@ -0,0 +1,330 @@
+# indice.py
+# Índice das propostas geradas, no mesmo banco SQLite da numeração
+# (banco.py). Cada PDF gerado grava uma linha com os dados completos da
+# proposta; a busca por cliente, consultor, cidade, período ou faixa de
+# preço é feita só no banco (FTS5 para o texto), sem abrir os PDFs.
+#
+#   python indice.py joão                      busca no texto
+#   python indice.py --consultor mateus --de 01/01/2025 --ate 31/03/2025
+#   python indice.py --preco-min 10000 --preco-max 20000
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+from banco import conectar
+from dinheiro import Dinheiro, valor_proposta
+from preencher import OUTPUT_DIR, ler_preco
+
+CAMPOS_TEXTO = ("Nome do Cliente", "Consultor", "Cidade", "Endereço", "Telefone")
+
+_ESQUEMA = (
+    "CREATE TABLE IF NOT EXISTS propostas ("
+    " id INTEGER PRIMARY KEY,"
+    " arquivo TEXT NOT NULL UNIQUE,"
+    " numero INTEGER,"
+    " tipo TEXT,"
+    " cliente TEXT,"
+    " consultor TEXT,"
+    " cidade TEXT,"
+    " estado TEXT,"
+    " data TEXT,"              # AAAA-MM-DD
+    " preco REAL,"
+    " paineis INTEGER,"
+    " dados TEXT,"             # JSON com todos os campos
+    " atualizado REAL)",
+    "CREATE INDEX IF NOT EXISTS propostas_data ON propostas (data)",
+    "CREATE INDEX IF NOT EXISTS propostas_preco ON propostas (preco)",
+    "CREATE INDEX IF NOT EXISTS propostas_consultor ON propostas (consultor)",
+    "CREATE INDEX IF NOT EXISTS propostas_numero ON propostas (numero)",
+)
+_FTS = ("CREATE VIRTUAL TABLE IF NOT EXISTS propostas_fts USING fts5("
+        "cliente, consultor, cidade, texto, tokenize='unicode61 remove_diacritics 2')")
+
+_tem_fts = {}
+
+
+def _preparar(conexao, pasta):
+    for sql in _ESQUEMA:
+        conexao.execute(sql)
+    if pasta not in _tem_fts:
+        try:
+            conexao.execute(_FTS)
+            _tem_fts[pasta] = True
+        except Exception:
+            # SQLite sem FTS5: a busca de texto cai para LIKE
+            _tem_fts[pasta] = False
+
+
+def _conectar(pasta):
+    conexao = conectar(pasta)
+    _preparar(conexao, pasta)
+    return conexao
+
+
+def _data_iso(texto):
+    # "31/12/2024" -> "2024-12-31" (None se não for uma data)
+    if not texto:
+        return None
+    for formato in ("%d/%m/%Y", "%Y-%m-%d", "%d/%m/%y"):
+        try:
+            return datetime.strptime(str(texto).strip(), formato).strftime("%Y-%m-%d")
+        except ValueError:
+            pass
+    return None
+
+
+def _numero(texto):
+    if texto is None or texto == "":
+        return None
+    try:
+        return float(ler_preco(texto))
+    except (TypeError, ValueError):
+        return None
+
+
+def _inteiro(texto):
+    valor = _numero(texto)
+    return int(valor) if valor is not None else None
+
+
+def _preco(dados):
+    # Preço total da proposta: soma das propostas da dupla, total da 3
+    try:
+        valor = valor_proposta(dados)
+    except (TypeError, ValueError):
+        return None
+    return float(valor) if valor is not None else None
+
+
+def numero_e_cliente(arquivo):
+    # "123PROPOSTA FULANO.pdf" -> (123, "FULANO")
+    nome = os.path.basename(arquivo)
+    m = re.match(r"^(\d+)PROPOSTA (.*)\.pdf$", nome, re.IGNORECASE)
+    if not m:
+        return None, os.path.splitext(nome)[0]
+    return int(m.group(1)), m.group(2)
+
+
+def _linha(dados, arquivo, tipo=None):
+    numero, cliente = numero_e_cliente(arquivo)
+    numero = _inteiro(dados.get("N° da Proposta")) or numero
+    cliente = dados.get("Nome do Cliente") or cliente
+    texto = " ".join(str(v) for k, v in dados.items() if v and k not in CAMPOS_TEXTO)
+    return {
+        "arquivo": os.path.basename(arquivo),
+        "numero": numero,
+        "tipo": tipo or dados.get("Tipo de Proposta"),
+        "cliente": cliente,
+        "consultor": dados.get("Consultor"),
+        "cidade": dados.get("Cidade"),
+        "estado": dados.get("Estado"),
+        "data": _data_iso(dados.get("Data")),
+        "preco": _preco(dados),
+        "paineis": _inteiro(dados.get("Quantidade de Painéis")),
+        "dados": json.dumps(dados, ensure_ascii=False),
+        "atualizado": time.time(),
+        "_texto": " ".join(filter(None, (texto, dados.get("Endereço"), dados.get("Telefone")))),
+    }
+
+
+def _gravar(conexao, linha, pasta, substituir=True):
+    # substituir=False: não mexe numa proposta que já está no índice
+    texto = linha.pop("_texto")
+    colunas = list(linha)
+    if substituir:
+        conflito = "DO UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in colunas if c != "arquivo")
+    else:
+        conflito = "DO NOTHING"
+    cursor = conexao.execute(
+        f"INSERT INTO propostas ({', '.join(colunas)}) VALUES ({', '.join('?' for _ in colunas)}) "
+        f"ON CONFLICT(arquivo) {conflito}",
+        [linha[c] for c in colunas])
+    if _tem_fts.get(pasta) and cursor.rowcount:
+        rowid = conexao.execute("SELECT id FROM propostas WHERE arquivo = ?", (linha["arquivo"],)).fetchone()[0]
+        conexao.execute("DELETE FROM propostas_fts WHERE rowid = ?", (rowid,))
+        conexao.execute(
+            "INSERT INTO propostas_fts (rowid, cliente, consultor, cidade, texto) VALUES (?, ?, ?, ?, ?)",
+            (rowid, linha["cliente"] or "", linha["consultor"] or "", linha["cidade"] or "", texto))
+
+
+def _transacao(pasta, funcao):
+    conexao = _conectar(pasta)
+    try:
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            resultado = funcao(conexao)
+        except Exception:
+            conexao.execute("ROLLBACK")
+            raise
+        conexao.execute("COMMIT")
+        return resultado
+    finally:
+        conexao.close()
+
+
+def registrar_proposta(dados, arquivo, tipo=None, pasta=None):
+    # Chamado depois que o PDF é gerado; a pasta padrão é a do próprio PDF
+    pasta = pasta or os.path.dirname(os.path.abspath(arquivo))
+    linha = _linha(dados, arquivo, tipo)
+    _transacao(pasta, lambda c: _gravar(c, linha, pasta))
+
+
+def registrar_varios(itens, pasta=OUTPUT_DIR):
+    # itens: [(dados, arquivo, tipo)] gravados numa transação só
+    linhas = [_linha(dados, arquivo, tipo) for dados, arquivo, tipo in itens]
+
+    def gravar(conexao):
+        for linha in linhas:
+            _gravar(conexao, linha, pasta)
+    _transacao(pasta, gravar)
+
+
+def registrar_arquivos(arquivos, pasta=OUTPUT_DIR):
+    # PDFs que apareceram na pasta sem passar pelo GeProp (copiados à mão):
+    # entram só com o número e o cliente tirados do nome do arquivo
+    linhas = []
+    for arquivo in arquivos:
+        numero, cliente = numero_e_cliente(arquivo)
+        linhas.append(_linha({"N° da Proposta": numero, "Nome do Cliente": cliente}, arquivo))
+
+    def gravar(conexao):
+        for linha in linhas:
+            _gravar(conexao, linha, pasta, substituir=False)
+    _transacao(pasta, gravar)
+
+
+def _apagar(conexao, nome, pasta):
+    linha = conexao.execute("SELECT id FROM propostas WHERE arquivo = ?", (nome,)).fetchone()
+    if linha is None:
+        return
+    conexao.execute("DELETE FROM propostas WHERE id = ?", linha)
+    if _tem_fts.get(pasta):
+        conexao.execute("DELETE FROM propostas_fts WHERE rowid = ?", linha)
+
+
+def remover(arquivos, pasta=OUTPUT_DIR):
+    nomes = [os.path.basename(a) for a in arquivos]
+
+    def apagar(conexao):
+        for nome in nomes:
+            _apagar(conexao, nome, pasta)
+    _transacao(pasta, apagar)
+
+
+def renomear(pares, pasta=OUTPUT_DIR):
+    # pares: [(nome antigo, nome novo)]. Os dados da proposta são mantidos;
+    # o número segue o novo nome quando ele tiver um.
+    pares = [(os.path.basename(a), os.path.basename(n)) for a, n in pares]
+
+    def mover(conexao):
+        sem_dados = []
+        for antigo, novo in pares:
+            if antigo == novo:
+                continue
+            _apagar(conexao, novo, pasta)
+            numero, _ = numero_e_cliente(novo)
+            cursor = conexao.execute(
+                "UPDATE propostas SET arquivo = ?, numero = COALESCE(?, numero), atualizado = ? WHERE arquivo = ?",
+                (novo, numero, time.time(), antigo))
+            if not cursor.rowcount:
+                sem_dados.append(novo)
+        return sem_dados
+    sem_dados = _transacao(pasta, mover)
+    if sem_dados:
+        registrar_arquivos(sem_dados, pasta)
+
+
+def arquivos_indexados(pasta=OUTPUT_DIR):
+    conexao = _conectar(pasta)
+    try:
+        return {nome for (nome,) in conexao.execute("SELECT arquivo FROM propostas")}
+    finally:
+        conexao.close()
+
+
+def _consulta_fts(texto):
+    # Cada palavra vira um prefixo: "jo silva" -> "jo"* "silva"*
+    palavras = re.findall(r"\w+", texto, re.UNICODE)
+    return " ".join(f'"{p}"*' for p in palavras)
+
+
+def buscar(texto=None, cliente=None, consultor=None, data_de=None, data_ate=None,
+           preco_min=None, preco_max=None, limite=100, pasta=OUTPUT_DIR):
+    # Devolve uma lista de dicts, mais recentes primeiro
+    condicoes, parametros = [], []
+    juncao = ""
+    if texto and texto.strip():
+        if _tem_fts.get(pasta) is None:
+            _conectar(pasta).close()
+        if _tem_fts.get(pasta):
+            juncao = "JOIN propostas_fts f ON f.rowid = p.id"
+            condicoes.append("propostas_fts MATCH ?")
+            parametros.append(_consulta_fts(texto))
+        else:
+            condicoes.append("(p.cliente LIKE ? OR p.consultor LIKE ? OR p.cidade LIKE ? OR p.dados LIKE ?)")
+            parametros.extend([f"%{texto.strip()}%"] * 4)
+    for coluna, valor in (("cliente", cliente), ("consultor", consultor)):
+        if valor:
+            condicoes.append(f"p.{coluna} LIKE ?")
+            parametros.append(f"%{valor.strip().upper()}%")
+    for operador, valor in ((">=", _data_iso(data_de)), ("<=", _data_iso(data_ate))):
+        if valor:
+            condicoes.append(f"p.data {operador} ?")
+            parametros.append(valor)
+    for operador, valor in ((">=", preco_min), ("<=", preco_max)):
+        if valor is not None:
+            condicoes.append(f"p.preco {operador} ?")
+            parametros.append(float(valor))
+    onde = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    sql = (f"SELECT p.numero, p.arquivo, p.tipo, p.cliente, p.consultor, p.cidade, p.estado, p.data, p.preco "
+           f"FROM propostas p {juncao} {onde} "
+           f"ORDER BY p.data DESC, p.numero DESC LIMIT ?")
+    parametros.append(int(limite))
+    conexao = _conectar(pasta)
+    try:
+        cursor = conexao.execute(sql, parametros)
+        colunas = [d[0] for d in cursor.description]
+        return [dict(zip(colunas, linha)) for linha in cursor]
+    finally:
+        conexao.close()
+
+
+def _data_br(iso):
+    return datetime.strptime(iso, "%Y-%m-%d").strftime("%d/%m/%Y") if iso else ""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Busca nas propostas geradas.")
+    parser.add_argument("texto", nargs="*", help="palavras a procurar (cliente, cidade, equipamentos...)")
+    parser.add_argument("--cliente")
+    parser.add_argument("--consultor")
+    parser.add_argument("--de", help="data inicial (dd/mm/aaaa)")
+    parser.add_argument("--ate", help="data final (dd/mm/aaaa)")
+    parser.add_argument("--preco-min", type=float)
+    parser.add_argument("--preco-max", type=float)
+    parser.add_argument("--limite", type=int, default=50)
+    parser.add_argument("--pasta", default=OUTPUT_DIR, help="pasta dos PDFs")
+    parser.add_argument("--json", action="store_true", help="saída em JSON")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    resultados = buscar(" ".join(args.texto), args.cliente, args.consultor, args.de, args.ate,
+                        args.preco_min, args.preco_max, args.limite, args.pasta)
+    segundos = time.perf_counter() - inicio
+    if args.json:
+        print(json.dumps(resultados, ensure_ascii=False, indent=2))
+        return 0
+    for r in resultados:
+        preco = f"{Dinheiro(r['preco']).brl:>15}" if r["preco"] is not None else " " * 15
+        print(f"{r['numero'] or '':>6}  {_data_br(r['data']):10}  {preco}  {r['consultor'] or '':20.20}  {r['arquivo']}")
+    print(f"{len(resultados)} proposta(s) em {segundos * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
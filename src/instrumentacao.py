@@ -0,0 +1,171 @@
+# instrumentacao.py
+# Medição do tempo de cada etapa da geração de uma proposta.
+#
+#   with etapa("excel.exportar", template=nome):
+#       wb.to_pdf(...)
+#
+# Cada etapa concluída vai para:
+#   - a memória (últimas MAX_MEMORIA por nome), usada por estatisticas() e
+#     pelo painel de tempos da janela;
+#   - um log JSON Lines rotativo em propostas/.etapas.jsonl
+#     (GEPROP_LOG_ETAPAS = outro caminho, ou 0 para desligar);
+#   - um arquivo no formato Chrome Trace (chrome://tracing, Perfetto),
+#     gravado ao sair se GEPROP_TRACE apontar para um caminho.
+#
+# Vários processos não dividem o mesmo arquivo (a rotação de um perderia ou
+# misturaria as linhas dos outros): os processos de trabalho do lote e do
+# serviço gravam em .etapas.<pid>.jsonl, apagados depois de IDADE_LOG_PROCESSO,
+# e só o processo principal grava o trace.
+
+import atexit
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+from preencher import OUTPUT_DIR
+
+MAX_MEMORIA = 500
+TAMANHO_LOG = 5 * 1024 * 1024
+LOG_PADRAO = os.path.join(OUTPUT_DIR, ".etapas.jsonl")
+IDADE_LOG_PROCESSO = 7 * 86400
+
+_lock = threading.Lock()
+_duracoes = {}        # nome -> deque de segundos
+_eventos = deque(maxlen=20000)   # para o Chrome Trace
+_log = None
+_configurado = False
+_ORIGEM = time.perf_counter()
+
+
+def _principal():
+    # Processo que abriu os outros (janela, lote.py, servico.py)
+    import multiprocessing
+    return multiprocessing.parent_process() is None
+
+
+def _do_processo(caminho, pid):
+    # ".etapas.jsonl" -> ".etapas.1234.jsonl"
+    base, extensao = os.path.splitext(caminho)
+    return f"{base}.{pid}{extensao}"
+
+
+def _limpar_logs_de_processos(caminho):
+    # Logs de processos de trabalho antigos, ao lado do principal
+    base, extensao = os.path.splitext(os.path.basename(caminho))
+    # ".etapas.1234.jsonl" e o backup da rotação, ".etapas.1234.jsonl.1"
+    nome = re.compile(rf"{re.escape(base)}\.\d+{re.escape(extensao)}(\.\d+)?")
+    limite = time.time() - IDADE_LOG_PROCESSO
+    try:
+        entradas = list(os.scandir(os.path.dirname(os.path.abspath(caminho))))
+    except OSError:
+        return
+    for entrada in entradas:
+        if nome.fullmatch(entrada.name):
+            try:
+                if entrada.stat().st_mtime < limite:
+                    os.remove(entrada.path)
+            except OSError:
+                pass
+
+
+def _configurar():
+    # Na primeira etapa: abre o log e registra a gravação do trace
+    global _log, _configurado
+    _configurado = True
+    principal = _principal()
+    caminho = os.environ.get("GEPROP_LOG_ETAPAS", LOG_PADRAO)
+    if caminho and caminho != "0":
+        if principal:
+            _limpar_logs_de_processos(caminho)
+        else:
+            caminho = _do_processo(caminho, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+            manipulador = RotatingFileHandler(caminho, maxBytes=TAMANHO_LOG, backupCount=1, encoding="utf-8")
+        except OSError:
+            manipulador = None
+        if manipulador is not None:
+            manipulador.setFormatter(logging.Formatter("%(message)s"))
+            _log = logging.getLogger("geprop.etapas")
+            _log.propagate = False
+            _log.setLevel(logging.INFO)
+            _log.addHandler(manipulador)
+    trace = os.environ.get("GEPROP_TRACE")
+    if trace and principal:
+        atexit.register(exportar_chrome_trace, trace)
+
+
+def _depois_do_fork():
+    # O filho de um fork herda o log aberto do pai e as etapas dele: começa
+    # do zero e abre o próprio log na primeira etapa
+    global _log, _configurado, _lock
+    _lock = threading.Lock()
+    if _log is not None:
+        for manipulador in list(_log.handlers):
+            _log.removeHandler(manipulador)
+    _log = None
+    _configurado = False
+    _duracoes.clear()
+    _eventos.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_depois_do_fork)
+
+
+def registrar(nome, inicio, duracao, atributos=None):
+    with _lock:
+        if not _configurado:
+            _configurar()
+        _duracoes.setdefault(nome, deque(maxlen=MAX_MEMORIA)).append(duracao)
+        _eventos.append((nome, inicio, duracao, threading.get_ident(), atributos))
+    if _log is not None:
+        registro = {"etapa": nome, "inicio": round(time.time() - duracao, 6), "ms": round(duracao * 1000, 3),
+                    "pid": os.getpid()}
+        if atributos:
+            registro.update(atributos)
+        _log.info(json.dumps(registro, ensure_ascii=False, default=str))
+
+
+@contextmanager
+def etapa(nome, **atributos):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(nome, inicio, time.perf_counter() - inicio, atributos)
+
+
+def percentil(ordenados, p):
+    # ordenados: lista já ordenada e não vazia
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def estatisticas():
+    # nome -> {"n", "p50_ms", "p95_ms"} das execuções guardadas em memória
+    with _lock:
+        copias = {nome: sorted(d) for nome, d in _duracoes.items() if d}
+    return {
+        nome: {"n": len(d), "p50_ms": percentil(d, 50) * 1000, "p95_ms": percentil(d, 95) * 1000}
+        for nome, d in sorted(copias.items())
+    }
+
+
+def exportar_chrome_trace(caminho):
+    with _lock:
+        eventos = list(_eventos)
+    pid = os.getpid()
+    trace = [
+        {"name": nome, "ph": "X", "ts": round((inicio - _ORIGEM) * 1e6, 1), "dur": round(duracao * 1e6, 1),
+         "pid": pid, "tid": tid, "args": atributos or {}}
+        for nome, inicio, duracao, tid, atributos in eventos
+    ]
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f, ensure_ascii=False, default=str)
+    return caminho
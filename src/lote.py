@@ -0,0 +1,232 @@
+# lote.py
+# Python ≥ 3.8  |  pip install openpyxl reportlab
+#
+# Geração de propostas em lote, sem interface:
+#
+#   python lote.py propostas.csv --processos 4
+#   python lote.py propostas.xlsx --saida propostas --manifesto manifesto.csv
+#   python lote.py propostas.jsonl
+#   python lote.py propostas.csv --imprimir     # e imprime tudo num trabalho só
+#   python lote.py propostas.csv --estimar-producao   # produção em branco estimada
+#
+# Cada linha usa como colunas os mesmos rótulos dos MAPPING_0000x
+# ("Nome do Cliente", "Preço", ...), mais "Tipo de Proposta" (padrão
+# "1- Proposta Simples") e "Número" (número do endereço, opcional).
+# Ao final é gravado um manifesto CSV com o resultado de cada linha.
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from datetime import datetime
+
+from dinheiro import soma
+from modelos import verificar
+from numeracao import registrar_uso, reservar_bloco
+from preencher import OUTPUT_DIR
+from producao import completar_colunas
+from registro import REGISTROS, Colunas, tipo_proposta
+from saida import caminho_proposta, liberar, limpar_temporarios
+
+TIPO_PADRAO = "1- Proposta Simples"
+EM_VOO = 4  # PDFs entregues ao pool por processo, à espera de um livre
+
+
+def ler_csv(caminho):
+    with open(caminho, "r", encoding="utf-8-sig", newline="") as f:
+        amostra = f.read(4096)
+        f.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=";,\t")
+        except csv.Error:
+            dialeto = csv.excel
+        for linha in csv.DictReader(f, dialect=dialeto):
+            yield linha
+
+
+def ler_xlsx(caminho):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(caminho, read_only=True, data_only=True)
+    linhas = wb.worksheets[0].iter_rows(values_only=True)
+    cabecalho = [str(c).strip() if c is not None else "" for c in next(linhas, [])]
+    for valores in linhas:
+        if all(v is None for v in valores):
+            continue
+        yield {k: v for k, v in zip(cabecalho, valores) if k}
+    wb.close()
+
+
+def ler_jsonl(caminho):
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            if linha.strip():
+                yield json.loads(linha)
+
+
+LEITORES = {
+    ".csv": ler_csv,
+    ".txt": ler_csv,
+    ".xlsx": ler_xlsx,
+    ".xlsm": ler_xlsx,
+    ".jsonl": ler_jsonl,
+    ".ndjson": ler_jsonl,
+}
+
+
+def ler_entrada(caminho):
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao not in LEITORES:
+        raise ValueError(f"Formato de entrada não suportado: {extensao}")
+    # Gerador: as linhas são lidas à medida que o lote avança
+    return LEITORES[extensao](caminho)
+
+
+def ler_proposta(linha):
+    # Registro validado (registro.py); "N° da Proposta" em branco fica para
+    # o bloco reservado depois
+    return REGISTROS[tipo_proposta(linha.get("Tipo de Proposta"), TIPO_PADRAO)].de_dados(linha)
+
+
+def normalizar_linha(linha, numeros):
+    # numeros: iterador com os números reservados para linhas sem número
+    # Mesmo tratamento que o formulário aplica antes de gerar o PDF
+    proposta = ler_proposta(linha)
+    if not proposta.numero:
+        proposta.numero = str(next(numeros))
+    return proposta.TIPO, proposta.dados(), proposta.numero_end
+
+
+def _iniciar_processo(motor):
+    # Cada processo carrega os templates uma vez só
+    if motor:
+        os.environ["GEPROP_MOTOR"] = motor
+    from renderizador import aquecer
+    aquecer()
+
+
+def _renderizar_linha(tipo, dados, numero_end, output_path):
+    from renderizador import gerar_pdf
+
+    inicio = time.perf_counter()
+    gerar_pdf(tipo, dados, output_path, numero_end=numero_end)
+    return time.perf_counter() - inicio
+
+
+def gerar_lote(linhas, saida=OUTPUT_DIR, processos=None, motor=None, estimar_producao=False):
+    # Devolve uma lista de dicts (uma por linha) para o manifesto. linhas
+    # pode ser um gerador: as válidas ficam em Colunas, e só há alguns PDFs
+    # por processo na fila do pool de cada vez
+    os.makedirs(saida, exist_ok=True)
+    limpar_temporarios(saida)
+    resultados = []
+    tabela = Colunas()
+    posicoes = array("L")  # linha da tabela -> índice em resultados
+    maior_informado = 0
+    for i, linha in enumerate(linhas, start=1):
+        resultado = {"linha": i, "status": "", "arquivo": "", "valor": "", "erro": "", "segundos": ""}
+        resultados.append(resultado)
+        try:
+            proposta = ler_proposta(linha)
+            verificar(proposta.TIPO)  # template com problema: erro na linha, sem abrir processo
+        except Exception as e:
+            resultado.update(status="erro", erro=str(e))
+            continue
+        if proposta.numero.isdigit():
+            maior_informado = max(maior_informado, int(proposta.numero))
+        tabela.append(proposta)
+        posicoes.append(i - 1)
+    # Reserva de uma vez um bloco para as linhas que não trazem número,
+    # depois do maior número informado: o bloco não repete nenhum deles
+    if maior_informado:
+        registrar_uso(maior_informado, saida)
+    sem_numero = tabela.pendentes("N° da Proposta")
+    if sem_numero:
+        tabela.definir("N° da Proposta", sem_numero, map(str, reservar_bloco(len(sem_numero), saida)))
+    # Produção em branco: estimada (só se pedido, a irradiação é de
+    # referência) para todas as linhas numa passada só
+    if estimar_producao:
+        completar_colunas(tabela)
+
+    processos = processos or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo,
+                             initargs=(motor,)) as executor:
+        futuros = {}
+
+        def recolher(prontos):
+            for futuro in prontos:
+                resultado = futuros.pop(futuro)
+                # o processo filho grava o arquivo; a reserva do nome é deste processo
+                liberar(resultado["arquivo"])
+                try:
+                    resultado.update(status="ok", segundos=f"{futuro.result():.3f}")
+                except Exception as e:
+                    resultado.update(status="erro", erro=str(e))
+
+        for posicao, proposta in zip(posicoes, tabela):
+            resultado = resultados[posicao]
+            resultado["arquivo"] = caminho_proposta(saida, proposta.numero, proposta.cliente)
+            valor = proposta.valor
+            resultado["valor"] = "" if valor is None else valor
+            futuro = executor.submit(_renderizar_linha, proposta.TIPO, proposta.dados(),
+                                     proposta.numero_end, resultado["arquivo"])
+            futuros[futuro] = resultado
+            if len(futuros) >= processos * EM_VOO:
+                recolher(wait(futuros, return_when=FIRST_COMPLETED).done)
+        recolher(as_completed(list(futuros)))
+    return resultados
+
+
+def gravar_manifesto(resultados, caminho):
+    with open(caminho, "w", encoding="utf-8-sig", newline="") as f:
+        escritor = csv.DictWriter(f, fieldnames=["linha", "status", "arquivo", "valor", "erro", "segundos"], delimiter=";")
+        escritor.writeheader()
+        escritor.writerows(resultados)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera propostas em lote a partir de CSV, XLSX ou JSON Lines.")
+    parser.add_argument("entrada", help="arquivo .csv, .xlsx ou .jsonl com uma proposta por linha")
+    parser.add_argument("--saida", default=OUTPUT_DIR, help="pasta onde os PDFs serão gravados")
+    parser.add_argument("--processos", type=int, default=None, help="nº de processos (padrão: nº de CPUs)")
+    parser.add_argument("--motor", default=None, help="motor de renderização (python, excel, excel-pool)")
+    parser.add_argument("--manifesto", default=None, help="caminho do manifesto CSV")
+    parser.add_argument("--imprimir", action="store_true", help="imprime as propostas geradas num trabalho só")
+    parser.add_argument("--impressora", default=None, help="impressora para --imprimir (padrão do sistema)")
+    parser.add_argument("--estimar-producao", action="store_true",
+                        help="preenche a produção em branco com a estimativa de json/irradiacao.json")
+    args = parser.parse_args(argv)
+
+    linhas = ler_entrada(args.entrada)
+    inicio = time.perf_counter()
+    resultados = gerar_lote(linhas, saida=args.saida, processos=args.processos, motor=args.motor,
+                            estimar_producao=args.estimar_producao)
+    total = time.perf_counter() - inicio
+
+    manifesto = args.manifesto or os.path.join(
+        args.saida, f"manifesto_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    gravar_manifesto(resultados, manifesto)
+
+    ok = sum(1 for r in resultados if r["status"] == "ok")
+    print(f"✔ {ok} de {len(resultados)} propostas geradas em {total:.1f}s")
+    valor = soma(r["valor"] for r in resultados if r["status"] == "ok" and r["valor"])
+    print(f"  Valor total: {valor.brl}")
+    print(f"  Manifesto: {manifesto}")
+    if args.imprimir and ok:
+        from impressao import ERRO, Trabalho, processar
+        trabalho = processar(Trabalho([r["arquivo"] for r in resultados if r["status"] == "ok"],
+                                      args.impressora), pasta=args.saida)
+        print(f"  {trabalho.descricao()}")
+        if trabalho.estado == ERRO:
+            return 1
+    return 0 if ok == len(resultados) else 1
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# mascaras.py
+# Validadores (QValidator) dos campos de data, telefone e preço.
+#
+# O Qt chama validate() a cada tecla, antes de mudar o texto: a máscara
+# (barras da data, espaço e hífen do telefone) é montada ali mesmo e o cursor
+# é reposicionado pelo número de dígitos à esquerda dele, sem setText dentro
+# de textChanged. Teclas que não podem levar a um valor válido são recusadas.
+#
+#   campo.setValidator(ValidadorData(campo))
+#   valor_aceito(campo)   # False se o texto estiver incompleto ou inválido
+
+from datetime import date
+
+from PyQt6.QtGui import QValidator
+
+from preencher import PrecoInvalido, ler_preco
+
+Estado = QValidator.State
+
+
+def _digitos(texto, limite):
+    return "".join(c for c in texto if c.isdigit())[:limite]
+
+
+def _cursor(texto, pos, formatado):
+    # Mesma quantidade de dígitos à esquerda do cursor, no texto formatado
+    antes = sum(1 for c in texto[:pos] if c.isdigit())
+    if not antes:
+        return 0
+    for i, c in enumerate(formatado):
+        if c.isdigit():
+            antes -= 1
+            if not antes:
+                return i + 1
+    return len(formatado)
+
+
+class ValidadorData(QValidator):
+    # dd/mm/aaaa; as barras entram sozinhas
+    def validate(self, texto, pos):
+        digitos = _digitos(texto, 8)
+        if not digitos:
+            return Estado.Intermediate, "", 0
+        formatado = "/".join(p for p in (digitos[:2], digitos[2:4], digitos[4:]) if p)
+        dia, mes = digitos[:2], digitos[2:4]
+        if (len(dia) == 2 and not 1 <= int(dia) <= 31) or (len(mes) == 2 and not 1 <= int(mes) <= 12) \
+                or (dia and int(dia[0]) > 3) or (mes and int(mes[0]) > 1):
+            return Estado.Invalid, texto, pos
+        estado = Estado.Intermediate
+        if len(digitos) == 8:
+            try:
+                date(int(digitos[4:]), int(mes), int(dia))
+            except ValueError:
+                return Estado.Invalid, texto, pos
+            estado = Estado.Acceptable
+        return estado, formatado, _cursor(texto, pos, formatado)
+
+
+def formatar_telefone(digitos):
+    if len(digitos) <= 8:  # XXXX-XXXX
+        return f"{digitos[:4]}-{digitos[4:]}" if len(digitos) > 4 else digitos
+    if len(digitos) == 9:  # XXXXX-XXXX
+        return f"{digitos[:5]}-{digitos[5:]}"
+    return f"{digitos[:2]} {digitos[2:7]}-{digitos[7:]}"  # XX XXXXX-XXXX
+
+
+class ValidadorTelefone(QValidator):
+    # 8 a 11 dígitos; vazio também vale (telefone é opcional)
+    def validate(self, texto, pos):
+        digitos = _digitos(texto, 11)
+        if not digitos:
+            return Estado.Acceptable, "", 0
+        formatado = formatar_telefone(digitos)
+        estado = Estado.Acceptable if len(digitos) >= 8 else Estado.Intermediate
+        return estado, formatado, _cursor(texto, pos, formatado)
+
+
+class ValidadorPreco(QValidator):
+    # Aceita o que ler_preco aceita; "1.2" e "1.234," ficam como
+    # intermediários enquanto ainda podem virar um preço válido
+    COMPLETAR = ("0", "00", "000")
+
+    def validate(self, texto, pos):
+        try:
+            ler_preco(texto)
+            return Estado.Acceptable, texto, pos
+        except PrecoInvalido:
+            pass
+        for resto in self.COMPLETAR:
+            try:
+                ler_preco(texto + resto)
+                return Estado.Intermediate, texto, pos
+            except PrecoInvalido:
+                pass
+        return Estado.Invalid, texto, pos
+
+
+def valor_aceito(campo):
+    # Vazio conta como aceito: quem decide se o campo é obrigatório é quem lê
+    return not campo.text() or campo.hasAcceptableInput()
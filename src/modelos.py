@@ -0,0 +1,241 @@
+# modelos.py
+# Registro dos templates .xlsx: cada arquivo é lido uma vez por processo
+# (só o XML da planilha, sem abrir o Excel), identificado pelo sha256 e
+# guardado em cache pela assinatura (mtime, tamanho). Trocar o arquivo
+# invalida a ficha, os planos de escrita (plano.py) e o cache de PDFs.
+#
+# As células de cada MAPPING são conferidas contra o template:
+#   - coordenada válida e dentro da planilha
+#   - sem fórmula (o valor escrito apagaria a fórmula)
+#   - não escondida por uma mescla (o Excel descarta o valor)
+#   - não bloqueada numa planilha protegida (o Excel recusa a escrita)
+#   - usada por alguma fórmula ou dentro da área de impressão (senão o
+#     valor não aparece no PDF)
+#
+#   python modelos.py        # confere todos os tipos de proposta
+
+import os
+import re
+import sys
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+
+from openpyxl.utils import get_column_letter, range_boundaries
+
+from cache_pdf import hash_arquivo
+from desenhos import NS, caminho_planilha
+from preencher import TIPOS_PROPOSTA, resource_path
+
+# Células que o GeProp escreve além dos mapeamentos (número do endereço)
+CELULAS_EXTRAS = {"I13", "J13"}
+
+_COORD = re.compile(r"^[A-Z]{1,3}[1-9]\d*$")
+_REFERENCIA = re.compile(r"(?<![A-Za-z_.!\d])\$?([A-Z]{1,3})\$?(\d+)(?::\$?([A-Z]{1,3})\$?(\d+))?(?![\w(])")
+_TEXTO = re.compile(r'"(?:[^"]|"")*"')
+_LIMITE_FAIXA = 10000  # faixas maiores que isso (A:A, 1:1) não são expandidas
+
+
+class ErroModelo(ValueError):
+    pass
+
+
+class Ficha:
+    # Estrutura de um template, lida uma vez e compartilhada
+    __slots__ = ("caminho", "assinatura", "hash", "mesclagens", "formulas",
+                 "referenciadas", "area_impressao", "protegida", "estilos", "estilos_livres")
+
+    def __init__(self, caminho, assinatura, hash_):
+        self.caminho = caminho
+        self.assinatura = assinatura
+        self.hash = hash_
+        self.mesclagens = []          # [(col1, lin1, col2, lin2)]
+        self.formulas = set()         # células com fórmula
+        self.referenciadas = set()    # células lidas por alguma fórmula
+        self.area_impressao = None    # (col1, lin1, col2, lin2)
+        self.protegida = False
+        self.estilos = {}             # célula -> índice do estilo (planilha protegida)
+        self.estilos_livres = set()   # estilos com locked="0"
+
+    def bloqueada(self, cell):
+        # Célula ausente do XML usa o estilo 0
+        return self.protegida and self.estilos.get(cell, 0) not in self.estilos_livres
+
+    def __repr__(self):
+        return f"Ficha({os.path.basename(self.caminho)!r}, {self.hash[:12]})"
+
+
+def _celulas_da_faixa(c1, l1, c2, l2):
+    if (c2 - c1 + 1) * (l2 - l1 + 1) > _LIMITE_FAIXA:
+        return ()
+    return (f"{get_column_letter(c)}{l}" for l in range(l1, l2 + 1) for c in range(c1, c2 + 1))
+
+
+def _referencias(formula):
+    for m in _REFERENCIA.finditer(_TEXTO.sub("", formula)):
+        col1, lin1, col2, lin2 = m.groups()
+        if col2 is None:
+            yield f"{col1}{lin1}"
+        else:
+            yield from _celulas_da_faixa(*range_boundaries(f"{col1}{lin1}:{col2}{lin2}"))
+
+
+def _estilos_desbloqueados(arquivo):
+    # Índices de cellXfs com <protection locked="0"> (o padrão é bloqueado)
+    try:
+        raiz = ET.fromstring(arquivo.read("xl/styles.xml"))
+    except KeyError:
+        return set()
+    desbloqueados = set()
+    for i, xf in enumerate(raiz.iterfind("main:cellXfs/main:xf", NS)):
+        protecao = xf.find("main:protection", NS)
+        if protecao is not None and protecao.get("locked") in ("0", "false"):
+            desbloqueados.add(i)
+    return desbloqueados
+
+
+def _area_impressao(arquivo):
+    livro = ET.fromstring(arquivo.read("xl/workbook.xml"))
+    for nome in livro.iterfind("main:definedNames/main:definedName", NS):
+        if nome.get("name") == "_xlnm.Print_Area" and nome.get("localSheetId", "0") == "0":
+            faixa = (nome.text or "").split("!")[-1].split(",")[0].replace("$", "")
+            try:
+                return range_boundaries(faixa)
+            except ValueError:
+                return None
+    return None
+
+
+def _ler(caminho, assinatura):
+    ficha = Ficha(caminho, assinatura, hash_arquivo(caminho))
+    try:
+        arquivo = zipfile.ZipFile(caminho)
+    except (OSError, zipfile.BadZipFile) as e:
+        raise ErroModelo(f"Template ilegível: {caminho} ({e})") from None
+    with arquivo:
+        caminho_xml = caminho_planilha(arquivo)
+        if caminho_xml is None:
+            raise ErroModelo(f"Template sem planilha: {caminho}")
+        raiz = ET.fromstring(arquivo.read(caminho_xml))
+        ficha.area_impressao = _area_impressao(arquivo)
+        protecao = raiz.find("main:sheetProtection", NS)
+        ficha.protegida = protecao is not None and protecao.get("sheet") in ("1", "true")
+        if ficha.protegida:
+            ficha.estilos_livres = _estilos_desbloqueados(arquivo)
+    ficha.mesclagens = [range_boundaries(m.get("ref"))
+                        for m in raiz.iterfind("main:mergeCells/main:mergeCell", NS)]
+    for c in raiz.iterfind("main:sheetData/main:row/main:c", NS):
+        ref = c.get("r")
+        f = c.find("main:f", NS)
+        if f is not None:
+            ficha.formulas.add(ref)
+            if f.text:
+                ficha.referenciadas.update(_referencias(f.text))
+        if ficha.protegida:
+            ficha.estilos[ref] = int(c.get("s", 0))
+    return ficha
+
+
+_fichas = {}
+_fichas_lock = threading.Lock()
+
+
+def ficha(caminho):
+    # Ficha do template, relida só quando mtime/tamanho mudam
+    chave = os.path.abspath(caminho)
+    try:
+        st = os.stat(chave)
+    except OSError:
+        raise ErroModelo(f"Template não encontrado: {caminho}") from None
+    assinatura = (st.st_mtime_ns, st.st_size)
+    with _fichas_lock:
+        atual = _fichas.get(chave)
+        if atual is not None and atual.assinatura == assinatura:
+            return atual
+    atual = _ler(chave, assinatura)
+    with _fichas_lock:
+        _fichas[chave] = atual
+    return atual
+
+
+def caminho_template(tipo_proposta):
+    nome, _ = TIPOS_PROPOSTA[tipo_proposta]
+    return resource_path(f"templates/{nome}.xlsx")
+
+
+def _dentro(faixa, col, lin):
+    return faixa is not None and faixa[0] <= col <= faixa[2] and faixa[1] <= lin <= faixa[3]
+
+
+def problemas(modelo, celulas):
+    # celulas: {"Rótulo": "G27", ...}; devolve a lista de problemas (vazia se ok)
+    escondidas = set()
+    for c1, l1, c2, l2 in modelo.mesclagens:
+        escondidas.update((col, lin) for lin in range(l1, l2 + 1) for col in range(c1, c2 + 1)
+                          if (col, lin) != (c1, l1))
+    erros = []
+    for rotulo, cell in celulas.items():
+        cell = str(cell).upper()
+        if not _COORD.match(cell):
+            erros.append(f"{rotulo}: célula inválida {cell!r}")
+            continue
+        col, lin, _, _ = range_boundaries(cell)
+        if col > 16384 or lin > 1048576:
+            erros.append(f"{rotulo}: {cell} fora da planilha")
+        elif cell in modelo.formulas:
+            erros.append(f"{rotulo}: {cell} tem fórmula no template")
+        elif (col, lin) in escondidas:
+            erros.append(f"{rotulo}: {cell} está dentro de uma mescla (use a primeira célula dela)")
+        elif modelo.bloqueada(cell):
+            erros.append(f"{rotulo}: {cell} está bloqueada e a planilha é protegida")
+        elif cell not in modelo.referenciadas and not _dentro(modelo.area_impressao, col, lin):
+            erros.append(f"{rotulo}: {cell} não é usada por nenhuma fórmula nem impressa")
+    return erros
+
+
+_verificados = {}
+
+
+def verificar(tipo_proposta):
+    # Ficha do template do tipo, com o MAPPING já conferido. ErroModelo com
+    # todos os problemas de uma vez; o resultado fica guardado por hash
+    # do template e conteúdo do mapeamento.
+    _, mapping = TIPOS_PROPOSTA[tipo_proposta]
+    atual = ficha(caminho_template(tipo_proposta))
+    chave = (tipo_proposta, atual.hash, frozenset(mapping.items()))
+    erros = _verificados.get(chave)
+    if erros is None:
+        celulas = dict(mapping)
+        celulas.update((cell, cell) for cell in sorted(CELULAS_EXTRAS))
+        erros = _verificados[chave] = problemas(atual, celulas)
+    if erros:
+        nome = os.path.basename(atual.caminho)
+        raise ErroModelo(f"Template {nome} não confere com o mapeamento de {tipo_proposta}:\n- "
+                         + "\n- ".join(erros))
+    return atual
+
+
+def verificar_todos():
+    # {tipo: mensagem} só dos tipos com problema
+    erros = {}
+    for tipo in TIPOS_PROPOSTA:
+        try:
+            verificar(tipo)
+        except ErroModelo as e:
+            erros[tipo] = str(e)
+    return erros
+
+
+def main():
+    erros = verificar_todos()
+    for tipo in TIPOS_PROPOSTA:
+        if tipo in erros:
+            print(f"✖ {erros[tipo]}")
+        else:
+            atual = ficha(caminho_template(tipo))
+            print(f"✔ {tipo}: {os.path.basename(atual.caminho)} ({atual.hash[:12]})")
+    return 1 if erros else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
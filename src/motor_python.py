@@ -0,0 +1,903 @@
+# motor_python.py
+# Python ≥ 3.8  |  pip install openpyxl reportlab
+#
+# Motor de renderização sem Excel: lê o template .xlsx com openpyxl,
+# aplica os valores das células em memória, calcula as fórmulas usadas
+# nos templates (IF, CONCATENATE, CONCAT, UPPER) e desenha a área de
+# impressão direto em PDF com reportlab.
+#
+# Quase tudo na página (preenchimentos, bordas, imagens, textos fixos) é
+# igual em todas as propostas. Com pypdf instalado, esse fundo é desenhado
+# uma vez por template e conjunto de células preenchidas e guardado no
+# Modelo (recarregar o template descarta o fundo); cada proposta desenha só
+# os textos que dependem dos dados e os sobrepõe ao fundo.
+#   GEPROP_FUNDO=0 desenha a página inteira a cada proposta.
+
+import io
+import os
+import re
+import threading
+
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter, range_boundaries
+from reportlab import rl_config
+from reportlab.lib.colors import Color
+from reportlab.lib.pagesizes import A4, A3, LETTER, landscape
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from desenhos import ler_desenhos
+from instrumentacao import etapa
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    from pypdf.generic import ArrayObject, DictionaryObject, NameObject, StreamObject
+except ImportError:  # sem pypdf: a página inteira é desenhada a cada proposta
+    PdfReader = PdfWriter = None
+
+# Versão do desenho: mude ao alterar o que sai no PDF (layout, fontes,
+# fundo/sobreposição), para o cache_pdf não devolver PDFs da versão antiga
+VERSAO = "2"
+
+# Excel em pt-BR: vírgula decimal e ponto como separador de milhar
+SEPARADOR_DECIMAL = ","
+SEPARADOR_MILHAR = "."
+
+TAMANHOS_PAPEL = {1: LETTER, 8: A3, 9: A4}
+
+# Paleta do tema padrão do Office (índices usados por fill/font "theme")
+CORES_TEMA = [
+    "FFFFFF", "000000", "E7E6E6", "44546A", "4472C4", "ED7D31",
+    "A5A5A5", "FFC000", "5B9BD5", "70AD47", "0563C1", "954F72",
+]
+
+# Imagens binárias no PDF (sem ASCII85): arquivo menor e bem mais rápido
+rl_config.useA85 = 0
+
+EMU_POR_PONTO = 12700
+DPI_IMAGENS = 200
+_NUMERO = re.compile(r"^-?\d+(\.\d+)?$")
+
+
+# ---------------------------------------------------------------------------
+# Fórmulas
+# ---------------------------------------------------------------------------
+
+class _Vazio:
+    # Célula em branco: vale 0 em comparação numérica e "" em texto
+    def __repr__(self):
+        return "VAZIO"
+
+
+VAZIO = _Vazio()
+
+_TOKENS = re.compile(r"""
+    (?P<espaco>\s+)
+  | (?P<texto>"(?:[^"]|"")*")
+  | (?P<numero>\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<funcao>(?:_xlfn\.)?[A-Za-z][A-Za-z0-9.]*(?=\())
+  | (?P<celula>\$?[A-Za-z]{1,3}\$?\d+)
+  | (?P<booleano>TRUE|FALSE)
+  | (?P<operador><>|<=|>=|[-+*/^&=<>(),%])
+""", re.VERBOSE)
+
+_PRECEDENCIA = {
+    "=": 1, "<>": 1, "<": 1, ">": 1, "<=": 1, ">=": 1,
+    "&": 2,
+    "+": 3, "-": 3,
+    "*": 4, "/": 4,
+    "^": 5,
+}
+
+
+def _tokenizar(formula):
+    tokens = []
+    pos = 0
+    while pos < len(formula):
+        m = _TOKENS.match(formula, pos)
+        if not m:
+            raise ValueError(f"Fórmula não suportada: {formula!r}")
+        pos = m.end()
+        tipo = m.lastgroup
+        if tipo == "espaco":
+            continue
+        valor = m.group(tipo)
+        if tipo == "texto":
+            valor = valor[1:-1].replace('""', '"')
+        elif tipo == "numero":
+            valor = float(valor)
+        elif tipo == "celula":
+            valor = valor.replace("$", "").upper()
+        elif tipo == "funcao":
+            valor = valor.upper().replace("_XLFN.", "")
+        tokens.append((tipo, valor))
+    return tokens
+
+
+class _Parser:
+    # Parser de precedência simples que gera uma árvore de tuplas
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def _atual(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _consumir(self, esperado=None):
+        tok = self._atual()
+        if esperado is not None and tok[1] != esperado:
+            raise ValueError(f"Esperado {esperado!r}, encontrado {tok[1]!r}")
+        self.pos += 1
+        return tok
+
+    def expressao(self, minimo=1):
+        esquerda = self._unario()
+        while True:
+            tipo, op = self._atual()
+            if tipo != "operador" or op not in _PRECEDENCIA or _PRECEDENCIA[op] < minimo:
+                return esquerda
+            self._consumir()
+            direita = self.expressao(_PRECEDENCIA[op] + 1)
+            esquerda = ("op", op, esquerda, direita)
+
+    def _unario(self):
+        tipo, valor = self._atual()
+        if tipo == "operador" and valor in ("-", "+"):
+            self._consumir()
+            operando = self._unario()
+            return ("neg", operando) if valor == "-" else operando
+        no = self._primario()
+        if self._atual() == ("operador", "%"):
+            self._consumir()
+            no = ("op", "/", no, ("valor", 100.0))
+        return no
+
+    def _primario(self):
+        tipo, valor = self._consumir()
+        if tipo in ("texto", "numero"):
+            return ("valor", valor)
+        if tipo == "booleano":
+            return ("valor", valor == "TRUE")
+        if tipo == "celula":
+            return ("celula", valor)
+        if tipo == "funcao":
+            self._consumir("(")
+            args = []
+            if self._atual() != ("operador", ")"):
+                args.append(self.expressao())
+                while self._atual() == ("operador", ","):
+                    self._consumir()
+                    args.append(self.expressao())
+            self._consumir(")")
+            return ("funcao", valor, args)
+        if valor == "(":
+            no = self.expressao()
+            self._consumir(")")
+            return no
+        raise ValueError(f"Token inesperado: {valor!r}")
+
+
+def referencias(arvore):
+    # Células lidas pela fórmula
+    if arvore[0] == "celula":
+        yield arvore[1]
+    elif arvore[0] == "neg":
+        yield from referencias(arvore[1])
+    elif arvore[0] == "op":
+        yield from referencias(arvore[2])
+        yield from referencias(arvore[3])
+    elif arvore[0] == "funcao":
+        for arg in arvore[2]:
+            yield from referencias(arg)
+
+
+def compilar_formula(formula):
+    # Recebe o texto da fórmula sem o "=" inicial
+    parser = _Parser(_tokenizar(formula))
+    arvore = parser.expressao()
+    if parser.pos != len(parser.tokens):
+        raise ValueError(f"Fórmula não suportada: {formula!r}")
+    return arvore
+
+
+def formatar_geral(valor):
+    # Como o Excel converte um valor em texto no formato "Geral"
+    if valor is VAZIO or valor is None:
+        return ""
+    if isinstance(valor, bool):
+        return "VERDADEIRO" if valor else "FALSO"
+    if isinstance(valor, float):
+        if valor.is_integer():
+            return str(int(valor))
+        return f"{valor:.10g}".replace(".", SEPARADOR_DECIMAL)
+    return str(valor)
+
+
+def _numero(valor):
+    if valor is VAZIO or valor is None:
+        return 0.0
+    if isinstance(valor, bool):
+        return float(valor)
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    raise ValueError(f"#VALOR! ({valor!r} não é número)")
+
+
+def _comparar(op, a, b):
+    # Em branco vira 0 ou "" conforme o outro operando
+    if a is VAZIO:
+        a = "" if isinstance(b, str) else 0.0
+    if b is VAZIO:
+        b = "" if isinstance(a, str) else 0.0
+    a_texto, b_texto = isinstance(a, str), isinstance(b, str)
+    if a_texto and b_texto:
+        a, b = a.upper(), b.upper()
+    elif a_texto != b_texto:
+        # No Excel, texto é sempre maior que qualquer número
+        a, b = (1, 0) if a_texto else (0, 1)
+    else:
+        a, b = float(a), float(b)
+    if op == "=":
+        return a == b
+    if op == "<>":
+        return a != b
+    if op == "<":
+        return a < b
+    if op == ">":
+        return a > b
+    if op == "<=":
+        return a <= b
+    return a >= b
+
+
+class Avaliador:
+    # Calcula as fórmulas de uma planilha sobre um conjunto de valores novos
+
+    def __init__(self, modelo, valores):
+        self.modelo = modelo
+        self.valores = valores
+        self.cache = {}
+
+    def valor(self, coord):
+        if coord in self.cache:
+            return self.cache[coord]
+        if coord in self.valores:
+            resultado = self.valores[coord]
+        else:
+            arvore = self.modelo.formulas.get(coord)
+            if arvore is not None:
+                self.cache[coord] = VAZIO  # evita loop em referência circular
+                resultado = self._avaliar(arvore)
+            else:
+                resultado = self.modelo.constantes.get(coord, VAZIO)
+        self.cache[coord] = resultado
+        return resultado
+
+    def _avaliar(self, no):
+        tipo = no[0]
+        if tipo == "valor":
+            return no[1]
+        if tipo == "celula":
+            return self.valor(no[1])
+        if tipo == "neg":
+            return -_numero(self._avaliar(no[1]))
+        if tipo == "op":
+            op = no[1]
+            a = self._avaliar(no[2])
+            b = self._avaliar(no[3])
+            if op == "&":
+                return formatar_geral(a) + formatar_geral(b)
+            if op in ("=", "<>", "<", ">", "<=", ">="):
+                return _comparar(op, a, b)
+            a, b = _numero(a), _numero(b)
+            if op == "+":
+                return a + b
+            if op == "-":
+                return a - b
+            if op == "*":
+                return a * b
+            if op == "/":
+                if b == 0:
+                    raise ValueError("#DIV/0!")
+                return a / b
+            return a ** b
+        nome, args = no[1], no[2]
+        if nome == "IF":
+            condicao = self._avaliar(args[0])
+            if isinstance(condicao, str):
+                raise ValueError("#VALOR! (condição de SE não é lógica)")
+            if condicao is not VAZIO and condicao:
+                return self._avaliar(args[1]) if len(args) > 1 else True
+            return self._avaliar(args[2]) if len(args) > 2 else False
+        if nome in ("CONCATENATE", "CONCAT"):
+            return "".join(formatar_geral(self._avaliar(a)) for a in args)
+        if nome == "UPPER":
+            return formatar_geral(self._avaliar(args[0])).upper()
+        if nome == "LOWER":
+            return formatar_geral(self._avaliar(args[0])).lower()
+        raise ValueError(f"Função não suportada: {nome}")
+
+
+# ---------------------------------------------------------------------------
+# Template
+# ---------------------------------------------------------------------------
+
+def _largura_coluna_pt(largura):
+    # Converte a largura do Excel (em caracteres) para pontos
+    pixels = int(((256 * largura + int(128 / 7)) / 256) * 7)
+    return pixels * 0.75
+
+
+def _cor(cor):
+    # Devolve "RRGGBB" ou None para cores que não dá para resolver
+    if cor is None:
+        return None
+    if cor.type == "rgb" and isinstance(cor.rgb, str):
+        return cor.rgb[-6:]
+    if cor.type == "theme" and cor.theme is not None and cor.theme < len(CORES_TEMA):
+        base = CORES_TEMA[cor.theme]
+        tint = cor.tint or 0.0
+        canais = [int(base[i:i + 2], 16) for i in (0, 2, 4)]
+        if tint < 0:
+            canais = [c * (1 + tint) for c in canais]
+        elif tint > 0:
+            canais = [c + (255 - c) * tint for c in canais]
+        return "".join(f"{int(round(c)):02X}" for c in canais)
+    return None
+
+
+def _rgb(hexa):
+    return tuple(int(hexa[i:i + 2], 16) / 255 for i in (0, 2, 4))
+
+
+class Modelo:
+    # Estrutura de um template já lida do .xlsx e pronta para renderizar
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        wb = load_workbook(caminho)
+        ws = wb.worksheets[0]
+        self.planilha = ws
+        self.formulas = {}
+        self.constantes = {}
+        self.erros_formula = {}
+        for linha in ws.iter_rows():
+            for celula in linha:
+                valor = celula.value
+                if valor is None:
+                    continue
+                if isinstance(valor, str) and valor.startswith("="):
+                    try:
+                        self.formulas[celula.coordinate] = compilar_formula(valor[1:])
+                    except ValueError as e:
+                        self.erros_formula[celula.coordinate] = str(e)
+                elif isinstance(valor, (int, float)) and not isinstance(valor, bool):
+                    self.constantes[celula.coordinate] = float(valor)
+                else:
+                    self.constantes[celula.coordinate] = valor
+
+        # Células mescladas: âncora -> (col1, lin1, col2, lin2) e as cobertas
+        self.mescladas = {}
+        self.cobertas = set()
+        for faixa in ws.merged_cells.ranges:
+            c1, l1, c2, l2 = faixa.bounds
+            self.mescladas[(l1, c1)] = (c1, l1, c2, l2)
+            for l in range(l1, l2 + 1):
+                for c in range(c1, c2 + 1):
+                    if (l, c) != (l1, c1):
+                        self.cobertas.add((l, c))
+
+        self._ler_pagina(ws)
+        self._ler_desenhos(caminho)
+        # Conjunto de células preenchidas -> (células dinâmicas, PDF do fundo)
+        self.fundos = {}
+
+    def dinamicas(self, entradas):
+        # Células cujo texto muda com as entradas: elas e as fórmulas que as
+        # leem, direta ou indiretamente
+        dinamicas = set(entradas)
+        restantes = {c: set(referencias(a)) for c, a in self.formulas.items() if c not in dinamicas}
+        mudou = True
+        while mudou:
+            mudou = False
+            for coord, refs in list(restantes.items()):
+                if refs & dinamicas:
+                    dinamicas.add(coord)
+                    del restantes[coord]
+                    mudou = True
+        return frozenset(dinamicas)
+
+    def fundo(self, entradas):
+        # (células dinâmicas, PDF em bytes com tudo o que não depende delas),
+        # desenhado na primeira proposta com este conjunto de células
+        chave = frozenset(entradas)
+        item = self.fundos.get(chave)
+        if item is None:
+            dinamicas = self.dinamicas(chave)
+            destino = io.BytesIO()
+            desenhar_pdf(self, Avaliador(self, {}), destino, camada="fundo", dinamicas=dinamicas)
+            item = self.fundos[chave] = (dinamicas, destino.getvalue())
+        return item
+
+    def _ler_pagina(self, ws):
+        area = ws.print_area
+        if area:
+            area = area.split(",")[0].split("!")[-1].replace("$", "")
+            c1, l1, c2, l2 = range_boundaries(area)
+        else:
+            c1, l1, c2, l2 = range_boundaries(ws.dimensions)
+        self.area = (c1, l1, c2, l2)
+
+        largura_padrao = ws.sheet_format.defaultColWidth or ((ws.sheet_format.baseColWidth or 8) + 0.43)
+        altura_padrao = ws.sheet_format.defaultRowHeight or 15
+        self.larguras = {}
+        for c in range(1, c2 + 2):
+            dim = ws.column_dimensions.get(get_column_letter(c))
+            if dim is not None and dim.hidden:
+                self.larguras[c] = 0.0
+            elif dim is not None and dim.width:
+                self.larguras[c] = _largura_coluna_pt(dim.width)
+            else:
+                self.larguras[c] = _largura_coluna_pt(largura_padrao)
+        # openpyxl agrupa colunas com mesma largura (min..max) numa só dimensão
+        for dim in ws.column_dimensions.values():
+            if dim.min and dim.max and dim.max > dim.min:
+                for c in range(dim.min, min(dim.max, c2 + 1) + 1):
+                    self.larguras[c] = 0.0 if dim.hidden else _largura_coluna_pt(dim.width or largura_padrao)
+        self.alturas = {}
+        for l in range(1, l2 + 2):
+            dim = ws.row_dimensions.get(l)
+            if dim is not None and dim.hidden:
+                self.alturas[l] = 0.0
+            elif dim is not None and dim.height:
+                self.alturas[l] = float(dim.height)
+            else:
+                self.alturas[l] = float(altura_padrao)
+
+        # Quebras de página manuais dentro da área de impressão
+        quebras_col = sorted(b.id for b in ws.col_breaks.brk if c1 <= b.id < c2)
+        quebras_lin = sorted(b.id for b in ws.row_breaks.brk if l1 <= b.id < l2)
+        colunas = []
+        inicio = c1
+        for q in quebras_col:
+            colunas.append((inicio, q))
+            inicio = q + 1
+        colunas.append((inicio, c2))
+        linhas = []
+        inicio = l1
+        for q in quebras_lin:
+            linhas.append((inicio, q))
+            inicio = q + 1
+        linhas.append((inicio, l2))
+        # Ordem padrão do Excel: desce primeiro, depois vai para a direita
+        self.paginas = [(cs, ls) for cs in colunas for ls in linhas]
+
+        setup = ws.page_setup
+        papel = TAMANHOS_PAPEL.get(int(setup.paperSize or 9), A4)
+        if setup.orientation == "landscape":
+            papel = landscape(papel)
+        self.papel = papel
+        self.escala = (setup.scale or 100) / 100
+        margens = ws.page_margins
+        self.margem_esq = (margens.left or 0) * 72
+        self.margem_topo = (margens.top or 0) * 72
+        self.centralizar_h = bool(ws.print_options.horizontalCentered)
+        self.centralizar_v = bool(ws.print_options.verticalCentered)
+
+        # Posição acumulada (em pontos) do início de cada coluna/linha
+        self.x_col = {1: 0.0}
+        for c in range(1, c2 + 2):
+            self.x_col[c + 1] = self.x_col[c] + self.larguras[c]
+        self.y_lin = {1: 0.0}
+        for l in range(1, l2 + 2):
+            self.y_lin[l + 1] = self.y_lin[l] + self.alturas[l]
+
+    def _posicao(self, ancora):
+        return (self.x_col.get(ancora.col + 1, 0.0) + ancora.col_off / EMU_POR_PONTO,
+                self.y_lin.get(ancora.lin + 1, 0.0) + ancora.lin_off / EMU_POR_PONTO)
+
+    def _ler_desenhos(self, caminho):
+        # Lista de (desenho, x, y, w, h[, imagem]) na ordem em que o Excel desenha
+        self.desenhos = []
+        for d in ler_desenhos(caminho):
+            x, y = self._posicao(d.origem)
+            if d.destino is not None:
+                x2, y2 = self._posicao(d.destino)
+            else:
+                x2 = x + d.extensao[0] / EMU_POR_PONTO
+                y2 = y + d.extensao[1] / EMU_POR_PONTO
+            leitor = None
+            if d.tipo == "imagem":
+                leitor = _reduzir_imagem(d.imagem, d.recorte, (x2 - x) * self.escala, (y2 - y) * self.escala)
+            self.desenhos.append((d, x, y, x2 - x, y2 - y, leitor))
+
+
+def _reduzir_imagem(dados, recorte, largura_pt, altura_pt):
+    # Aplica o recorte do Excel e reamostra para DPI_IMAGENS no tamanho em
+    # que a imagem é impressa; os PNGs dos templates vêm bem maiores que
+    # isso e comprimi-los a cada PDF era o que mais pesava na renderização.
+    from PIL import Image
+
+    imagem = Image.open(io.BytesIO(dados))
+    if recorte and any(recorte):
+        l, t, r, b = recorte
+        w, h = imagem.size
+        imagem = imagem.crop((int(w * l), int(h * t), int(w * (1 - r)), int(h * (1 - b))))
+    largura_px = max(1, int(largura_pt / 72 * DPI_IMAGENS))
+    altura_px = max(1, int(altura_pt / 72 * DPI_IMAGENS))
+    if imagem.width > largura_px and imagem.height > altura_px:
+        imagem = imagem.resize((largura_px, altura_px), Image.LANCZOS)
+    else:
+        imagem.load()
+    return ImageReader(imagem)
+
+
+_modelos = {}
+_modelos_lock = threading.Lock()
+
+
+def carregar_modelo(caminho):
+    # Lê o template uma vez por processo; recarrega se o arquivo mudar
+    chave = os.path.abspath(caminho)
+    mtime = os.path.getmtime(chave)
+    with _modelos_lock:
+        item = _modelos.get(chave)
+        if item is None or item[0] != mtime:
+            item = (mtime, Modelo(chave))
+            _modelos[chave] = item
+        return item[1]
+
+
+# ---------------------------------------------------------------------------
+# Desenho
+# ---------------------------------------------------------------------------
+
+def _converter_entrada(valor):
+    # Igual ao Excel quando se digita na célula: texto numérico vira número
+    if valor is None or valor == "":
+        return VAZIO
+    if isinstance(valor, str) and _NUMERO.match(valor.strip()):
+        return float(valor.strip())
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return float(valor)
+    return valor
+
+
+def _agrupar_milhar(inteiro):
+    texto = f"{inteiro:,}"
+    return texto.replace(",", SEPARADOR_MILHAR)
+
+
+def formatar_numero(valor, formato):
+    if not isinstance(valor, float):
+        return formatar_geral(valor)
+    if formato in (None, "General", "@"):
+        return formatar_geral(valor)
+    secoes = formato.split(";")
+    secao = secoes[0]
+    if valor == 0 and len(secoes) >= 3 and '"-"' in secoes[2]:
+        prefixo = "R$ " if "R$" in secoes[2] else ""
+        return f"{prefixo}-"
+    decimais = 0
+    m = re.search(r"0\.(0+)", secao)
+    if m:
+        decimais = len(m.group(1))
+    absoluto = abs(valor)
+    texto = f"{absoluto:.{decimais}f}"
+    inteiro, _, fracao = texto.partition(".")
+    inteiro = _agrupar_milhar(int(inteiro)) if "," in secao else inteiro
+    texto = inteiro + (SEPARADOR_DECIMAL + fracao if fracao else "")
+    if "%" in secao:
+        texto += "%"
+    if "R$" in secao:
+        texto = "R$ " + texto
+    if valor < 0:
+        texto = "-" + texto
+    return texto
+
+
+def _fonte(celula):
+    fonte = celula.font
+    negrito = bool(fonte.b)
+    italico = bool(fonte.i)
+    nome = "Helvetica"
+    if negrito and italico:
+        nome = "Helvetica-BoldOblique"
+    elif negrito:
+        nome = "Helvetica-Bold"
+    elif italico:
+        nome = "Helvetica-Oblique"
+    return nome, float(fonte.sz or 11), _cor(fonte.color) or "000000"
+
+
+def _cabe_cp1252(texto):
+    try:
+        texto.encode("cp1252")
+        return True
+    except UnicodeEncodeError:
+        return False
+
+
+_SUBSTITUICOES = {"■": "•", "▪": "•", "●": "•", "✓": "v"}
+
+
+def _quebrar_linhas(texto, fonte, tamanho, largura):
+    linhas = []
+    for paragrafo in texto.split("\n"):
+        palavras = paragrafo.split(" ")
+        atual = ""
+        for palavra in palavras:
+            candidato = palavra if not atual else f"{atual} {palavra}"
+            if stringWidth(candidato, fonte, tamanho) <= largura or not atual:
+                atual = candidato
+            else:
+                linhas.append(atual)
+                atual = palavra
+        linhas.append(atual)
+    return linhas
+
+
+class MotorPython:
+    nome = "python"
+
+    def assinatura(self):
+        # O que, além do template e das células, muda o PDF (chave do cache)
+        return f"{self.nome} v{VERSAO} fundo={int(_usar_fundo())}"
+
+    def aquecer(self):
+        from modelos import CELULAS_EXTRAS, caminho_template
+        from preencher import TIPOS_PROPOSTA
+        for tipo, (_, mapping) in TIPOS_PROPOSTA.items():
+            modelo = carregar_modelo(caminho_template(tipo))
+            if _usar_fundo():
+                modelo.fundo({c.upper() for c in mapping.values()} | CELULAS_EXTRAS)
+
+    def renderizar(self, template, celulas, output_path):
+        with etapa("python.carregar_modelo"):
+            modelo = carregar_modelo(template)
+        valores = {coord.upper(): _converter_entrada(v) for coord, v in celulas.items()}
+        avaliador = Avaliador(modelo, valores)
+        if not _usar_fundo():
+            with etapa("python.desenhar"), open(output_path, "wb") as destino:
+                desenhar_pdf(modelo, avaliador, destino)
+            return
+        with etapa("python.fundo"):
+            dinamicas, fundo = modelo.fundo(valores)
+        textos = io.BytesIO()
+        with etapa("python.desenhar"):
+            desenhar_pdf(modelo, avaliador, textos, camada="textos", dinamicas=dinamicas)
+        with etapa("python.sobrepor"), open(output_path, "wb") as destino:
+            sobrepor(fundo, textos, destino)
+
+
+def _usar_fundo():
+    return PdfReader is not None and os.environ.get("GEPROP_FUNDO", "1") != "0"
+
+
+def sobrepor(fundo, textos, destino):
+    # Página a página: os textos da proposta entram como um Form XObject
+    # desenhado por cima do fundo. Os recursos de cada camada ficam
+    # separados (as duas têm fontes /F1, /F2...) e o conteúdo do fundo é
+    # copiado sem ser interpretado de novo.
+    escritor = PdfWriter()
+    leitor_textos = PdfReader(textos)
+    for pagina_fundo, pagina_textos in zip(PdfReader(io.BytesIO(fundo)).pages, leitor_textos.pages):
+        pagina = escritor.add_page(pagina_fundo)
+        forma = StreamObject()
+        forma.set_data(pagina_textos.get_contents().get_data())
+        forma.update({
+            NameObject("/Type"): NameObject("/XObject"),
+            NameObject("/Subtype"): NameObject("/Form"),
+            NameObject("/BBox"): pagina_textos.mediabox,
+            NameObject("/Resources"): pagina_textos["/Resources"].clone(escritor),
+        })
+        recursos = DictionaryObject(pagina["/Resources"].get_object())
+        xobjetos = DictionaryObject(recursos.get("/XObject", DictionaryObject()).get_object())
+        xobjetos[NameObject("/GePropTextos")] = escritor._add_object(forma)
+        recursos[NameObject("/XObject")] = xobjetos
+        pagina[NameObject("/Resources")] = recursos
+        conteudo = pagina["/Contents"].get_object()
+        partes = list(conteudo) if isinstance(conteudo, ArrayObject) else [pagina.raw_get("/Contents")]
+        pagina[NameObject("/Contents")] = ArrayObject(
+            [_fluxo(escritor, b"q\n")] + partes + [_fluxo(escritor, b"\nQ q /GePropTextos Do Q\n")])
+    escritor.write(destino)
+
+
+def _fluxo(escritor, dados):
+    fluxo = StreamObject()
+    fluxo.set_data(dados)
+    return escritor._add_object(fluxo)
+
+
+def _bordas(pdf, celula, x, y, w, h):
+    # Coordenadas da planilha (y cresce para baixo)
+    borda = celula.border
+    for lado, (xa, ya, xb, yb) in (
+        ("left", (x, y, x, y + h)),
+        ("right", (x + w, y, x + w, y + h)),
+        ("top", (x, y, x + w, y)),
+        ("bottom", (x, y + h, x + w, y + h)),
+    ):
+        estilo = getattr(borda, lado)
+        if estilo is None or not estilo.style:
+            continue
+        pdf.setStrokeColorRGB(*_rgb(_cor(estilo.color) or "000000"))
+        pdf.setLineWidth({"medium": 1.0, "thick": 1.5, "double": 1.5}.get(estilo.style, 0.5))
+        pdf.line(xa, ya, xb, yb)
+
+
+def _texto(pdf, celula, valor, x, y, w, h):
+    texto = formatar_numero(valor, celula.number_format)
+    if not texto:
+        return
+    for de, para in _SUBSTITUICOES.items():
+        texto = texto.replace(de, para)
+    if not _cabe_cp1252(texto):
+        texto = texto.encode("cp1252", "replace").decode("cp1252")
+    fonte, tamanho, cor = _fonte(celula)
+    alinhamento = celula.alignment
+    horizontal = alinhamento.horizontal or ("right" if isinstance(valor, float) else "left")
+    vertical = alinhamento.vertical or "bottom"
+    folga = 2.0
+    if alinhamento.wrap_text or "\n" in texto:
+        linhas = _quebrar_linhas(texto, fonte, tamanho, max(w - 2 * folga, 1))
+    else:
+        linhas = [texto]
+    altura_linha = tamanho * 1.2
+    bloco = altura_linha * len(linhas)
+    if vertical == "top":
+        base = y + h - tamanho
+    elif vertical == "center":
+        base = y + (h + bloco) / 2 - tamanho
+    else:
+        base = y + bloco - tamanho + folga
+    pdf.setFillColorRGB(*_rgb(cor))
+    pdf.setFont(fonte, tamanho)
+    for i, linha in enumerate(linhas):
+        ly = base - i * altura_linha
+        if horizontal in ("center", "centerContinuous", "distributed"):
+            pdf.drawCentredString(x + w / 2, ly, linha)
+        elif horizontal == "right":
+            pdf.drawRightString(x + w - folga, ly, linha)
+        else:
+            pdf.drawString(x + folga, ly, linha)
+
+
+def _desenho(pdf, d, x, y, w, h, leitor):
+    pdf.saveState()
+    if d.tipo == "imagem":
+        pdf.translate(x, y + h)
+        pdf.scale(1, -1)
+        pdf.drawImage(leitor, 0, 0, w, h, mask="auto")
+    elif d.tipo == "linha":
+        if d.contorno:
+            pdf.setStrokeColorRGB(*_rgb(d.contorno))
+            pdf.setLineWidth(d.espessura)
+            pdf.line(x, y, x + w, y + h)
+    else:
+        if isinstance(d.preenchimento, list):
+            caminho = pdf.beginPath()
+            caminho.rect(x, y, w, h)
+            pdf.clipPath(caminho, stroke=0, fill=0)
+            posicoes = [p for p, _ in d.preenchimento]
+            cores = [Color(*_rgb(c)) for _, c in d.preenchimento]
+            pdf.linearGradient(x + w, y, x, y, cores, posicoes, extend=True)
+        elif d.preenchimento:
+            pdf.setFillColorRGB(*_rgb(d.preenchimento))
+            pdf.rect(x, y, w, h, stroke=0, fill=1)
+        if d.contorno:
+            pdf.setStrokeColorRGB(*_rgb(d.contorno))
+            pdf.setLineWidth(d.espessura)
+            pdf.rect(x, y, w, h, stroke=1, fill=0)
+        if d.paragrafos:
+            # Texto com o eixo y para cima, a partir do topo da caixa
+            pdf.translate(0, 2 * y + h)
+            pdf.scale(1, -1)
+            folga = 7.2
+            topo = y + h - folga
+            for alinhamento, trechos in d.paragrafos:
+                texto = "".join(t for t, _, _, _ in trechos)
+                tamanho = trechos[0][1] if trechos else 11.0
+                topo -= tamanho * 1.2
+                if not texto:
+                    continue
+                _, _, negrito, cor = trechos[0]
+                fonte = "Helvetica-Bold" if negrito else "Helvetica"
+                pdf.setFont(fonte, tamanho)
+                pdf.setFillColorRGB(*_rgb(cor))
+                if alinhamento == "ctr":
+                    pdf.drawCentredString(x + w / 2, topo, texto)
+                elif alinhamento == "r":
+                    pdf.drawRightString(x + w - folga, topo, texto)
+                else:
+                    pdf.drawString(x + folga, topo, texto)
+    pdf.restoreState()
+
+
+def desenhar_pdf(modelo, avaliador, destino, camada=None, dinamicas=frozenset()):
+    # camada: None = página completa; "fundo" = tudo menos o texto das
+    # células dinâmicas; "textos" = só o texto delas
+    ws = modelo.planilha
+    fundo = camada != "textos"
+    pdf = canvas.Canvas(destino, pagesize=modelo.papel, pageCompression=1)
+    larg_papel, alt_papel = modelo.papel
+    for (c1, c2), (l1, l2) in modelo.paginas:
+        x0, y0 = modelo.x_col[c1], modelo.y_lin[l1]
+        larg = modelo.x_col[c2 + 1] - x0
+        alt = modelo.y_lin[l2 + 1] - y0
+        esc = modelo.escala
+        dx = (larg_papel - larg * esc) / 2 if modelo.centralizar_h else modelo.margem_esq
+        dy = (alt_papel - alt * esc) / 2 if modelo.centralizar_v else modelo.margem_topo
+
+        pdf.saveState()
+        # Coordenadas da planilha: origem no canto superior esquerdo da página
+        pdf.translate(dx, alt_papel - dy)
+        pdf.scale(esc, -esc)
+        caminho = pdf.beginPath()
+        caminho.rect(0, 0, larg, alt)
+        pdf.clipPath(caminho, stroke=0, fill=0)
+        pdf.translate(-x0, -y0)
+
+        def retangulo(lin, col):
+            # Retângulo (x, y, w, h) em coordenadas da planilha, já com mescla
+            faixa = modelo.mescladas.get((lin, col))
+            if faixa:
+                fc1, fl1, fc2, fl2 = faixa
+            else:
+                fc1, fl1, fc2, fl2 = col, lin, col, lin
+            x = modelo.x_col[fc1]
+            y = modelo.y_lin[fl1]
+            return x, y, modelo.x_col[fc2 + 1] - x, modelo.y_lin[fl2 + 1] - y
+
+        if fundo:
+            # 1) preenchimentos e bordas
+            for lin in range(l1, l2 + 1):
+                for col in range(c1, c2 + 1):
+                    if (lin, col) in modelo.cobertas:
+                        continue
+                    celula = ws.cell(row=lin, column=col)
+                    x, y, w, h = retangulo(lin, col)
+                    fill = celula.fill
+                    if fill is not None and fill.fill_type == "solid":
+                        cor = _cor(fill.fgColor)
+                        if cor:
+                            pdf.setFillColorRGB(*_rgb(cor))
+                            pdf.rect(x, y, w, h, stroke=0, fill=1)
+                    _bordas(pdf, celula, x, y, w, h)
+
+            # 2) imagens, formas e linhas por cima das células
+            for d, ix, iy, iw, ih, leitor in modelo.desenhos:
+                if ix > modelo.x_col[c2 + 1] or ix + iw < x0 or iy > modelo.y_lin[l2 + 1] or iy + ih < y0:
+                    continue
+                _desenho(pdf, d, ix, iy, iw, ih, leitor)
+
+        # 3) textos (com o eixo y de volta para cima em cada célula)
+        for lin in range(l1, l2 + 1):
+            for col in range(c1, c2 + 1):
+                if (lin, col) in modelo.cobertas:
+                    continue
+                coord = f"{get_column_letter(col)}{lin}"
+                if camada is not None and (coord in dinamicas) != (camada == "textos"):
+                    continue
+                if coord not in modelo.formulas and coord not in modelo.constantes \
+                        and coord not in avaliador.valores:
+                    continue
+                try:
+                    valor = avaliador.valor(coord)
+                except ValueError as e:
+                    valor = str(e).split(" ")[0]
+                if valor is VAZIO:
+                    continue
+                celula = ws.cell(row=lin, column=col)
+                x, y, w, h = retangulo(lin, col)
+                pdf.saveState()
+                pdf.translate(0, 2 * y + h)
+                pdf.scale(1, -1)
+                _texto(pdf, celula, valor, x, y, w, h)
+                pdf.restoreState()
+
+        pdf.restoreState()
+        pdf.showPage()
+    pdf.save()
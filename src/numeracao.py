@@ -0,0 +1,131 @@
+# numeracao.py
+# Sequência dos números de proposta guardada no banco (banco.py).
+#
+# Antes o próximo número era descoberto listando todos os PDFs da pasta de
+# saída a cada abertura da janela. Agora o último número fica numa tabela
+# e é lido/incrementado numa transação, então duas instâncias abertas ao
+# mesmo tempo nunca recebem o mesmo número. A pasta só é varrida na
+# primeira vez (banco vazio) ou quando se pede reconstruir().
+#
+#   python numeracao.py              mostra o próximo número
+#   python numeracao.py --reconstruir  refaz a sequência a partir dos PDFs
+
+import argparse
+import os
+
+from banco import conectar
+from preencher import OUTPUT_DIR
+
+SEQUENCIA = "proposta"
+
+
+def _criar_tabela(conexao):
+    conexao.execute(
+        "CREATE TABLE IF NOT EXISTS sequencia ("
+        " nome TEXT PRIMARY KEY,"
+        " ultimo INTEGER NOT NULL)"
+    )
+
+
+def numero_do_arquivo(filename):
+    # "123PROPOSTA FULANO.pdf" -> 123 (None se não seguir o padrão)
+    if not filename.endswith('.pdf'):
+        return None
+    try:
+        return int(filename.split('PROPOSTA')[0])
+    except ValueError:
+        return None
+
+
+def maior_numero_na_pasta(pasta=OUTPUT_DIR):
+    last_number = 0
+    if os.path.exists(pasta):
+        with os.scandir(pasta) as entradas:
+            for entrada in entradas:
+                num = numero_do_arquivo(entrada.name)
+                if num is not None:
+                    last_number = max(last_number, num)
+    return last_number
+
+
+def _ultimo(conexao, pasta):
+    # Lê o último número dentro de uma transação já aberta
+    _criar_tabela(conexao)
+    linha = conexao.execute("SELECT ultimo FROM sequencia WHERE nome = ?", (SEQUENCIA,)).fetchone()
+    if linha is None:
+        # Primeira execução: aproveita o que já existe na pasta
+        ultimo = maior_numero_na_pasta(pasta)
+        conexao.execute("INSERT INTO sequencia (nome, ultimo) VALUES (?, ?)", (SEQUENCIA, ultimo))
+        return ultimo
+    return linha[0]
+
+
+def _transacao(pasta, funcao):
+    conexao = conectar(pasta)
+    try:
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            resultado = funcao(conexao)
+        except Exception:
+            conexao.execute("ROLLBACK")
+            raise
+        conexao.execute("COMMIT")
+        return resultado
+    finally:
+        conexao.close()
+
+
+def consultar_proximo(pasta=OUTPUT_DIR):
+    # Só mostra o próximo número, sem reservá-lo
+    return _transacao(pasta, lambda c: _ultimo(c, pasta) + 1)
+
+
+def reservar_bloco(quantidade, pasta=OUTPUT_DIR):
+    # Reserva `quantidade` números consecutivos e devolve um range com eles
+    def reservar(conexao):
+        inicio = _ultimo(conexao, pasta) + 1
+        conexao.execute("UPDATE sequencia SET ultimo = ? WHERE nome = ?",
+                        (inicio + quantidade - 1, SEQUENCIA))
+        return range(inicio, inicio + quantidade)
+    return _transacao(pasta, reservar)
+
+
+def alocar(pasta=OUTPUT_DIR):
+    return reservar_bloco(1, pasta)[0]
+
+
+def registrar_uso(numero, pasta=OUTPUT_DIR):
+    # Número digitado à mão: garante que a sequência continue depois dele
+    def registrar(conexao):
+        ultimo = max(_ultimo(conexao, pasta), int(numero))
+        conexao.execute("UPDATE sequencia SET ultimo = ? WHERE nome = ?", (ultimo, SEQUENCIA))
+        return ultimo
+    return _transacao(pasta, registrar)
+
+
+def reconstruir(pasta=OUTPUT_DIR):
+    # Refaz a sequência a partir dos PDFs (nunca volta para trás)
+    maior = maior_numero_na_pasta(pasta)
+
+    def refazer(conexao):
+        _criar_tabela(conexao)
+        conexao.execute(
+            "INSERT INTO sequencia (nome, ultimo) VALUES (?, ?) "
+            "ON CONFLICT(nome) DO UPDATE SET ultimo = MAX(ultimo, excluded.ultimo)",
+            (SEQUENCIA, maior))
+        return conexao.execute("SELECT ultimo FROM sequencia WHERE nome = ?", (SEQUENCIA,)).fetchone()[0]
+    return _transacao(pasta, refazer)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Numeração das propostas.")
+    parser.add_argument("--pasta", default=OUTPUT_DIR, help="pasta dos PDFs")
+    parser.add_argument("--reconstruir", action="store_true", help="refaz a sequência varrendo a pasta")
+    args = parser.parse_args(argv)
+    if args.reconstruir:
+        print(f"Último número encontrado: {reconstruir(args.pasta)}")
+    print(f"Próximo número: {consultar_proximo(args.pasta)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# plano.py
+# Plano de preenchimento de um template: agrupa as células do mapeamento em
+# blocos retangulares para o Excel receber poucas escritas em lote
+# (sht.range("D8:J15").value = [[...], ...]) em vez de uma chamada COM por
+# célula. O plano só depende do template e do conjunto de células, então é
+# compilado uma vez e fica em cache durante o processo. As mesclas vêm da
+# ficha do template (modelos.py).
+
+import re
+import threading
+
+from openpyxl.utils import get_column_letter, range_boundaries
+
+from modelos import ficha
+
+_COORD = re.compile(r"^([A-Z]{1,3})(\d+)$")
+
+
+def _coordenada(cell):
+    col, lin = _COORD.match(cell.upper()).groups()
+    c, l, _, _ = range_boundaries(f"{col}{lin}")
+    return l, c
+
+
+class Bloco:
+    # Um retângulo da planilha e a célula mapeada em cada posição
+    # (None nas células escondidas por uma mescla cuja âncora está no bloco)
+    __slots__ = ("endereco", "grade")
+
+    def __init__(self, endereco, grade):
+        self.endereco = endereco
+        self.grade = grade
+
+    def valores(self, celulas):
+        return [[celulas.get(cell) if cell else None for cell in linha] for linha in self.grade]
+
+    def __repr__(self):
+        return f"Bloco({self.endereco})"
+
+
+def compilar(template, cells):
+    # cells: coordenadas que serão escritas (ex.: {"D8", "D9", ...})
+    mescla_de = {}
+    for c1, l1, c2, l2 in ficha(template).mesclagens:
+        for l in range(l1, l2 + 1):
+            for c in range(c1, c2 + 1):
+                mescla_de[(l, c)] = (c1, l1, c2, l2)
+
+    mapeadas = {_coordenada(cell): cell.upper() for cell in cells}
+    # Posições que podem entrar num bloco: as mapeadas e as escondidas pela
+    # mescla de uma célula mapeada (o Excel ignora o valor delas)
+    permitidas = dict(mapeadas)
+    for (l, c) in mapeadas:
+        faixa = mescla_de.get((l, c))
+        if faixa and (faixa[1], faixa[0]) == (l, c):
+            c1, l1, c2, l2 = faixa
+            for ll in range(l1, l2 + 1):
+                for cc in range(c1, c2 + 1):
+                    permitidas.setdefault((ll, cc), None)
+
+    def expandir(l1, c1, l2, c2):
+        # Aumenta o retângulo até conter inteiras as mesclas que ele toca
+        while True:
+            n1, m1, n2, m2 = l1, c1, l2, c2
+            for l in range(l1, l2 + 1):
+                for c in range(c1, c2 + 1):
+                    faixa = mescla_de.get((l, c))
+                    if faixa:
+                        fc1, fl1, fc2, fl2 = faixa
+                        n1, m1, n2, m2 = min(n1, fl1), min(m1, fc1), max(n2, fl2), max(m2, fc2)
+            if (n1, m1, n2, m2) == (l1, c1, l2, c2):
+                return l1, c1, l2, c2
+            l1, c1, l2, c2 = n1, m1, n2, m2
+
+    def cabe(l1, c1, l2, c2):
+        return all((l, c) in permitidas and (l, c) not in usadas
+                   for l in range(l1, l2 + 1) for c in range(c1, c2 + 1))
+
+    blocos = []
+    usadas = set()
+    for (l, c) in sorted(mapeadas):
+        if (l, c) in usadas:
+            continue
+        retangulo = expandir(l, c, l, c)
+        # Cresce para a direita e depois para baixo enquanto o retângulo
+        # só tiver posições permitidas e ainda não usadas
+        for lado in ("direita", "baixo"):
+            while True:
+                l1, c1, l2, c2 = retangulo
+                maior = expandir(l1, c1, l2, c2 + 1) if lado == "direita" else expandir(l1, c1, l2 + 1, c2)
+                if not cabe(*maior):
+                    break
+                retangulo = maior
+        l1, c1, l2, c2 = retangulo
+        grade = [[mapeadas.get((ll, cc)) for cc in range(c1, c2 + 1)] for ll in range(l1, l2 + 1)]
+        for ll in range(l1, l2 + 1):
+            for cc in range(c1, c2 + 1):
+                usadas.add((ll, cc))
+        endereco = f"{get_column_letter(c1)}{l1}"
+        if (l1, c1) != (l2, c2):
+            endereco += f":{get_column_letter(c2)}{l2}"
+        blocos.append(Bloco(endereco, grade))
+    return blocos
+
+
+_planos = {}
+_planos_lock = threading.Lock()
+
+
+def plano(template, cells):
+    # O hash do template entra na chave: trocar o arquivo refaz o plano
+    chave = (template, ficha(template).hash, frozenset(cell.upper() for cell in cells))
+    with _planos_lock:
+        if chave not in _planos:
+            _planos[chave] = compilar(template, chave[2])
+        return _planos[chave]
+
+
+def escrever(sht, blocos, celulas):
+    # Uma escrita por bloco
+    for bloco in blocos:
+        valores = bloco.valores(celulas)
+        sht.range(bloco.endereco).value = valores[0][0] if len(valores) == 1 and len(valores[0]) == 1 else valores
@@ -0,0 +1,156 @@
+# pool_excel.py
+# Python ≥ 3.8  |  pip install xlwings  (Windows com Excel instalado)
+#
+# Pool de instâncias do Excel que ficam abertas durante a sessão, com os
+# templates já carregados. Cada proposta só preenche as células, exporta o
+# PDF e devolve a planilha ao estado original, sem abrir/fechar o Excel.
+
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+from instrumentacao import etapa
+from plano import escrever, plano
+
+
+class TrabalhadorExcel(threading.Thread):
+    # Uma thread = um Excel. O COM exige que o Excel seja usado sempre
+    # pela mesma thread que o criou.
+
+    def __init__(self, pool, indice):
+        super().__init__(name=f"excel-{indice}", daemon=True)
+        self.pool = pool
+        self.app = None
+        self.livros = {}    # template -> (wb, sheet, {bloco: fórmulas originais})
+        self.trabalhos = 0
+
+    def _iniciar_excel(self):
+        import xlwings as xw
+
+        self.app = xw.App(visible=False, add_book=False)
+        self.app.display_alerts = False
+        self.app.screen_updating = False
+        self.livros = {}
+        for template in self.pool.templates:
+            self._abrir(template)
+        self.trabalhos = 0
+
+    def _abrir(self, template):
+        wb = self.app.books.open(template, update_links=False, read_only=True)
+        sht = wb.sheets[0]
+        # Uma leitura por bloco do plano (em vez de uma por célula)
+        blocos = plano(template, self.pool.celulas_por_template[template])
+        originais = {bloco.endereco: sht.range(bloco.endereco).formula for bloco in blocos}
+        self.livros[template] = (wb, sht, originais)
+        return self.livros[template]
+
+    def _encerrar_excel(self):
+        if self.app is None:
+            return
+        try:
+            for wb, _, _ in self.livros.values():
+                wb.close()
+            self.app.quit()
+        except Exception:
+            # Excel travado: mata o processo
+            try:
+                self.app.kill()
+            except Exception:
+                pass
+        self.app = None
+        self.livros = {}
+
+    def saudavel(self):
+        try:
+            return self.app is not None and self.app.api.Ready and len(self.app.books) == len(self.livros)
+        except Exception:
+            return False
+
+    def _renderizar(self, template, celulas, output_path):
+        if template not in self.livros:
+            self._abrir(template)
+        wb, sht, originais = self.livros[template]
+        blocos = plano(template, celulas)
+        try:
+            with etapa("excel.preencher", blocos=len(blocos)):
+                escrever(sht, blocos, celulas)
+            with etapa("excel.exportar"):
+                wb.to_pdf(os.path.abspath(output_path))
+        finally:
+            # Volta a planilha ao estado do template para a próxima proposta
+            with etapa("excel.restaurar"):
+                for bloco in blocos:
+                    sht.range(bloco.endereco).formula = originais.get(bloco.endereco, "")
+        self.trabalhos += 1
+
+    def run(self):
+        import pythoncom
+
+        pythoncom.CoInitialize()
+        try:
+            while True:
+                tarefa = self.pool.fila.get()
+                if tarefa is None:
+                    break
+                template, celulas, output_path, futuro = tarefa
+                if not futuro.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if self.app is None or not self.saudavel():
+                        with etapa("excel.iniciar", pool=True):
+                            self._encerrar_excel()
+                            self._iniciar_excel()
+                    if template is not None:
+                        self._renderizar(template, celulas, output_path)
+                    futuro.set_result(output_path)
+                except Exception as e:
+                    futuro.set_exception(e)
+                    # Depois de um erro o Excel pode ter ficado num estado ruim
+                    self._encerrar_excel()
+                if self.app is not None and self.trabalhos >= self.pool.max_trabalhos:
+                    self._encerrar_excel()
+                    self._iniciar_excel()
+        finally:
+            self._encerrar_excel()
+            pythoncom.CoUninitialize()
+
+
+class PoolExcel:
+    nome = "excel-pool"
+
+    def __init__(self, tamanho=None, max_trabalhos=None):
+        from modelos import CELULAS_EXTRAS, caminho_template
+        from preencher import TIPOS_PROPOSTA
+
+        self.tamanho = tamanho or int(os.environ.get("GEPROP_POOL_EXCEL", "1"))
+        self.max_trabalhos = max_trabalhos or int(os.environ.get("GEPROP_POOL_RECICLAR", "50"))
+        self.templates = []
+        self.celulas_por_template = {}
+        for tipo, (_, mapping) in TIPOS_PROPOSTA.items():
+            template = caminho_template(tipo)
+            self.templates.append(template)
+            self.celulas_por_template[template] = set(mapping.values()) | CELULAS_EXTRAS
+        self.fila = queue.Queue()
+        self.trabalhadores = [TrabalhadorExcel(self, i) for i in range(self.tamanho)]
+        for t in self.trabalhadores:
+            t.start()
+
+    def renderizar(self, template, celulas, output_path):
+        return self.enviar(template, celulas, output_path).result()
+
+    def enviar(self, template, celulas, output_path):
+        futuro = Future()
+        self.fila.put((template, dict(celulas), output_path, futuro))
+        return futuro
+
+    def aquecer(self):
+        # Cada trabalhador abre o Excel e os templates em segundo plano
+        for _ in self.trabalhadores:
+            self.fila.put((None, {}, None, Future()))
+
+    def encerrar(self):
+        for _ in self.trabalhadores:
+            self.fila.put(None)
+        for t in self.trabalhadores:
+            t.join(timeout=30)
@@ -1,9 +1,11 @@
 # fill_and_export.py  
-# Python ≥ 3.8  |  pip install xlwings
+# Python ≥ 3.8  |  pip install openpyxl reportlab  (xlwings é opcional)
 
 import os
-import xlwings as xw
+import re
+import sys
 from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
 
 # 1. MAPEAMENTO: “Rótulo” → “Célula”
 MAPPING_00001 = {
@@ -44,31 +46,108 @@ MAPPING_00003 = {
     "Preço Total": "G29",
 }
 
+# Tipo de proposta -> (nome do template, mapeamento)
+TIPOS_PROPOSTA = {
+    "1- Proposta Simples": ("00001 - FAZER PROPOSTA PC", MAPPING_00001),
+    "2- Proposta Dupla": ("00002 - FAZER DUPLA PROPOSTA PC", MAPPING_00002),
+    "3- Proposta com Mão de Obra": ("00003 - FAZER PROPOSTA MAO DE OBRA E EQUIPAMENTOS PC", MAPPING_00003),
+}
+
 # 2. Pasta de saída
 OUTPUT_DIR = "propostas"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 
+def resource_path(relative_path):
+    # se estiver rodando empacotado, usa o _MEIPASS
+    base = getattr(sys, '_MEIPASS', None)
+    if base is None:
+        # rodando do código-fonte: json/ e templates/ ficam na raiz do projeto
+        base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base, relative_path)
+
+
+# Rótulos de preço em qualquer mapeamento
+CAMPOS_PRECO = {
+    "Preço", "Preço 2", "Preço dos Equipamentos", "Preço da Mão de Obra", "Preço Total",
+}
+
+# Total -> parcelas que o compõem (soma em dinheiro.calcular_totais)
+TOTAIS = {"Preço Total": ("Preço dos Equipamentos", "Preço da Mão de Obra")}
+
+CENTAVO = Decimal("0.01")
+_INTEIRO = re.compile(r"^\d+$")
+_MILHAR_PONTO = re.compile(r"^\d{1,3}(\.\d{3})+$")
+_MILHAR_VIRGULA = re.compile(r"^\d{1,3}(,\d{3})+$")
+_CENTAVOS = re.compile(r"^\d{0,2}$")
+
+
+class PrecoInvalido(ValueError):
+    pass
+
+
+def ler_preco(valor):
+    # Leitura única de preços (janela, linha de comando, lote, busca):
+    #   "R$ 1.234,56", "1234,56", "1234.56", "1.234" (milhar), 1234.5 -> Decimal
+    # Vazio vale 0. Mais de duas casas decimais ou letras: PrecoInvalido.
+    if isinstance(valor, (int, float, Decimal)) and not isinstance(valor, bool):
+        # número de verdade (célula do .xlsx): só arredonda para centavos
+        return Decimal(str(valor)).quantize(CENTAVO, ROUND_HALF_UP)
+    texto = str(valor or "").replace("R$", "").replace(" ", "").replace("\xa0", "")
+    if not texto:
+        return Decimal(0)
+    virgulas, pontos = texto.count(","), texto.count(".")
+    if virgulas and pontos:
+        # o separador mais à direita é o decimal
+        decimal = "," if texto.rfind(",") > texto.rfind(".") else "."
+    elif virgulas == 1:
+        decimal = ","
+    elif pontos == 1 and not _MILHAR_PONTO.match(texto):
+        decimal = "."
+    else:
+        decimal = None
+    if decimal:
+        inteiro, _, centavos = texto.rpartition(decimal)
+    else:
+        inteiro, centavos = texto, ""
+    milhar = _MILHAR_VIRGULA if decimal == "." or (decimal is None and virgulas) else _MILHAR_PONTO
+    if not (_INTEIRO.match(inteiro) or milhar.match(inteiro)) or not _CENTAVOS.match(centavos):
+        raise PrecoInvalido(f"Preço inválido: {valor}")
+    return Decimal(f"{inteiro.replace(',', '').replace('.', '')}.{centavos or '0'}")
+
+
+def normalize_price(valor_str: str) -> str:
+    # Preço no formato que vai para a planilha ("1234.56")
+    return f"{ler_preco(valor_str):.2f}"
+
+
 def get_next_proposal_number():
-    # Busca o último número de proposta nos arquivos PDF
-    last_number = 0
-    if os.path.exists(OUTPUT_DIR):
-        for filename in os.listdir(OUTPUT_DIR):
-            if filename.endswith('.pdf'):
-                try:
-                    num = int(filename.split('PROPOSTA')[0])
-                    last_number = max(last_number, num)
-                except ValueError:
-                    continue
-    return str(last_number + 1)
+    # Próximo número da sequência guardada no banco (ver numeracao.py)
+    from numeracao import consultar_proximo
+    return str(consultar_proximo(OUTPUT_DIR))
 
 def main():
+    from dinheiro import soma
+    from instrumentacao import etapa
+    from renderizador import gerar_pdf
+    from saida import caminho_proposta
+
     today = date.today().strftime("%d/%m/%Y")
     dados = {}
     numero_end = None
-    next_number = get_next_proposal_number()
-
-    # 3. Coleta dos valores com defaults e uppercase
+    with etapa("cli.consultar_numero"):
+        next_number = get_next_proposal_number()
+
+    # 3. Escolhe o tipo de proposta (define template e mapeamento)
+    tipos = list(TIPOS_PROPOSTA)
+    for tipo in tipos:
+        print(tipo)
+    raw = input("Tipo de Proposta [1]: ").strip() or "1"
+    tipo_proposta = next((t for t in tipos if t.startswith(raw)), tipos[0])
+    dados["Tipo de Proposta"] = tipo_proposta
+    _, MAPPING = TIPOS_PROPOSTA[tipo_proposta]
+
+    # 4. Coleta dos valores com defaults e uppercase
     for label, cell in MAPPING.items():
         # Define default conforme o campo
         if label == "Data":
@@ -81,13 +160,23 @@ def main():
             default = "MG"
         elif label == "Cidade":
             default = "NOVA SERRANA"
-        elif label == "Estrutura Para":
+        elif label in ("Estrutura Para", "Estrutura Para 2"):
             default = "TELHADO METÁLICO"
         else:
             default = None
 
         # Prompt com default
-        if default is not None:
+        if label in CAMPOS_PRECO:
+            # mesma leitura da janela e do lote; pergunta de novo se inválido
+            sugerido = str(soma(dados[p] for p in TOTAIS[label])) if label in TOTAIS else ""
+            while True:
+                try:
+                    raw = input(f"{label} [{sugerido}]: " if sugerido else f"{label}: ")
+                    valor = normalize_price(raw.strip() or sugerido)
+                    break
+                except PrecoInvalido as e:
+                    print(e)
+        elif default is not None:
             raw = input(f"{label} [{default}]: ").strip()
             valor = raw.upper() if raw else default.upper()
         else:
@@ -101,42 +190,20 @@ def main():
             if raw_num:
                 numero_end = raw_num.upper()
 
-    # 4. Abre o template
-    template = r"00001 - FAZER PROPOSTA PC.xlsx"
-    app = xw.App(visible=False)
-    wb  = app.books.open(template)
-    sht = wb.sheets[0]
-
-    MAPPING = MAPPING_00001
-
-    if dados["Tipo de Proposta"] == "1- Proposta Simples":
-        MAPPING = MAPPING_00001
-    elif dados["Tipo de Proposta"] == "2- Proposta Dupla":
-        MAPPING = MAPPING_00002
-    elif dados["Tipo de Proposta"] == "3- Proposta com Mão de Obra":
-        MAPPING = MAPPING_00003
-
-    # 5. Preenche as células
-    for label, cell in MAPPING.items():
-        sht.range(cell).value = dados[label]
-
-    # Preenche número do endereço, se informado
-    if numero_end:
-        sht.range("I13").value = "Nº"
-        sht.range("J13").value = numero_end
-
-    # 6. Gera nome do PDF
-    numero = dados["N° da Proposta"]
-    nome   = dados["Nome do Cliente"]
-    filename = f"{numero}PROPOSTA {nome}.pdf"
-    output_path = os.path.join(OUTPUT_DIR, filename)
+    # 5. Reserva o número (o sugerido pode ter sido usado por outra instância)
+    from numeracao import alocar, registrar_uso
+    with etapa("cli.numeracao"):
+        if dados["N° da Proposta"] == next_number:
+            dados["N° da Proposta"] = str(alocar(OUTPUT_DIR))
+        elif dados["N° da Proposta"].isdigit():
+            registrar_uso(int(dados["N° da Proposta"]), OUTPUT_DIR)
 
-    # 7. Exporta para PDF
-    wb.to_pdf(output_path)
+    # 6. Gera nome do PDF (sem caracteres inválidos; " (2)" se já existir)
+    output_path = caminho_proposta(OUTPUT_DIR, dados["N° da Proposta"], dados["Nome do Cliente"])
 
-    # 8. Finaliza
-    wb.close()
-    app.quit()
+    # 7. Preenche o template e exporta para PDF
+    with etapa("cli.gerar_pdf", tipo=tipo_proposta):
+        gerar_pdf(tipo_proposta, dados, output_path, numero_end=numero_end)
     print(f"✔ PDF gerado: {output_path}")
 
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+# producao.py
+# Python ≥ 3.8  |  pip install numpy
+#
+# Estimativa da "Produção Média Mensal" (kWh/mês) a partir da quantidade e
+# potência dos painéis, da cidade/estado e do tipo de estrutura:
+#
+#   kWp × média mensal de (irradiação diária × dias do mês) × fator da estrutura
+#
+# A tabela de irradiação (json/irradiacao.json, por município com o estado
+# como reserva) é lida uma vez e fica em memória já reduzida a um vetor
+# NumPy de kWh/kWp por mês; estimar uma proposta é uma busca no dicionário
+# e uma multiplicação, e estimar_lote() calcula milhares de linhas de uma
+# vez só.
+#
+#   estimar(10, 550, "NOVA SERRANA", "MG", "TELHADO METÁLICO")   # -> 680
+
+import json
+import re
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+
+from preencher import resource_path
+
+ARQUIVO = "json/irradiacao.json"
+
+# Dias de cada mês (fevereiro médio, com os bissextos)
+DIAS_MES = np.array([31, 28.25, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+# Rótulos usados, por grupo da proposta ("" = 1, " 2" = proposta dupla)
+PAINEIS = "Quantidade de Painéis"
+POTENCIA = "Potência dos Painéis (W)"
+ESTRUTURA = "Estrutura Para"
+PRODUCAO = "Produção Média Mensal"
+
+
+@lru_cache(maxsize=4096)
+def normalizar(texto):
+    # "São Gonçalo  do Pará" -> "SAO GONCALO DO PARA"
+    texto = unicodedata.normalize("NFKD", str(texto or ""))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", texto).strip().upper()
+
+
+def _numero(texto):
+    try:
+        return float(str(texto).strip().replace(",", "."))
+    except ValueError:
+        return float("nan")
+
+
+class Estimador:
+    def __init__(self, tabela):
+        municipios = tabela.get("municipios", {})
+        estados = tabela.get("estados", {})
+        nomes = [normalizar(n) for n in municipios] + [normalizar(uf) for uf in estados]
+        irradiacao = np.array(list(municipios.values()) + list(estados.values()), dtype=float).reshape(-1, 12)
+        self.linha = {nome: i for i, nome in enumerate(nomes)}
+        # kWh por kWp instalado num mês médio, antes das perdas
+        self.kwh_por_kwp = (irradiacao * DIAS_MES).sum(axis=1) / 12
+        self.fatores = {normalizar(k): float(v) for k, v in tabela.get("fatores_estrutura", {}).items()}
+        self.fator_padrao = float(tabela.get("fator_padrao", 0.75))
+
+    def _indice(self, cidade, estado):
+        # linha do município, senão a do estado; -1 se nenhum dos dois
+        estado = normalizar(estado)
+        i = self.linha.get(f"{normalizar(cidade)}/{estado}")
+        if i is None:
+            i = self.linha.get(estado, -1)
+        return i
+
+    def estimar(self, paineis, potencia, cidade, estado, estrutura):
+        # kWh/mês arredondado; None se faltar dado ou o local for desconhecido
+        kwp = _numero(paineis) * _numero(potencia) / 1000
+        i = self._indice(cidade, estado)
+        if i < 0 or not kwp > 0:
+            return None
+        fator = self.fatores.get(normalizar(estrutura), self.fator_padrao)
+        return int(round(kwp * self.kwh_por_kwp[i] * fator))
+
+    def estimar_lote(self, paineis, potencias, cidades, estados, estruturas):
+        # Vetores de mesmo tamanho -> array de kWh/mês (NaN onde não dá)
+        kwp = np.array([_numero(p) for p in paineis]) * np.array([_numero(p) for p in potencias]) / 1000
+        indices = np.array([self._indice(c, e) for c, e in zip(cidades, estados)], dtype=int)
+        fatores = np.array([self.fatores.get(normalizar(e), self.fator_padrao) for e in estruturas])
+        kwh = np.append(self.kwh_por_kwp, np.nan)[indices]   # -1 cai no NaN do fim
+        resultado = np.rint(kwp * kwh * fatores)
+        resultado[~(kwp > 0)] = np.nan
+        return resultado
+
+
+@lru_cache(maxsize=None)
+def obter_estimador():
+    with open(resource_path(ARQUIVO), "r", encoding="utf-8") as f:
+        return Estimador(json.load(f))
+
+
+def estimar(paineis, potencia, cidade, estado, estrutura):
+    try:
+        return obter_estimador().estimar(paineis, potencia, cidade, estado, estrutura)
+    except OSError:
+        return None
+
+
+def completar_producao(linhas):
+    # Preenche "Produção Média Mensal" (e "... 2") em branco nos dados de
+    # várias propostas de uma vez, numa passada por grupo
+    for sufixo in ("", " 2"):
+        alvo = PRODUCAO + sufixo
+        pendentes = [d for d in linhas if alvo in d and not str(d[alvo]).strip()]
+        if not pendentes:
+            continue
+        kwh = obter_estimador().estimar_lote(
+            [d.get(PAINEIS + sufixo) for d in pendentes],
+            [d.get(POTENCIA + sufixo) for d in pendentes],
+            [d.get("Cidade") for d in pendentes],
+            [d.get("Estado") for d in pendentes],
+            [d.get(ESTRUTURA + sufixo) for d in pendentes],
+        )
+        for dados, valor in zip(pendentes, kwh):
+            if not np.isnan(valor):
+                dados[alvo] = str(int(valor))
+    return linhas
+
+
+def completar_colunas(tabela):
+    # O mesmo para um lote em registro.Colunas, direto nas colunas
+    for sufixo in ("", " 2"):
+        alvo = PRODUCAO + sufixo
+        linhas = tabela.pendentes(alvo)
+        if not linhas:
+            continue
+        kwh = obter_estimador().estimar_lote(*(tabela.coluna(r, linhas) for r in (
+            PAINEIS + sufixo, POTENCIA + sufixo, "Cidade", "Estado", ESTRUTURA + sufixo)))
+        estimadas = ~np.isnan(kwh)
+        tabela.definir(alvo, np.asarray(linhas)[estimadas].tolist(), map(str, kwh[estimadas].astype(int).tolist()))
+    return tabela
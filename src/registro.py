@@ -0,0 +1,311 @@
+# registro.py
+# Python ≥ 3.8
+#
+# Proposta como registro tipado, uma classe por tipo gerada a partir do
+# MAPPING (TIPOS_PROPOSTA): cada rótulo vira um atributo em __slots__
+# ("Nome do Cliente" -> cliente, "Preço 2" -> preco_2), já convertido:
+#
+#   texto       str, sem espaços nas pontas e em maiúsculas
+#   preços      Dinheiro (CAMPOS_PRECO; total em branco = soma das parcelas)
+#   produção    str: "1.200" vira "1200"; outro texto fica como veio, em
+#               maiúsculas (o campo do formulário é livre)
+#
+#   proposta = registro("2- Proposta Dupla", linha)   # valida e converte
+#   proposta.preco_2                                  # Dinheiro('1200.00')
+#   proposta.dados()                                  # dict dos MAPPING_*
+#
+# Colunas guarda muitas propostas em arrays (preços em centavos, textos
+# como índice numa tabela de textos distintos): alguns bytes por campo em
+# vez de um dict por linha, para lotes de centenas de milhares de linhas.
+
+import re
+import unicodedata
+from array import array
+from datetime import date
+from decimal import Decimal
+
+from dinheiro import dinheiro, soma, valor_proposta
+from preencher import CAMPOS_PRECO, TIPOS_PROPOSTA, TOTAIS, PrecoInvalido
+
+# Rótulo -> atributo; rótulos de um template novo que não estejam aqui
+# viram atributo pelo próprio nome ("Tipo de Telhado" -> tipo_de_telhado)
+ATRIBUTOS = {
+    "Nome do Cliente": "cliente",
+    "N° da Proposta": "numero",
+    "Consultor": "consultor",
+    "Data": "data",
+    "Telefone": "telefone",
+    "Logradouro": "logradouro",
+    "Endereço": "endereco",
+    "Bairro": "bairro",
+    "Cidade": "cidade",
+    "Estado": "estado",
+    "Quantidade de Painéis": "paineis",
+    "Potência dos Painéis (W)": "potencia_paineis",
+    "Quantidade de Inversores": "inversores",
+    "Potência Inversor 1 (W)": "potencia_inversores",
+    "Estrutura Para": "estrutura",
+    "Produção Média Mensal": "producao",
+    "Preço": "preco",
+    "Preço dos Equipamentos": "preco_equipamentos",
+    "Preço da Mão de Obra": "preco_mao_de_obra",
+    "Preço Total": "preco_total",
+}
+
+# Número do endereço: fora do MAPPING, vai para I13/J13 (ver EXTRAS em formulario.py)
+NUMERO_END = "Número"
+
+_NAO_PALAVRA = re.compile(r"\W+")
+_INTEIRO = re.compile(r"^\d{1,3}(\.\d{3})*$|^\d+$")
+
+
+def texto(valor):
+    # Célula ou campo como texto: None -> "", 12.0 (do .xlsx) -> "12"
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
+
+
+def atributo(rotulo):
+    base, dupla = (rotulo[:-2], "_2") if rotulo.endswith(" 2") else (rotulo, "")
+    if base in ATRIBUTOS:
+        return ATRIBUTOS[base] + dupla
+    nome = unicodedata.normalize("NFKD", rotulo).encode("ascii", "ignore").decode()
+    return _NAO_PALAVRA.sub("_", nome).strip("_").lower()
+
+
+def _e_producao(rotulo):
+    return rotulo.startswith("Produção Média Mensal")
+
+
+def _preco(rotulo, valor):
+    try:
+        return dinheiro(valor)
+    except PrecoInvalido:
+        raise PrecoInvalido(f"{rotulo} inválido: {valor}") from None
+
+
+def _producao(rotulo, valor):
+    valor = texto(valor).upper()
+    return valor.replace(".", "") if _INTEIRO.match(valor) else valor
+
+
+def _data(rotulo, valor):
+    return texto(valor).upper() or date.today().strftime("%d/%m/%Y")
+
+
+def _texto(rotulo, valor):
+    return texto(valor).upper()
+
+
+def conversor(rotulo):
+    # Função (rótulo, valor) -> valor tipado do campo
+    if rotulo in CAMPOS_PRECO:
+        return _preco
+    if _e_producao(rotulo):
+        return _producao
+    return _data if rotulo == "Data" else _texto
+
+
+class Registro:
+    # Base das classes de cada tipo (REGISTROS); CAMPOS = ((atributo, rótulo), ...)
+    # na ordem do MAPPING e CONVERSORES com a conversão de cada um
+    __slots__ = ("numero_end",)
+    TIPO = None
+    CAMPOS = ()
+    CONVERSORES = ()
+    ATRIBUTO = {}
+
+    def __init__(self, **valores):
+        for (nome, rotulo), converter in zip(self.CAMPOS, self.CONVERSORES):
+            setattr(self, nome, converter(rotulo, valores.get(nome)))
+        self.numero_end = texto(valores.get("numero_end")).upper() or None
+        for total, parcelas in TOTAIS.items():
+            nome = self.ATRIBUTO.get(total)
+            if nome and not getattr(self, nome):
+                setattr(self, nome, soma(self[p] for p in parcelas))
+        if not self.cliente:
+            raise ValueError("Nome do Cliente não informado")
+
+    @classmethod
+    def de_dados(cls, dados):
+        # Dict com os rótulos dos MAPPING_* (formulário, lote, serviço)
+        valores = {nome: dados.get(rotulo) for nome, rotulo in cls.CAMPOS}
+        return cls(numero_end=dados.get(NUMERO_END), **valores)
+
+    @classmethod
+    def _montar(cls, valores, numero_end):
+        # Valores já convertidos (Colunas): sem validar de novo
+        proposta = object.__new__(cls)
+        for (nome, _), valor in zip(cls.CAMPOS, valores):
+            setattr(proposta, nome, valor)
+        proposta.numero_end = numero_end
+        return proposta
+
+    def __getitem__(self, rotulo):
+        return getattr(self, self.ATRIBUTO[rotulo])
+
+    def dados(self):
+        # Dict no formato que o renderizador recebe (preço "1234.50")
+        dados = {"Tipo de Proposta": self.TIPO}
+        for nome, rotulo in self.CAMPOS:
+            valor = getattr(self, nome)
+            dados[rotulo] = "" if valor is None else str(valor)
+        return dados
+
+    @property
+    def valor(self):
+        return valor_proposta(self.dados())
+
+    def __eq__(self, outro):
+        if type(outro) is not type(self):
+            return NotImplemented
+        return self.numero_end == outro.numero_end and all(
+            getattr(self, nome) == getattr(outro, nome) for nome, _ in self.CAMPOS)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.numero!r}, {self.cliente!r})"
+
+
+def _criar_classe(tipo, mapping):
+    # "2- Proposta Dupla" -> PropostaDupla
+    nome = "".join(p.capitalize() for p in atributo(tipo.split("-", 1)[-1]).split("_"))
+    campos = tuple((atributo(rotulo), rotulo) for rotulo in mapping)
+    return type(nome, (Registro,), {
+        "__slots__": tuple(n for n, _ in campos),
+        "__module__": __name__,
+        "TIPO": tipo,
+        "CAMPOS": campos,
+        "CONVERSORES": tuple(conversor(rotulo) for _, rotulo in campos),
+        "ATRIBUTO": {rotulo: n for n, rotulo in campos},
+    })
+
+
+# Tipo de Proposta -> classe do registro (PropostaSimples, PropostaDupla...)
+REGISTROS = {tipo: _criar_classe(tipo, mapping) for tipo, (_, mapping) in TIPOS_PROPOSTA.items()}
+globals().update((classe.__name__, classe) for classe in REGISTROS.values())
+
+
+def tipo_proposta(valor, padrao="1- Proposta Simples"):
+    # Aceita o nome completo ou só o número do tipo ("1", "2", "3")
+    tipo = texto(valor) or padrao
+    if tipo not in REGISTROS:
+        tipo = next((t for t in REGISTROS if t.startswith(tipo)), tipo)
+    if tipo not in REGISTROS:
+        raise ValueError(f"Tipo de Proposta inválido: {tipo}")
+    return tipo
+
+
+def registro(tipo, dados):
+    return REGISTROS[tipo_proposta(tipo)].de_dados(dados)
+
+
+# Rótulos de todos os tipos, na ordem em que aparecem
+ROTULOS = tuple(dict.fromkeys(r for c in REGISTROS.values() for _, r in c.CAMPOS)) + (NUMERO_END,)
+
+
+def _especie(rotulo):
+    return "preco" if rotulo in CAMPOS_PRECO else "texto"
+
+
+class Colunas:
+    # Propostas de vários tipos guardadas por coluna:
+    #   preço     array('q') em centavos
+    #   texto     array('I') com o índice em _textos (cada texto distinto
+    #             guardado uma vez: cidade, consultor, data... se repetem)
+    # O rótulo que o tipo da linha não tem fica zerado/vazio e é ignorado.
+
+    def __init__(self, propostas=()):
+        self._tipos = array("B")
+        self._ordem = list(REGISTROS)
+        self._codigo_tipo = {tipo: i for i, tipo in enumerate(self._ordem)}
+        self._especies = {rotulo: _especie(rotulo) for rotulo in ROTULOS}
+        self._colunas = {rotulo: array("I" if especie == "texto" else "q")
+                         for rotulo, especie in self._especies.items()}
+        self._textos = [""]
+        self._codigos = {"": 0}
+        for proposta in propostas:
+            self.append(proposta)
+
+    def _codigo(self, valor):
+        codigo = self._codigos.get(valor)
+        if codigo is None:
+            codigo = self._codigos[valor] = len(self._textos)
+            self._textos.append(valor)
+        return codigo
+
+    def _guardar(self, especie, valor):
+        if especie == "texto":
+            return self._codigo(valor or "")
+        return int(valor.valor * 100) if valor is not None else 0
+
+    def _ler(self, especie, bruto):
+        if especie == "texto":
+            return self._textos[bruto]
+        return dinheiro(Decimal(bruto).scaleb(-2))
+
+    def append(self, proposta):
+        self._tipos.append(self._codigo_tipo[proposta.TIPO])
+        for rotulo, coluna in self._colunas.items():
+            if rotulo == NUMERO_END:
+                valor = proposta.numero_end
+            else:
+                nome = proposta.ATRIBUTO.get(rotulo)
+                valor = getattr(proposta, nome) if nome else None
+            coluna.append(self._guardar(self._especies[rotulo], valor))
+
+    def __len__(self):
+        return len(self._tipos)
+
+    def tipo(self, linha):
+        return self._ordem[self._tipos[linha]]
+
+    def __getitem__(self, linha):
+        classe = REGISTROS[self.tipo(linha)]
+        valores = [self._ler(self._especies[rotulo], self._colunas[rotulo][linha]) for _, rotulo in classe.CAMPOS]
+        return classe._montar(valores, self._textos[self._colunas[NUMERO_END][linha]] or None)
+
+    def __iter__(self):
+        for linha in range(len(self)):
+            yield self[linha]
+
+    def _tem(self, rotulo):
+        # Tipos (pelo código) que têm o rótulo
+        return {i for i, tipo in enumerate(self._ordem) if rotulo in REGISTROS[tipo].ATRIBUTO}
+
+    def coluna(self, rotulo, linhas=None):
+        # Valores convertidos; None nas linhas cujo tipo não tem o rótulo
+        tem = self._tem(rotulo) if rotulo != NUMERO_END else set(range(len(self._ordem)))
+        coluna, especie = self._colunas[rotulo], self._especies[rotulo]
+        linhas = range(len(self)) if linhas is None else linhas
+        return [self._ler(especie, coluna[i]) if self._tipos[i] in tem else None for i in linhas]
+
+    def pendentes(self, rotulo):
+        # Linhas cujo tipo tem o rótulo e o valor está em branco
+        tem = self._tem(rotulo)
+        coluna = self._colunas[rotulo]
+        return [i for i, codigo in enumerate(self._tipos) if codigo in tem and not coluna[i]]
+
+    def definir(self, rotulo, linhas, valores):
+        coluna, especie = self._colunas[rotulo], self._especies[rotulo]
+        for i, valor in zip(linhas, valores):
+            coluna[i] = self._guardar(especie, valor)
+
+    def total(self):
+        # Soma de valor_proposta() de todas as linhas, em centavos
+        parcelas = []
+        for tipo in self._ordem:
+            atributos = REGISTROS[tipo].ATRIBUTO
+            totais = [t for t in TOTAIS if t in atributos]
+            rotulos = totais[:1] or [p for p in ("Preço", "Preço 2") if p in atributos]
+            parcelas.append([self._colunas[r] for r in rotulos])
+        centavos = sum(c[i] for i, codigo in enumerate(self._tipos) for c in parcelas[codigo])
+        return dinheiro(Decimal(centavos).scaleb(-2))
+
+    def nbytes(self):
+        # Memória dos arrays (sem contar a tabela de textos)
+        return sum(c.itemsize * len(c) for c in self._colunas.values()) + len(self._tipos)
@@ -0,0 +1,154 @@
+# renderizador.py
+# Escolha do backend que transforma os dados da proposta em PDF.
+#
+#   python -> motor_python (openpyxl + reportlab), não precisa do Excel
+#   excel  -> xlwings, só no Windows com o Excel instalado (opcional)
+#   excel-pool -> Excel mantido aberto entre propostas (pool_excel.py)
+#
+# O backend padrão pode ser trocado pela variável de ambiente GEPROP_MOTOR.
+
+import atexit
+import os
+import sys
+
+from cache_pdf import obter_cache
+from dinheiro import celula
+from indice import registrar_proposta
+from instrumentacao import etapa
+from modelos import CELULAS_EXTRAS, caminho_template, verificar, verificar_todos
+from plano import escrever, plano
+from preencher import CAMPOS_PRECO, TIPOS_PROPOSTA
+from saida import gravacao_atomica
+
+MOTOR_PADRAO = "python"
+
+
+def montar_celulas(mapping, dados, numero_end=None):
+    # Converte o dict "Rótulo" -> valor em "Célula" -> valor
+    # Preços vão como número: a célula formata (#,##0.00) sem reler o texto
+    celulas = {cell: celula(dados.get(label)) if label in CAMPOS_PRECO else dados.get(label, "")
+               for label, cell in mapping.items()}
+    # I13/J13 vão sempre (vazias sem número) para que cada tipo tenha um
+    # conjunto fixo de células e um único plano de escrita (plano.py)
+    celulas["I13"] = "Nº" if numero_end else None
+    celulas["J13"] = numero_end or None
+    return celulas
+
+
+class MotorExcel:
+    nome = "excel"
+
+    def renderizar(self, template, celulas, output_path):
+        import xlwings as xw
+
+        blocos = plano(template, celulas)
+        with etapa("excel.iniciar"):
+            app = xw.App(visible=False)
+        try:
+            with etapa("excel.abrir_template"):
+                wb = app.books.open(template)
+                sht = wb.sheets[0]
+            with etapa("excel.preencher", blocos=len(blocos)):
+                escrever(sht, blocos, celulas)
+            with etapa("excel.exportar"):
+                wb.to_pdf(os.path.abspath(output_path))
+            wb.close()
+        finally:
+            with etapa("excel.encerrar"):
+                app.quit()
+
+
+def _motor_python():
+    from motor_python import MotorPython
+    return MotorPython()
+
+
+def _pool_excel():
+    from pool_excel import PoolExcel
+    pool = PoolExcel()
+    atexit.register(pool.encerrar)
+    return pool
+
+
+MOTORES = {
+    "python": _motor_python,
+    "excel": MotorExcel,
+    "excel-pool": _pool_excel,
+}
+
+_instancias = {}
+
+
+def obter_motor(nome=None):
+    nome = nome or os.environ.get("GEPROP_MOTOR", MOTOR_PADRAO)
+    if nome not in MOTORES:
+        raise ValueError(f"Motor de renderização desconhecido: {nome}")
+    if nome not in _instancias:
+        _instancias[nome] = MOTORES[nome]()
+    return _instancias[nome]
+
+
+def compilar_planos(tipos=TIPOS_PROPOSTA):
+    # Planos de escrita de todos os tipos, compilados uma vez por processo
+    for tipo in tipos:
+        _, mapping = TIPOS_PROPOSTA[tipo]
+        plano(caminho_template(tipo), set(mapping.values()) | CELULAS_EXTRAS)
+
+
+def aquecer(nome=None):
+    # Deixa o motor pronto antes da primeira proposta (abre Excel/templates).
+    # Os templates são conferidos antes; um tipo com mapeamento errado fica
+    # de fora e o erro aparece em gerar_pdf (e na abertura da janela).
+    erros = verificar_todos()
+    motor = obter_motor(nome)
+    if motor.nome != "python":
+        compilar_planos([t for t in TIPOS_PROPOSTA if t not in erros])
+    if hasattr(motor, "aquecer"):
+        motor.aquecer()
+    return erros
+
+
+def gerar_pdf(tipo_proposta, dados, output_path, numero_end=None, motor=None):
+    # O PDF é gravado num temporário e só ganha o nome final inteiro
+    # (saida.py); o índice é atualizado depois do rename
+    with gravacao_atomica(output_path) as temporario:
+        _gerar(tipo_proposta, dados, temporario, numero_end, motor)
+    indexar(tipo_proposta, dados, output_path)
+    return output_path
+
+
+def assinatura(backend):
+    # Nome do motor e o que mais muda o PDF dele (motor_python: versão do
+    # desenho e camada de fundo), para a chave do cache
+    return backend.assinatura() if hasattr(backend, "assinatura") else backend.nome
+
+
+def _gerar(tipo_proposta, dados, output_path, numero_end, motor):
+    with etapa("modelos.verificar"):
+        template = verificar(tipo_proposta).caminho
+    _, mapping = TIPOS_PROPOSTA[tipo_proposta]
+    celulas = montar_celulas(mapping, dados, numero_end)
+    backend = obter_motor(motor)
+    # Mesma proposta já gerada antes: copia o PDF do cache (cache_pdf.py)
+    cache = obter_cache()
+    if cache is not None:
+        with etapa("cache.consultar"):
+            chave = cache.chave(template, celulas, assinatura(backend))
+            encontrado = cache.copiar(chave, output_path)
+        if encontrado:
+            return
+    with etapa("renderizar", motor=backend.nome, tipo=tipo_proposta):
+        backend.renderizar(template, celulas, output_path)
+    if cache is not None:
+        with etapa("cache.guardar"):
+            cache.guardar(chave, output_path)
+
+
+def indexar(tipo_proposta, dados, output_path):
+    # Grava a proposta no índice de busca (indice.py). O PDF já está pronto:
+    # uma falha aqui só é avisada, não desfaz a geração.
+    try:
+        with etapa("indice.registrar"):
+            registrar_proposta(dados, output_path, tipo_proposta)
+    except Exception as e:
+        print(f"Aviso: proposta não indexada ({output_path}): {e}", file=sys.stderr)
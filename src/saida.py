@@ -0,0 +1,143 @@
+# saida.py
+# Gravação dos PDFs na pasta de saída.
+#
+# O backend escreve num arquivo temporário oculto na mesma pasta
+# (".geprop-XXXX.tmp.pdf", ignorado pelo vigia, pelo índice e pela
+# numeração); só depois do fsync ele é renomeado (os.replace, atômico no
+# mesmo volume) para o nome final. Uma queda no meio da exportação deixa no
+# máximo um temporário, nunca um PDF pela metade com nome de proposta.
+# O mkstemp cria o temporário só para o dono (0600); antes do rename ele
+# volta às permissões de um arquivo criado normalmente (0666 menos a umask),
+# para pastas compartilhadas e de rede continuarem lendo os PDFs.
+#
+# O nome do arquivo sai de nome_proposta(): caracteres que o Windows não
+# aceita viram espaço e o tamanho é limitado. reservar() garante que duas
+# propostas (mesma janela, lote ou serviço) não gravem no mesmo arquivo:
+# se o nome já existe ou está sendo gerado, ganha " (2)", " (3)"...
+
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from instrumentacao import etapa
+
+PREFIXO_TEMPORARIO = ".geprop-"
+SUFIXO_TEMPORARIO = ".tmp.pdf"
+MAX_NOME = 150  # caracteres do nome do arquivo, sem a pasta
+
+_PROIBIDOS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+_ESPACOS = re.compile(r"\s+")
+
+
+def _ler_umask():
+    # os.umask só é lida trocando-a; uma vez, na importação
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+UMASK = _ler_umask()
+
+_reservados = set()
+_reservados_lock = threading.Lock()
+
+
+def nome_proposta(numero, cliente):
+    # "123PROPOSTA FULANO.pdf", sem caracteres inválidos em nomes de arquivo
+    cliente = _ESPACOS.sub(" ", _PROIBIDOS.sub(" ", str(cliente or ""))).strip(" .") or "SEM NOME"
+    inicio = f"{numero}PROPOSTA "
+    cliente = cliente[:MAX_NOME - len(inicio) - len(".pdf")].rstrip(" .")
+    return f"{inicio}{cliente}.pdf"
+
+
+def _chave(caminho):
+    # Windows e macOS não diferenciam maiúsculas em nomes de arquivo
+    return os.path.normcase(os.path.abspath(caminho)).lower()
+
+
+def reservar(pasta, nome):
+    # Caminho livre para o PDF; fica reservado até liberar(caminho)
+    base, extensao = os.path.splitext(nome)
+    with _reservados_lock:
+        n = 1
+        while True:
+            caminho = os.path.join(pasta, nome if n == 1 else f"{base} ({n}){extensao}")
+            if _chave(caminho) not in _reservados and not os.path.exists(caminho):
+                _reservados.add(_chave(caminho))
+                return caminho
+            n += 1
+
+
+def liberar(caminho):
+    with _reservados_lock:
+        _reservados.discard(_chave(caminho))
+
+
+def caminho_proposta(pasta, numero, cliente):
+    return reservar(pasta, nome_proposta(numero, cliente))
+
+
+def permissoes_padrao(caminho):
+    # As de um arquivo criado com open(): 0666 menos a umask
+    os.chmod(caminho, 0o666 & ~UMASK)
+
+
+def _sincronizar_pasta(pasta):
+    # Garante que o rename chegou ao disco (POSIX; no Windows não se abre pasta)
+    if os.name != "posix":
+        return
+    fd = os.open(pasta, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def gravacao_atomica(destino):
+    # with gravacao_atomica(caminho) as temporario: backend grava em temporario
+    pasta = os.path.dirname(os.path.abspath(destino))
+    os.makedirs(pasta, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(prefix=PREFIXO_TEMPORARIO, suffix=SUFIXO_TEMPORARIO, dir=pasta)
+    os.close(fd)
+    try:
+        yield temporario
+        with etapa("saida.gravar"):
+            with open(temporario, "rb+") as f:
+                if not os.fstat(f.fileno()).st_size:
+                    raise OSError(f"PDF vazio: {destino}")
+                os.fsync(f.fileno())
+            permissoes_padrao(temporario)
+            os.replace(temporario, destino)
+            _sincronizar_pasta(pasta)
+    except BaseException:
+        try:
+            os.remove(temporario)
+        except OSError:
+            pass
+        raise
+    finally:
+        liberar(destino)
+
+
+def limpar_temporarios(pasta, idade=3600):
+    # Temporários deixados por uma queda (mais velhos que idade, para não
+    # apagar os de outra instância que ainda está gerando)
+    limite = time.time() - idade
+    removidos = 0
+    try:
+        entradas = list(os.scandir(pasta))
+    except FileNotFoundError:
+        return 0
+    for entrada in entradas:
+        if entrada.name.startswith(PREFIXO_TEMPORARIO) and entrada.name.endswith(SUFIXO_TEMPORARIO):
+            try:
+                if entrada.stat().st_mtime < limite:
+                    os.remove(entrada.path)
+                    removidos += 1
+            except OSError:
+                pass
+    return removidos
@@ -0,0 +1,429 @@
+# servico.py
+# Python ≥ 3.8  |  pip install openpyxl reportlab
+#
+# Serviço HTTP/JSON local para gerar propostas a partir de outros sistemas
+# (CRM etc.), sem a janela:
+#
+#   python servico.py --porta 8765 --processos 2
+#
+#   POST /propostas   um objeto JSON -> devolve o PDF (application/pdf)
+#   POST /lote        lista de objetos (ou {"propostas": [...]}) -> .zip com os PDFs
+#   GET  /metricas    latência por endpoint, fila e totais (JSON)
+#   GET  /saude       "ok"
+#
+# Os objetos usam os mesmos rótulos do formulário e do lote.py ("Nome do
+# Cliente", "Preço", ..., "Tipo de Proposta", "Número"). Os pedidos que
+# chegam juntos são agrupados e entregues de uma vez a um pool limitado de
+# processos; com a fila cheia o serviço responde 503.
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+from instrumentacao import percentil
+from lote import _iniciar_processo, _renderizar_linha, normalizar_linha
+from numeracao import alocar, registrar_uso
+from preencher import OUTPUT_DIR
+from producao import completar_producao
+from saida import caminho_proposta, liberar, limpar_temporarios
+
+TAMANHO_BLOCO = 64 * 1024
+
+
+def _renderizar_grupo(itens):
+    # Roda no processo de trabalho: vários pedidos numa só ida ao pool
+    resultados = []
+    for args in itens:
+        try:
+            resultados.append((True, _renderizar_linha(*args)))
+        except Exception as e:
+            resultados.append((False, str(e)))
+    return resultados
+
+
+class FilaCheia(Exception):
+    pass
+
+
+class Agrupador:
+    # Junta os pedidos que chegam numa janela curta (ou até `tamanho_grupo`)
+    # e envia o grupo inteiro para um processo do pool
+
+    def __init__(self, processos, motor=None, tamanho_grupo=4, janela=0.02, limite_fila=256):
+        self.executor = ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo,
+                                            initargs=(motor,))
+        self.tamanho_grupo = tamanho_grupo
+        self.janela = janela
+        self.fila = queue.Queue()
+        self.limite_fila = limite_fila
+        self._pendentes = 0       # pedidos aceitos e ainda não terminados
+        self.maior_fila = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._despachar, name="agrupador", daemon=True)
+        self._thread.start()
+
+    @property
+    def pendentes(self):
+        return self._pendentes
+
+    def enviar(self, args):
+        with self._lock:
+            if self._pendentes >= self.limite_fila:
+                raise FilaCheia(f"fila cheia ({self.limite_fila} propostas pendentes)")
+            self._pendentes += 1
+            self.maior_fila = max(self.maior_fila, self._pendentes)
+        futuro = Future()
+        futuro.add_done_callback(self._terminou)
+        self.fila.put((args, futuro))
+        return futuro
+
+    def _terminou(self, _):
+        with self._lock:
+            self._pendentes -= 1
+
+    def _despachar(self):
+        while True:
+            primeiro = self.fila.get()
+            if primeiro is None:
+                break
+            grupo = [primeiro]
+            prazo = time.monotonic() + self.janela
+            while len(grupo) < self.tamanho_grupo:
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    item = self.fila.get(timeout=restante)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.fila.put(None)
+                    break
+                grupo.append(item)
+            futuros = [f for _, f in grupo]
+            try:
+                envio = self.executor.submit(_renderizar_grupo, [a for a, _ in grupo])
+            except Exception as e:
+                for f in futuros:
+                    f.set_exception(e)
+                continue
+            envio.add_done_callback(lambda envio, futuros=futuros: self._distribuir(envio, futuros))
+
+    def _distribuir(self, envio, futuros):
+        try:
+            resultados = envio.result()
+        except Exception as e:
+            for f in futuros:
+                f.set_exception(e)
+            return
+        for f, (ok, valor) in zip(futuros, resultados):
+            if ok:
+                f.set_result(valor)
+            else:
+                f.set_exception(RuntimeError(valor))
+
+    def encerrar(self):
+        self.fila.put(None)
+        self._thread.join(timeout=5)
+        self.executor.shutdown(wait=True)
+
+
+class Metricas:
+    # Latência das últimas `janela` chamadas de cada endpoint
+    def __init__(self, janela=1000):
+        self.janela = janela
+        self._lock = threading.Lock()
+        self._latencias = {}
+        self._totais = {}
+        self._erros = {}
+        self.inicio = time.time()
+
+    def registrar(self, endpoint, segundos, erro=False):
+        with self._lock:
+            self._latencias.setdefault(endpoint, deque(maxlen=self.janela)).append(segundos)
+            self._totais[endpoint] = self._totais.get(endpoint, 0) + 1
+            if erro:
+                self._erros[endpoint] = self._erros.get(endpoint, 0) + 1
+
+    def resumo(self):
+        with self._lock:
+            endpoints = {}
+            for endpoint, lat in self._latencias.items():
+                lat = sorted(lat)
+                endpoints[endpoint] = {
+                    "total": self._totais[endpoint],
+                    "erros": self._erros.get(endpoint, 0),
+                    "p50_ms": round(percentil(lat, 50) * 1000, 1),
+                    "p95_ms": round(percentil(lat, 95) * 1000, 1),
+                    "max_ms": round(lat[-1] * 1000, 1),
+                }
+        return {"em_execucao_s": round(time.time() - self.inicio), "endpoints": endpoints}
+
+
+class Servico:
+    def __init__(self, saida=OUTPUT_DIR, processos=None, motor=None, tamanho_grupo=4,
+                 janela=0.02, limite_fila=256, estimar_producao=False):
+        self.saida = saida
+        self.estimar_producao = estimar_producao
+        os.makedirs(saida, exist_ok=True)
+        limpar_temporarios(saida)
+        self.agrupador = Agrupador(processos or os.cpu_count() or 1, motor, tamanho_grupo,
+                                   janela, limite_fila)
+        self.metricas = Metricas()
+        self._numeros = iter(lambda: alocar(self.saida), None)
+
+    def preparar(self, linha):
+        # Mesmo tratamento do lote: valida, normaliza e reserva o número
+        tipo, dados, numero_end = normalizar_linha(linha, self._numeros)
+        if self.estimar_producao:
+            completar_producao([dados])
+        return tipo, dados, numero_end, caminho_proposta(self.saida, dados["N° da Proposta"],
+                                                         dados["Nome do Cliente"])
+
+    def gerar(self, linhas):
+        # Devolve [(caminho, futuro)] na ordem dos pedidos; uma linha
+        # inválida vira um futuro com o erro (caminho None)
+        linhas = list(linhas)
+        # Como no lote: a sequência passa do maior número informado antes de
+        # alocar os das linhas em branco, que assim não repetem nenhum deles
+        informados = [str(linha.get("N° da Proposta") or "").strip()
+                      for linha in linhas if isinstance(linha, dict)]
+        informados = [int(n) for n in informados if n.isdigit()]
+        if informados:
+            registrar_uso(max(informados), self.saida)
+        pedidos = []
+        for linha in linhas:
+            try:
+                args = self.preparar(linha)
+            except Exception as e:
+                futuro = Future()
+                futuro.set_exception(e)
+                pedidos.append((None, futuro))
+                continue
+            try:
+                futuro = self.agrupador.enviar(args)
+            except FilaCheia:
+                liberar(args[3])
+                raise
+            # gravado por um processo do pool: a reserva do nome é liberada aqui
+            futuro.add_done_callback(lambda _, caminho=args[3]: liberar(caminho))
+            pedidos.append((args[3], futuro))
+        return pedidos
+
+    def metricas_json(self):
+        resumo = self.metricas.resumo()
+        resumo["fila"] = {
+            "pendentes": self.agrupador.pendentes,
+            "maior": self.agrupador.maior_fila,
+            "limite": self.agrupador.limite_fila,
+        }
+        return resumo
+
+    def encerrar(self):
+        self.agrupador.encerrar()
+
+
+ENDPOINTS = {"/propostas", "/lote", "/metricas", "/saude"}
+
+
+class Manipulador(BaseHTTPRequestHandler):
+    servico = None   # definido em criar_servidor
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, status, corpo, tipo="application/json; charset=utf-8"):
+        if not isinstance(corpo, bytes):
+            corpo = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _endpoint(self, metodo):
+        return f"{metodo} {self.path if self.path in ENDPOINTS else '(outros)'}"
+
+    def _ler_corpo(self):
+        # Lê o corpo inteiro do pedido: o que sobrar dele na conexão
+        # (keep-alive) seria lido como o começo do próximo pedido
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        corpo = self.rfile.read(tamanho)
+        self.corpo_lido = True
+        return corpo
+
+    def _ler_json(self):
+        return json.loads(self._ler_corpo().decode("utf-8") or "null")
+
+    def _enviar_arquivo(self, caminho, tipo):
+        # Envia o PDF em blocos, sem carregar o arquivo inteiro na memória
+        tamanho = os.path.getsize(caminho)
+        self.send_response(200)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(tamanho))
+        self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{_nome_url(caminho)}")
+        self.end_headers()
+        self.resposta_iniciada = True
+        with open(caminho, "rb") as f:
+            for bloco in iter(lambda: f.read(TAMANHO_BLOCO), b""):
+                self.wfile.write(bloco)
+
+    def do_GET(self):
+        inicio = time.perf_counter()
+        if self.path == "/saude":
+            self._responder(200, b"ok", "text/plain")
+        elif self.path == "/metricas":
+            self._responder(200, self.servico.metricas_json())
+        else:
+            self._responder(404, {"erro": "não encontrado"})
+        self.servico.metricas.registrar(self._endpoint("GET"), time.perf_counter() - inicio)
+
+    def do_POST(self):
+        inicio = time.perf_counter()
+        erro = True
+        self.corpo_lido = False
+        self.resposta_iniciada = False
+        try:
+            if self.path == "/propostas":
+                linha = self._ler_json()
+                if not isinstance(linha, dict):
+                    raise ValueError("envie um objeto JSON com os campos da proposta")
+                [(caminho, futuro)] = self.servico.gerar([linha])
+                futuro.result()
+                self._enviar_arquivo(caminho, "application/pdf")
+            elif self.path == "/lote":
+                linhas = self._ler_json()
+                if isinstance(linhas, dict):
+                    linhas = linhas.get("propostas")
+                if not isinstance(linhas, list) or not linhas:
+                    raise ValueError("envie uma lista de propostas")
+                self._enviar_lote(self.servico.gerar(linhas))
+            else:
+                self._ler_corpo()
+                self._responder(404, {"erro": "não encontrado"})
+                return
+            erro = False
+        except BrokenPipeError:
+            self.close_connection = True
+        except Exception as e:
+            self._falhar(e)
+        finally:
+            self.servico.metricas.registrar(self._endpoint("POST"), time.perf_counter() - inicio, erro)
+
+    def _falhar(self, erro):
+        if not self.corpo_lido:
+            # Content-Length inválido ou pedido interrompido: o resto do
+            # corpo não tem como ser separado do próximo pedido
+            self.close_connection = True
+        if self.resposta_iniciada:
+            # Status e cabeçalhos já foram: outra resposta iria misturada no
+            # corpo. A resposta fica incompleta (sem o chunk final / menor que
+            # o Content-Length) e a conexão é fechada, e o cliente vê a falha.
+            print(f"servico: {self.command} {self.path} interrompido: {erro}", file=sys.stderr)
+            self.close_connection = True
+            return
+        if isinstance(erro, FilaCheia):
+            self._responder(503, {"erro": str(erro)})
+        elif isinstance(erro, (ValueError, KeyError)):
+            self._responder(400, {"erro": str(erro)})
+        else:
+            self._responder(500, {"erro": str(erro)})
+
+    def _enviar_lote(self, pedidos):
+        # .zip enviado em partes (chunked) à medida que os PDFs ficam prontos,
+        # com um manifesto.json no final
+        self.send_response(200)
+        self.send_header("Content-Type", "application/zip")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.resposta_iniciada = True
+        saida = _SaidaChunked(self.wfile)
+        manifesto = []
+        with zipfile.ZipFile(saida, "w", zipfile.ZIP_STORED) as zf:
+            for i, (caminho, futuro) in enumerate(pedidos, start=1):
+                nome = os.path.basename(caminho) if caminho else f"linha {i}"
+                try:
+                    segundos = futuro.result()
+                except Exception as e:
+                    manifesto.append({"arquivo": nome, "status": "erro", "erro": str(e)})
+                    continue
+                zf.write(caminho, nome)
+                manifesto.append({"arquivo": nome, "status": "ok", "segundos": round(segundos, 3)})
+            zf.writestr("manifesto.json", json.dumps(manifesto, ensure_ascii=False, indent=2))
+        saida.fechar()
+
+
+class _SaidaChunked(io.RawIOBase):
+    # Arquivo só de escrita que embrulha cada write num chunk HTTP/1.1
+    # (o zipfile aceita destinos sem seek)
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        if dados:
+            self.wfile.write(b"%X\r\n" % len(dados) + bytes(dados) + b"\r\n")
+        return len(dados)
+
+    def fechar(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def _nome_url(caminho):
+    return quote(os.path.basename(caminho))
+
+
+def criar_servidor(host="127.0.0.1", porta=8765, **opcoes):
+    servico = Servico(**opcoes)
+    manipulador = type("ManipuladorGeProp", (Manipulador,), {"servico": servico})
+    servidor = ThreadingHTTPServer((host, porta), manipulador)
+    servidor.daemon_threads = True
+    return servidor, servico
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP para gerar propostas.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--saida", default=OUTPUT_DIR, help="pasta onde os PDFs serão gravados")
+    parser.add_argument("--processos", type=int, default=None, help="nº de processos (padrão: nº de CPUs)")
+    parser.add_argument("--motor", default=None, help="motor de renderização (python, excel, excel-pool)")
+    parser.add_argument("--grupo", type=int, default=4, help="máximo de propostas por envio ao pool")
+    parser.add_argument("--janela", type=float, default=0.02, help="segundos esperando mais pedidos para agrupar")
+    parser.add_argument("--limite-fila", type=int, default=256, help="propostas pendentes antes de responder 503")
+    parser.add_argument("--estimar-producao", action="store_true",
+                        help="preenche a produção em branco com a estimativa de json/irradiacao.json")
+    args = parser.parse_args(argv)
+
+    servidor, servico = criar_servidor(
+        args.host, args.porta, saida=args.saida, processos=args.processos, motor=args.motor,
+        tamanho_grupo=args.grupo, janela=args.janela, limite_fila=args.limite_fila,
+        estimar_producao=args.estimar_producao)
+    print(f"GeProp ouvindo em http://{args.host}:{args.porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servico.encerrar()
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
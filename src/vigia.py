@@ -0,0 +1,390 @@
+# vigia.py
+# Mantém o índice (indice.py) e a numeração (numeracao.py) em dia com a
+# pasta de propostas quando alguém copia, renomeia ou apaga PDFs à mão.
+#
+# Em vez de listar a pasta inteira de novo, o vigia só aplica o que mudou:
+#   - no Linux usa inotify (via ctypes, sem dependências);
+#   - nos outros sistemas consulta a pasta a cada INTERVALO segundos, mas só
+#     a lista de novo quando a data de modificação da pasta mudar.
+#
+# A varredura completa (varrer) roda ao iniciar, para pegar o que mudou com
+# o vigia parado, e quando os eventos se perdem. Ela compara a listagem com
+# o índice e só grava a diferença, em lotes; guarda no banco até onde chegou
+# e continua dali se for interrompida. --por-segundo limita o ritmo em
+# arquivos muito grandes.
+#
+#   python vigia.py                    acompanha a pasta até Ctrl+C
+#   python vigia.py --varrer --por-segundo 2000
+#   python vigia.py --polling          força a consulta periódica
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from banco import conectar
+from indice import arquivos_indexados, registrar_arquivos, remover, renomear
+from instrumentacao import etapa
+from numeracao import numero_do_arquivo, registrar_uso
+from preencher import OUTPUT_DIR
+
+INTERVALO = 2.0        # polling: segundos entre consultas à pasta
+AGRUPAR = 0.5          # segundos juntando eventos antes de aplicar
+LOTE_VARREDURA = 500
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+_EVENTO = struct.Struct("iIII")
+
+
+def _relevante(nome):
+    # Só PDFs; arquivos ocultos (cache, temporários) ficam de fora
+    return nome.lower().endswith(".pdf") and not nome.startswith(".")
+
+
+class Mudancas:
+    # Eventos acumulados até o próximo aplicar()
+    def __init__(self):
+        self.adicionados = set()
+        self.removidos = set()
+        self.renomeados = []
+        self.varrer = False
+
+    def adicionar(self, nome):
+        self.removidos.discard(nome)
+        self.adicionados.add(nome)
+
+    def remover(self, nome):
+        self.adicionados.discard(nome)
+        self.removidos.add(nome)
+
+    def renomear(self, antigo, novo):
+        if antigo in self.adicionados:
+            # criado e renomeado no mesmo intervalo
+            self.adicionados.discard(antigo)
+            self.adicionar(novo)
+        else:
+            self.removidos.discard(novo)
+            self.renomeados.append((antigo, novo))
+
+    def __bool__(self):
+        return bool(self.adicionados or self.removidos or self.renomeados or self.varrer)
+
+
+def aplicar(pasta, mudancas):
+    # Leva as mudanças para o índice e a numeração (só o que mudou)
+    with etapa("vigia.aplicar", adicionados=len(mudancas.adicionados),
+               removidos=len(mudancas.removidos), renomeados=len(mudancas.renomeados)):
+        if mudancas.renomeados:
+            renomear(mudancas.renomeados, pasta)
+        if mudancas.removidos:
+            remover(mudancas.removidos, pasta)
+        if mudancas.adicionados:
+            registrar_arquivos(mudancas.adicionados, pasta)
+        numeros = [numero_do_arquivo(n) for n in mudancas.adicionados | {novo for _, novo in mudancas.renomeados}]
+        numeros = [n for n in numeros if n is not None]
+        if numeros:
+            # a sequência nunca volta para trás: só avança se apareceu um número maior
+            registrar_uso(max(numeros), pasta)
+
+
+# ---------------------------------------------------------------- varredura
+
+def _criar_tabela(conexao):
+    conexao.execute(
+        "CREATE TABLE IF NOT EXISTS vigia ("
+        " nome TEXT PRIMARY KEY,"
+        " valor TEXT NOT NULL)"
+    )
+
+
+def _ler_estado(pasta, nome):
+    conexao = conectar(pasta)
+    try:
+        _criar_tabela(conexao)
+        linha = conexao.execute("SELECT valor FROM vigia WHERE nome = ?", (nome,)).fetchone()
+        return linha[0] if linha else None
+    finally:
+        conexao.close()
+
+
+def _gravar_estado(pasta, nome, valor):
+    conexao = conectar(pasta)
+    try:
+        _criar_tabela(conexao)
+        if valor is None:
+            conexao.execute("DELETE FROM vigia WHERE nome = ?", (nome,))
+        else:
+            conexao.execute("INSERT INTO vigia (nome, valor) VALUES (?, ?) "
+                            "ON CONFLICT(nome) DO UPDATE SET valor = excluded.valor", (nome, str(valor)))
+    finally:
+        conexao.close()
+
+
+def varrer(pasta=OUTPUT_DIR, lote=LOTE_VARREDURA, por_segundo=None, parar=None, progresso=None):
+    # Varredura completa, em ordem alfabética e em lotes. Depois de cada lote
+    # com PDFs novos o último nome processado vai para a tabela `vigia`; uma
+    # varredura interrompida recomeça dali. por_segundo limita quantos
+    # arquivos são gravados por segundo; parar é um threading.Event opcional.
+    # Devolve True se chegou ao fim.
+    if not os.path.isdir(pasta):
+        return True
+    with os.scandir(pasta) as entradas:
+        presentes = sorted(e.name for e in entradas if e.is_file() and _relevante(e.name))
+    indexados = arquivos_indexados(pasta)
+    ponto = _ler_estado(pasta, "ponto")
+    pendentes = [n for n in presentes if ponto is None or n > ponto]
+    gravou = ponto is not None
+
+    for i in range(0, len(pendentes), lote):
+        inicio = time.perf_counter()
+        parte = pendentes[i:i + lote]
+        novos = [n for n in parte if n not in indexados]
+        if novos:
+            mudancas = Mudancas()
+            mudancas.adicionados.update(novos)
+            aplicar(pasta, mudancas)
+            _gravar_estado(pasta, "ponto", parte[-1])
+            gravou = True
+        if progresso:
+            progresso(len(presentes) - len(pendentes) + i + len(parte), len(presentes))
+        if parar is not None and parar.is_set():
+            return False
+        if por_segundo and novos:
+            espera = len(parte) / por_segundo - (time.perf_counter() - inicio)
+            if espera > 0:
+                time.sleep(espera)
+
+    # O que está no índice mas não existe mais na pasta
+    sumiram = indexados - set(presentes)
+    if sumiram:
+        mudancas = Mudancas()
+        mudancas.removidos.update(sumiram)
+        aplicar(pasta, mudancas)
+    if gravou:
+        _gravar_estado(pasta, "ponto", None)
+    return True
+
+
+# ---------------------------------------------------------------- observadores
+
+class _Inotify:
+    def __init__(self, pasta):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        mascara = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+        if libc.inotify_add_watch(self.fd, os.fsencode(pasta), mascara) < 0:
+            erro = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(erro, "inotify_add_watch")
+        self.saidas = {}    # cookie -> nome (IN_MOVED_FROM à espera do IN_MOVED_TO)
+
+    def ler(self, mudancas, espera):
+        if not select.select([self.fd], [], [], espera)[0]:
+            return False
+        dados = os.read(self.fd, 64 * 1024)
+        posicao = 0
+        while posicao < len(dados):
+            _, mascara, cookie, tamanho = _EVENTO.unpack_from(dados, posicao)
+            posicao += _EVENTO.size
+            nome = os.fsdecode(dados[posicao:posicao + tamanho].rstrip(b"\0"))
+            posicao += tamanho
+            if mascara & (IN_Q_OVERFLOW | IN_DELETE_SELF | IN_MOVE_SELF):
+                mudancas.varrer = True
+                continue
+            if mascara & IN_ISDIR or not nome:
+                continue
+            if mascara & IN_MOVED_FROM:
+                self.saidas[cookie] = nome
+            elif mascara & IN_MOVED_TO:
+                antigo = self.saidas.pop(cookie, None)
+                if antigo is not None and _relevante(antigo):
+                    if _relevante(nome):
+                        mudancas.renomear(antigo, nome)
+                    else:
+                        mudancas.remover(antigo)
+                elif _relevante(nome):
+                    mudancas.adicionar(nome)
+            elif mascara & IN_CLOSE_WRITE and _relevante(nome):
+                mudancas.adicionar(nome)
+            elif mascara & IN_DELETE and _relevante(nome):
+                mudancas.remover(nome)
+        return True
+
+    def fechar_movimentos(self, mudancas):
+        # IN_MOVED_FROM sem par: o arquivo saiu da pasta
+        for nome in self.saidas.values():
+            if _relevante(nome):
+                mudancas.remover(nome)
+        self.saidas.clear()
+
+    def fechar(self):
+        os.close(self.fd)
+
+
+class _Polling:
+    def __init__(self, pasta):
+        self.pasta = pasta
+        self.mtime = None
+        self.inodes = self._listar()
+
+    def _listar(self):
+        self.mtime = os.stat(self.pasta).st_mtime_ns
+        with os.scandir(self.pasta) as entradas:
+            return {e.name: e.inode() for e in entradas if _relevante(e.name)}
+
+    def ler(self, mudancas, espera):
+        time.sleep(espera)
+        try:
+            if os.stat(self.pasta).st_mtime_ns == self.mtime:
+                return False
+            atuais = self._listar()
+        except FileNotFoundError:
+            mudancas.varrer = True
+            return True
+        saiu = {n: i for n, i in self.inodes.items() if n not in atuais}
+        entrou = {n: i for n, i in atuais.items() if n not in self.inodes}
+        # mesmo inode com outro nome: foi renomeado
+        por_inode = {i: n for n, i in saiu.items() if i}
+        for nome, inode in entrou.items():
+            antigo = por_inode.pop(inode, None)
+            if antigo is not None:
+                mudancas.renomear(antigo, nome)
+            else:
+                mudancas.adicionar(nome)
+        for nome, inode in saiu.items():
+            if por_inode.get(inode) == nome or not inode:
+                mudancas.remover(nome)
+        self.inodes = atuais
+        return bool(saiu or entrou)
+
+    def fechar_movimentos(self, mudancas):
+        pass
+
+    def fechar(self):
+        pass
+
+
+class Vigia:
+    # Acompanha a pasta numa thread. Uma varredura interrompida (ou a
+    # primeira, com o índice vazio) é retomada antes de começar a vigiar.
+    def __init__(self, pasta=OUTPUT_DIR, polling=False, por_segundo=None, ao_aplicar=None):
+        self.pasta = pasta
+        self.polling = polling or not sys.platform.startswith("linux")
+        self.por_segundo = por_segundo
+        self.ao_aplicar = ao_aplicar
+        self.modo = None
+        self._parar = threading.Event()
+        self._thread = None
+
+    def _observador(self):
+        if not self.polling:
+            try:
+                self.modo = "inotify"
+                return _Inotify(self.pasta)
+            except (OSError, AttributeError):
+                pass
+        self.modo = "polling"
+        return _Polling(self.pasta)
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._executar, name="vigia", daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self, espera=5):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(espera)
+
+    def _varrer(self):
+        return varrer(self.pasta, por_segundo=self.por_segundo, parar=self._parar)
+
+    def _executar(self):
+        os.makedirs(self.pasta, exist_ok=True)
+        # O observador é criado antes da varredura para não perder o que
+        # mudar enquanto ela roda (aplicar duas vezes não faz mal).
+        observador = self._observador()
+        try:
+            # O que mudou com o GeProp fechado: a varredura só grava a diferença
+            if not self._varrer():
+                return
+            espera = AGRUPAR if self.modo == "inotify" else INTERVALO
+            while not self._parar.is_set():
+                mudancas = Mudancas()
+                if not observador.ler(mudancas, espera):
+                    continue
+                if self.modo == "inotify":
+                    # junta o que chegar logo em seguida (cópia de vários arquivos)
+                    while not self._parar.is_set() and observador.ler(mudancas, AGRUPAR):
+                        pass
+                observador.fechar_movimentos(mudancas)
+                if not mudancas:
+                    continue
+                try:
+                    if mudancas.varrer:
+                        self._varrer()
+                    else:
+                        aplicar(self.pasta, mudancas)
+                except Exception as e:
+                    print(f"Vigia: falha ao aplicar mudanças: {e}", file=sys.stderr)
+                    continue
+                if self.ao_aplicar:
+                    self.ao_aplicar(mudancas)
+        finally:
+            observador.fechar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mantém índice e numeração em dia com a pasta de propostas.")
+    parser.add_argument("--pasta", default=OUTPUT_DIR, help="pasta dos PDFs")
+    parser.add_argument("--varrer", action="store_true", help="só faz a varredura completa (retomável) e sai")
+    parser.add_argument("--do-zero", action="store_true", help="ignora uma varredura interrompida e recomeça")
+    parser.add_argument("--por-segundo", type=int, default=None, help="limite de arquivos por segundo na varredura")
+    parser.add_argument("--polling", action="store_true", help="não usa inotify")
+    args = parser.parse_args(argv)
+
+    if args.do_zero:
+        _gravar_estado(args.pasta, "ponto", None)
+    if args.varrer:
+        def progresso(feitos, total):
+            print(f"\r{feitos}/{total}", end="", file=sys.stderr, flush=True)
+        varrer(args.pasta, por_segundo=args.por_segundo, progresso=progresso)
+        print(file=sys.stderr)
+        return 0
+
+    def mostrar(m):
+        for nome in sorted(m.adicionados):
+            print(f"+ {nome}")
+        for nome in sorted(m.removidos):
+            print(f"- {nome}")
+        for antigo, novo in m.renomeados:
+            print(f"~ {antigo} -> {novo}")
+
+    vigia = Vigia(args.pasta, polling=args.polling, por_segundo=args.por_segundo, ao_aplicar=mostrar).iniciar()
+    print(f"Vigiando {os.path.abspath(args.pasta)} (Ctrl+C para sair)", file=sys.stderr)
+    try:
+        while vigia._thread.is_alive():
+            vigia._thread.join(1)
+    except KeyboardInterrupt:
+        vigia.parar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
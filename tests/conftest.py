@@ -0,0 +1,25 @@
+# conftest.py
+# Os módulos do programa ficam soltos em src/ e se importam pelo nome
+# ("from preencher import ..."), como na janela: src/ entra no sys.path.
+# A pasta json/ da raiz (dados do programa) é um pacote e esconderia o json
+# da biblioteca padrão, então a raiz sai do sys.path. Rode com "pytest" na
+# raiz do projeto ("python -m pytest" põe a raiz no sys.path antes disto).
+#
+#   pytest -q
+
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path[:] = [p for p in sys.path if os.path.abspath(p or os.curdir) != RAIZ]
+sys.path.insert(0, os.path.join(RAIZ, "src"))
+
+
+@pytest.fixture(autouse=True)
+def pasta_de_trabalho(tmp_path, monkeypatch):
+    # OUTPUT_DIR ("propostas") é relativo: cada teste roda numa pasta
+    # temporária e nunca grava na pasta de propostas do projeto
+    monkeypatch.chdir(tmp_path)
@@ -0,0 +1,81 @@
+import json
+
+from catalogo import Catalogo, normalizar, obter_catalogo, palavras, preco_equipamentos
+from dinheiro import dinheiro
+
+TABELA = {
+    "paineis": [
+        {"modelo": "TIGER NEO 580W", "fabricante": "JINKO", "potencia": 580, "preco": "700,00",
+         "ficha": {"tecnologia": "N-TYPE TOPCON"}},
+        {"modelo": "HI-MO 6 580M", "fabricante": "LONGI", "potencia": 580, "preco": ""},
+        {"modelo": "HI-MO 5 550M", "fabricante": "LONGI", "potencia": 550},
+    ],
+    "inversores": [
+        {"modelo": "SUN-5K-G04", "fabricante": "DEYE", "potencia": 5000, "preco": "4.500",
+         "ficha": {"fases": "MONOFÁSICO"}},
+        {"modelo": "SUN-8K-G", "fabricante": "DEYE", "potencia": 8000, "preco": "6.000"},
+    ],
+    "estruturas": [
+        {"modelo": "KIT TRILHO", "fabricante": "ROMAGNOLE", "tipo": "Telhado Cerâmico", "preco": "90"},
+    ],
+}
+
+
+def modelos(itens):
+    return [item.modelo for item in itens]
+
+
+def test_palavras():
+    assert normalizar("Monofásico") == "MONOFASICO"
+    assert palavras("sun-5k g04") == ["SUN", "5K", "G04"]
+
+
+def test_busca_por_prefixo_na_ordem_do_catalogo():
+    catalogo = Catalogo(TABELA)
+    assert len(catalogo) == 6
+    assert modelos(catalogo.buscar("lon")) == ["HI-MO 5 550M", "HI-MO 6 580M"]
+    assert modelos(catalogo.buscar("580")) == ["TIGER NEO 580W", "HI-MO 6 580M"]
+    assert modelos(catalogo.buscar("jinko 580")) == ["TIGER NEO 580W"]
+    assert modelos(catalogo.buscar("sun5k")) == ["SUN-5K-G04"]
+    assert modelos(catalogo.buscar("monofasico")) == ["SUN-5K-G04"]
+    assert modelos(catalogo.buscar("deye", "inversores", limite=1)) == ["SUN-5K-G04"]
+    assert catalogo.buscar("deye", "paineis") == []
+    assert catalogo.buscar("  ") == []
+
+
+def test_busca_aproximada():
+    catalogo = Catalogo(TABELA)
+    assert modelos(catalogo.buscar("jnko")) == ["TIGER NEO 580W"]
+    assert catalogo.buscar("xyzw") == []
+
+
+def test_item_sem_preco_fica_sem_preco():
+    catalogo = Catalogo(TABELA)
+    jinko, = catalogo.buscar("jinko")
+    longi, = catalogo.buscar("longi 580")
+    assert jinko.preco == dinheiro("700")
+    assert jinko.rotulo == "Painel: JINKO TIGER NEO 580W · 580 W · R$ 700,00"
+    assert longi.preco is None
+    assert longi.rotulo == "Painel: LONGI HI-MO 6 580M · 580 W"
+    assert catalogo.por_rotulo(longi.rotulo) is longi
+
+
+def test_preco_equipamentos():
+    catalogo = Catalogo(TABELA)
+    jinko, = catalogo.buscar("jinko")
+    longi, = catalogo.buscar("longi 580")
+    inversor, = catalogo.buscar("sun 5k")
+    estrutura, = catalogo.buscar("romagnole")
+    assert preco_equipamentos(jinko, 10, [inversor], estrutura) == dinheiro("7000") + dinheiro("4500") + dinheiro("900")
+    assert preco_equipamentos(inversores=[inversor, inversor]) == dinheiro("9000")
+    # sem preço de um dos itens: nada, em vez de um total parcial
+    assert preco_equipamentos(longi, 10, [inversor]) is None
+    assert preco_equipamentos() is None
+
+
+def test_tabela_do_distribuidor(tmp_path, monkeypatch):
+    tabela = tmp_path / "distribuidor.json"
+    tabela.write_text(json.dumps(TABELA), encoding="utf-8")
+    monkeypatch.setenv("GEPROP_CATALOGO", str(tabela))
+    assert len(obter_catalogo()) == 6
+    assert obter_catalogo() is obter_catalogo(str(tabela))
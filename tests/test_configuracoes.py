@@ -0,0 +1,30 @@
+import json
+import shutil
+
+import pytest
+
+from configuracoes import ARQUIVOS, gravar_json_atomico
+from preencher import resource_path
+
+
+@pytest.mark.parametrize("nome", list(ARQUIVOS))
+def test_regravar_nao_muda_o_arquivo(tmp_path, nome):
+    # Os arquivos de json/ são CRLF com 4 espaços: regravar o mesmo valor
+    # deixa o arquivo igual, sem aparecer como alterado no git
+    arquivo, chave, _ = ARQUIVOS[nome]
+    copia = tmp_path / "copia.json"
+    shutil.copyfile(resource_path(arquivo), copia)
+    original = copia.read_bytes()
+    gravar_json_atomico(str(copia), json.loads(original.decode("utf-8")))
+    assert copia.read_bytes() == original
+
+
+def test_mantem_o_formato_do_arquivo(tmp_path):
+    caminho = tmp_path / "lf.json"
+    caminho.write_bytes(b'{\n  "tema": "claro"\n}')
+    gravar_json_atomico(str(caminho), {"tema": "escuro"})
+    assert caminho.read_bytes() == b'{\n  "tema": "escuro"\n}'
+    novo = tmp_path / "novo.json"
+    gravar_json_atomico(str(novo), {"tema": "escuro"})
+    assert json.loads(novo.read_text(encoding="utf-8")) == {"tema": "escuro"}
+    assert '\n    "tema"' in novo.read_text(encoding="utf-8")
@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+import pytest
+
+from dinheiro import Dinheiro, calcular_totais, dinheiro, soma, valor_proposta
+
+
+def test_dinheiro_formata_em_reais():
+    preco = dinheiro("1.234,5")
+    assert str(preco) == "1234.50"
+    assert preco.brl == "R$ 1.234,50"
+    assert float(preco) == 1234.5
+    assert Dinheiro(Decimal("-1234.5")).brl == "-R$ 1.234,50"
+    assert dinheiro("1.234,5") is preco   # mesmo texto, mesma instância
+
+
+def test_dinheiro_imutavel():
+    with pytest.raises(AttributeError):
+        dinheiro("1").valor = Decimal(2)
+
+
+def test_soma_exata():
+    assert soma(["0,10"] * 3) == dinheiro("0.30")
+    assert soma([]) == dinheiro(0)
+    assert sum([dinheiro("1"), dinheiro("2,5")]) == dinheiro("3.50")
+
+
+def test_calcular_totais_preenche_so_o_total_em_branco():
+    dados = {"Preço dos Equipamentos": "1.000,00", "Preço da Mão de Obra": "250,5", "Preço Total": ""}
+    assert calcular_totais(dados)["Preço Total"] == "1250.50"
+    dados = {"Preço dos Equipamentos": "1.000,00", "Preço da Mão de Obra": "250,5", "Preço Total": "1200"}
+    assert calcular_totais(dados)["Preço Total"] == "1200"
+
+
+def test_valor_proposta():
+    assert valor_proposta({"Preço": "1000", "Preço 2": "500,50"}) == dinheiro("1500.50")
+    assert valor_proposta({"Preço Total": "900", "Preço": "1"}) == dinheiro("900")
+    assert valor_proposta({"Preço": ""}) is None
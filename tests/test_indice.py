@@ -0,0 +1,59 @@
+import pytest
+
+from indice import buscar, numero_e_cliente, registrar_proposta, registrar_varios
+
+
+def proposta(cliente, numero, data, preco, consultor="MATEUS", cidade="DIVINÓPOLIS"):
+    dados = {"Tipo de Proposta": "1- Proposta Simples", "Nome do Cliente": cliente,
+             "N° da Proposta": str(numero), "Consultor": consultor, "Cidade": cidade,
+             "Estado": "MG", "Data": data, "Preço": preco}
+    return dados, f"{numero}PROPOSTA {cliente}.pdf", None
+
+
+@pytest.fixture
+def pasta(tmp_path):
+    pasta = str(tmp_path)
+    registrar_varios([
+        proposta("JOÃO DA SILVA", 1, "10/01/2025", "12.000,00"),
+        proposta("MARIA SOUZA", 2, "15/02/2025", "18.500,00", consultor="ANA"),
+        proposta("JOSÉ PEREIRA", 3, "20/03/2025", "30.000,00", cidade="NOVA SERRANA"),
+    ], pasta)
+    return pasta
+
+
+def clientes(resultado):
+    return [r["cliente"] for r in resultado]
+
+
+@pytest.mark.parametrize("arquivo, esperado", [
+    ("/tmp/123PROPOSTA FULANO.pdf", (123, "FULANO")),
+    ("7proposta FULANO (2).PDF", (7, "FULANO (2)")),
+    ("outro arquivo.pdf", (None, "outro arquivo")),
+])
+def test_numero_e_cliente(arquivo, esperado):
+    assert numero_e_cliente(arquivo) == esperado
+
+
+def test_buscar_mais_recentes_primeiro(pasta):
+    assert clientes(buscar(pasta=pasta)) == ["JOSÉ PEREIRA", "MARIA SOUZA", "JOÃO DA SILVA"]
+    assert buscar(limite=1, pasta=pasta)[0]["numero"] == 3
+
+
+def test_buscar_por_texto_sem_acento_e_prefixo(pasta):
+    assert clientes(buscar("joao", pasta=pasta)) == ["JOÃO DA SILVA"]
+    assert clientes(buscar("nova serr", pasta=pasta)) == ["JOSÉ PEREIRA"]
+    assert buscar("inexistente", pasta=pasta) == []
+
+
+def test_buscar_por_filtros(pasta):
+    assert clientes(buscar(consultor="ana", pasta=pasta)) == ["MARIA SOUZA"]
+    assert clientes(buscar(cliente="sil", pasta=pasta)) == ["JOÃO DA SILVA"]
+    assert clientes(buscar(data_de="01/02/2025", data_ate="28/02/2025", pasta=pasta)) == ["MARIA SOUZA"]
+    assert clientes(buscar(preco_min=15000, preco_max=20000, pasta=pasta)) == ["MARIA SOUZA"]
+
+
+def test_registrar_de_novo_atualiza(pasta):
+    dados, arquivo, _ = proposta("JOÃO DA SILVA", 1, "10/01/2025", "9.000,00")
+    registrar_proposta(dados, arquivo, pasta=pasta)
+    resultado = buscar("joao", pasta=pasta)
+    assert len(resultado) == 1 and resultado[0]["preco"] == 9000.0
@@ -0,0 +1,115 @@
+import csv
+import json
+
+import pytest
+
+import lote
+from dinheiro import dinheiro
+from lote import gerar_lote, gravar_manifesto, ler_entrada, normalizar_linha
+from numeracao import reservar_bloco
+
+
+def test_ler_csv_com_ponto_e_virgula(tmp_path):
+    entrada = tmp_path / "propostas.csv"
+    entrada.write_text("Nome do Cliente;Preço;Número\nfulano;1.500,00;12\nbeltrano;;\n", encoding="utf-8-sig")
+    linhas = list(ler_entrada(str(entrada)))
+    assert linhas == [{"Nome do Cliente": "fulano", "Preço": "1.500,00", "Número": "12"},
+                      {"Nome do Cliente": "beltrano", "Preço": "", "Número": ""}]
+
+
+def test_ler_jsonl_ignora_linhas_vazias(tmp_path):
+    entrada = tmp_path / "propostas.jsonl"
+    entrada.write_text('{"Nome do Cliente": "fulano"}\n\n{"Nome do Cliente": "beltrano"}\n', encoding="utf-8")
+    assert [l["Nome do Cliente"] for l in ler_entrada(str(entrada))] == ["fulano", "beltrano"]
+
+
+def test_formato_nao_suportado():
+    with pytest.raises(ValueError):
+        ler_entrada("propostas.pdf")
+
+
+def test_normalizar_linha():
+    tipo, dados, numero_end = normalizar_linha(
+        {"Tipo de Proposta": "2", "Nome do Cliente": " fulano ", "Preço": "1.500,00", "Número": "12a"}, iter([7]))
+    assert tipo == "2- Proposta Dupla"
+    assert dados["Nome do Cliente"] == "FULANO"
+    assert dados["N° da Proposta"] == "7"
+    assert dados["Preço"] == "1500.00"
+    assert dados["Preço 2"] == "0.00"
+    assert dados["Data"]
+    assert numero_end == "12A"
+
+
+def test_normalizar_linha_mantem_o_numero_informado():
+    _, dados, numero_end = normalizar_linha({"Nome do Cliente": "FULANO", "N° da Proposta": 40.0}, iter(()))
+    assert dados["N° da Proposta"] == "40"
+    assert numero_end is None
+
+
+@pytest.mark.parametrize("linha, erro", [
+    ({"Preço": "10"}, "Nome do Cliente"),
+    ({"Nome do Cliente": "FULANO", "Tipo de Proposta": "9"}, "Tipo de Proposta"),
+    ({"Nome do Cliente": "FULANO", "Preço": "12,345"}, "Preço inválido"),
+])
+def test_normalizar_linha_invalida(linha, erro):
+    with pytest.raises(ValueError, match=erro):
+        normalizar_linha(linha, iter([1]))
+
+
+def test_normalizar_linha_soma_o_total_em_branco():
+    _, dados, _ = normalizar_linha({"Tipo de Proposta": "3", "Nome do Cliente": "FULANO",
+                                    "Preço dos Equipamentos": "10.000", "Preço da Mão de Obra": "2.500,25"}, iter([1]))
+    assert dados["Preço Total"] == "12500.25"
+
+
+def test_gravar_manifesto(tmp_path):
+    resultados = [{"linha": 1, "status": "ok", "arquivo": "1PROPOSTA A.pdf", "valor": "1500.00", "erro": "",
+                   "segundos": "0.100"},
+                  {"linha": 2, "status": "erro", "arquivo": "", "valor": "", "erro": "Nome do Cliente não informado",
+                   "segundos": ""}]
+    caminho = tmp_path / "manifesto.csv"
+    gravar_manifesto(resultados, str(caminho))
+    with open(caminho, encoding="utf-8-sig", newline="") as f:
+        lidos = list(csv.DictReader(f, delimiter=";"))
+    assert [dict(l) for l in lidos] == [{k: str(v) for k, v in r.items()} for r in resultados]
+
+
+def test_gerar_lote(tmp_path):
+    saida = tmp_path / "pdfs"
+    linhas = [
+        {"Nome do Cliente": "FULANO", "Cidade": "DIVINÓPOLIS", "Estado": "MG", "Preço": "15.000"},
+        {"Preço": "10"},
+        {"Tipo de Proposta": "3", "Nome do Cliente": "BELTRANO", "Preço Total": "20.000,50"},
+    ]
+    resultados = gerar_lote(linhas, saida=str(saida), processos=1)
+    assert [r["status"] for r in resultados] == ["ok", "erro", "ok"]
+    assert "Nome do Cliente" in resultados[1]["erro"]
+    assert [r["valor"] for r in resultados] == [dinheiro("15000"), "", dinheiro("20000.50")]
+    pdfs = sorted(p.name for p in saida.glob("*.pdf"))
+    assert pdfs == ["1PROPOSTA FULANO.pdf", "2PROPOSTA BELTRANO.pdf"]
+    assert all((saida / p).read_bytes().startswith(b"%PDF") for p in pdfs)
+
+
+def test_gerar_lote_nao_sobrescreve_nomes_repetidos(tmp_path):
+    saida = tmp_path / "pdfs"
+    linhas = [{"Nome do Cliente": "A/B", "N° da Proposta": "5"}] * 2
+    resultados = gerar_lote(linhas, saida=str(saida), processos=1)
+    assert [r["status"] for r in resultados] == ["ok", "ok"]
+    assert sorted(p.name for p in saida.glob("*.pdf")) == ["5PROPOSTA A B (2).pdf", "5PROPOSTA A B.pdf"]
+
+
+def test_bloco_vem_depois_do_maior_numero_informado(tmp_path):
+    # Sequência em 3 e uma linha com 5: as linhas sem número ficam com 6 e 7
+    saida = tmp_path / "pdfs"
+    reservar_bloco(3, str(saida))
+    linhas = [{"Nome do Cliente": "A"}, {"Nome do Cliente": "B", "N° da Proposta": "5"}, {"Nome do Cliente": "C"}]
+    gerar_lote(linhas, saida=str(saida), processos=1)
+    assert sorted(p.name for p in saida.glob("*.pdf")) == ["5PROPOSTA B.pdf", "6PROPOSTA A.pdf", "7PROPOSTA C.pdf"]
+
+
+@pytest.mark.parametrize("estimar", [False, True])
+def test_producao_so_e_estimada_se_pedido(tmp_path, monkeypatch, estimar):
+    estimadas = []
+    monkeypatch.setattr(lote, "completar_colunas", lambda tabela: estimadas.append(len(tabela)))
+    gerar_lote([{"Nome do Cliente": "A"}], saida=str(tmp_path / "pdfs"), processos=1, estimar_producao=estimar)
+    assert estimadas == ([1] if estimar else [])
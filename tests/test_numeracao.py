@@ -0,0 +1,52 @@
+import pytest
+
+from numeracao import (alocar, consultar_proximo, maior_numero_na_pasta, numero_do_arquivo,
+                       reconstruir, registrar_uso, reservar_bloco)
+
+
+@pytest.mark.parametrize("nome, numero", [
+    ("123PROPOSTA FULANO.pdf", 123),
+    ("7PROPOSTA FULANO (2).pdf", 7),
+    ("PROPOSTA FULANO.pdf", None),
+    ("123PROPOSTA FULANO.xlsx", None),
+    ("ABCPROPOSTA FULANO.pdf", None),
+])
+def test_numero_do_arquivo(nome, numero):
+    assert numero_do_arquivo(nome) == numero
+
+
+def test_primeira_reserva_continua_depois_dos_pdfs_da_pasta(tmp_path):
+    for nome in ("3PROPOSTA A.pdf", "41PROPOSTA B.pdf", "anotacoes.txt"):
+        (tmp_path / nome).write_bytes(b"%PDF")
+    assert maior_numero_na_pasta(tmp_path) == 41
+    assert consultar_proximo(tmp_path) == 42
+    assert list(reservar_bloco(3, tmp_path)) == [42, 43, 44]
+    assert alocar(tmp_path) == 45
+
+
+def test_reserva_de_bloco_nao_repete_numeros(tmp_path):
+    primeiro = reservar_bloco(5, tmp_path)
+    segundo = reservar_bloco(2, tmp_path)
+    assert list(primeiro) == [1, 2, 3, 4, 5]
+    assert list(segundo) == [6, 7]
+
+
+def test_numero_digitado_registrado_antes_do_bloco(tmp_path):
+    # Lote com uma linha "100" e outras em branco: o bloco vem depois do 100
+    reservar_bloco(10, tmp_path)
+    assert registrar_uso(100, tmp_path) == 100
+    assert list(reservar_bloco(2, tmp_path)) == [101, 102]
+
+
+def test_registrar_uso_nunca_volta_a_sequencia(tmp_path):
+    reservar_bloco(50, tmp_path)
+    assert registrar_uso("20", tmp_path) == 50
+    assert alocar(tmp_path) == 51
+
+
+def test_reconstruir_pela_pasta_sem_voltar(tmp_path):
+    reservar_bloco(5, tmp_path)
+    (tmp_path / "90PROPOSTA C.pdf").write_bytes(b"%PDF")
+    assert reconstruir(tmp_path) == 90
+    (tmp_path / "90PROPOSTA C.pdf").unlink()
+    assert reconstruir(tmp_path) == 90
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+import pytest
+
+import plano
+from plano import compilar
+
+
+@pytest.fixture
+def mesclas(monkeypatch):
+    # Ficha falsa: só as mesclas (col1, lin1, col2, lin2) importam para o plano
+    def usar(*faixas):
+        monkeypatch.setattr(plano, "ficha", lambda template: SimpleNamespace(mesclagens=list(faixas), hash="x"))
+    return usar
+
+
+def enderecos(blocos):
+    return [b.endereco for b in blocos]
+
+
+def test_celulas_vizinhas_viram_um_bloco(mesclas):
+    mesclas()
+    blocos = compilar("t.xlsx", {"D8", "E8", "D9", "E9", "H20"})
+    assert enderecos(blocos) == ["D8:E9", "H20"]
+    assert blocos[0].grade == [["D8", "E8"], ["D9", "E9"]]
+
+
+def test_bloco_inclui_a_mescla_inteira(mesclas):
+    # D8 mesclada até F8: E8 e F8 entram no bloco vazias
+    mesclas((4, 8, 6, 8))
+    blocos = compilar("t.xlsx", {"D8", "G8"})
+    assert enderecos(blocos) == ["D8:G8"]
+    assert blocos[0].valores({"D8": "A", "G8": "B"}) == [["A", None, None, "B"]]
+
+
+def test_celula_fora_do_mapeamento_separa_os_blocos(mesclas):
+    mesclas()
+    assert enderecos(compilar("t.xlsx", {"A1", "C1"})) == ["A1", "C1"]
+
+
+def test_toda_celula_mapeada_aparece_uma_vez(mesclas):
+    mesclas((2, 2, 3, 3))
+    celulas = {"A1", "B1", "C1", "A2", "B2", "A3", "D5", "D6"}
+    blocos = compilar("t.xlsx", celulas)
+    vistas = [cell for b in blocos for linha in b.grade for cell in linha if cell]
+    assert sorted(vistas) == sorted(celulas)
+
+
+def test_plano_fica_em_cache(mesclas):
+    mesclas()
+    assert plano.plano("t.xlsx", {"a1"}) is plano.plano("t.xlsx", {"A1"})
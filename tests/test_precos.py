@@ -0,0 +1,42 @@
+from decimal import Decimal
+
+import pytest
+
+from preencher import PrecoInvalido, ler_preco, normalize_price
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    ("1.234,56", "1234.56"),
+    ("R$ 1.234,56", "1234.56"),
+    ("R$\xa01.234,56", "1234.56"),
+    ("1234,56", "1234.56"),
+    ("1234.56", "1234.56"),
+    ("1,234.56", "1234.56"),
+    ("1.234", "1234"),           # ponto de milhar, não decimal
+    ("1.234.567", "1234567"),
+    ("12.5", "12.5"),
+    ("12,5", "12.5"),
+    ("1234", "1234"),
+    ("", "0"),
+    (None, "0"),
+    (1234.5, "1234.50"),
+    (10, "10.00"),
+    (Decimal("0.005"), "0.01"),
+])
+def test_ler_preco(valor, esperado):
+    assert ler_preco(valor) == Decimal(esperado)
+
+
+@pytest.mark.parametrize("valor", ["12,345", "1.2.3", "12,3456", "abc", "R$ 12x", "1.23,45", "--1"])
+def test_ler_preco_invalido(valor):
+    with pytest.raises(PrecoInvalido):
+        ler_preco(valor)
+
+
+def test_preco_invalido_e_value_error():
+    assert issubclass(PrecoInvalido, ValueError)
+
+
+def test_normalize_price():
+    assert normalize_price("R$ 1.234,5") == "1234.50"
+    assert normalize_price("") == "0.00"
@@ -0,0 +1,75 @@
+import math
+
+import pytest
+
+from producao import Estimador, completar_colunas, completar_producao, normalizar
+from registro import Colunas, registro
+
+TABELA = {
+    "fatores_estrutura": {"SOLO": 0.8, "TELHADO CERÂMICO": 0.75},
+    "fator_padrao": 0.7,
+    "estados": {"MG": [5.0] * 12},
+    "municipios": {"SÃO JOÃO DEL REI/MG": [6.0] * 12},
+}
+
+
+@pytest.fixture
+def estimador():
+    return Estimador(TABELA)
+
+
+def kwh(horas, kwp, fator):
+    # kWh/mês médio: horas de sol × dias do ano / 12 meses
+    return round(kwp * horas * 365.25 / 12 * fator)
+
+
+def test_normalizar():
+    assert normalizar("  São  Gonçalo do Pará ") == "SAO GONCALO DO PARA"
+
+
+def test_estimar_pelo_municipio_e_pelo_estado(estimador):
+    assert estimador.estimar(10, 500, "Sao Joao del Rei", "mg", "Solo") == kwh(6.0, 5, 0.8)
+    # município sem linha: média do estado
+    assert estimador.estimar("10", "500", "Divinópolis", "MG", "Telhado Cerâmico") == kwh(5.0, 5, 0.75)
+    # estrutura desconhecida: fator padrão
+    assert estimador.estimar(10, 500, "", "MG", "LAJE") == kwh(5.0, 5, 0.7)
+
+
+@pytest.mark.parametrize("paineis, potencia, estado", [
+    ("", 500, "MG"), (10, "abc", "MG"), (0, 500, "MG"), (10, 500, "SP"),
+])
+def test_estimar_sem_dados(estimador, paineis, potencia, estado):
+    assert estimador.estimar(paineis, potencia, "", estado, "SOLO") is None
+
+
+def test_estimar_lote_igual_ao_de_um_em_um(estimador):
+    linhas = [(10, 500, "SAO JOAO DEL REI", "MG", "SOLO"), (8, "550", "X", "MG", "LAJE"),
+              (10, 500, "", "SP", "SOLO"), ("", 500, "", "MG", "SOLO")]
+    resultado = estimador.estimar_lote(*zip(*linhas))
+    for linha, valor in zip(linhas, resultado):
+        esperado = estimador.estimar(*linha)
+        assert math.isnan(valor) if esperado is None else valor == esperado
+
+
+def test_completar_producao_so_preenche_o_vazio():
+    linhas = [
+        {"Produção Média Mensal": "", "Quantidade de Painéis": "10", "Potência dos Painéis (W)": "580",
+         "Cidade": "NOVA SERRANA", "Estado": "MG", "Estrutura Para": "TELHADO CERÂMICO"},
+        {"Produção Média Mensal": "APROX. 500", "Quantidade de Painéis": "10",
+         "Potência dos Painéis (W)": "580", "Cidade": "", "Estado": "MG", "Estrutura Para": ""},
+        {"Produção Média Mensal": "", "Quantidade de Painéis": "", "Potência dos Painéis (W)": "",
+         "Cidade": "", "Estado": "MG", "Estrutura Para": ""},
+    ]
+    completar_producao(linhas)
+    assert linhas[0]["Produção Média Mensal"].isdigit()
+    assert linhas[1]["Produção Média Mensal"] == "APROX. 500"
+    assert linhas[2]["Produção Média Mensal"] == ""
+
+
+def test_completar_colunas_igual_aos_dicts():
+    dados = {"Nome do Cliente": "FULANO", "Quantidade de Painéis": "10", "Potência dos Painéis (W)": "580",
+             "Cidade": "NOVA SERRANA", "Estado": "MG", "Estrutura Para": "TELHADO CERÂMICO"}
+    tabela = Colunas([registro("1", dados), registro("1", {**dados, "Produção Média Mensal": "500"})])
+    completar_colunas(tabela)
+    esperado = completar_producao([{**dados, "Produção Média Mensal": ""}])[0]["Produção Média Mensal"]
+    assert [str(p.producao) for p in tabela] == [esperado, "500"]
@@ -0,0 +1,101 @@
+import pickle
+
+import pytest
+
+from dinheiro import dinheiro
+from preencher import PrecoInvalido
+from registro import Colunas, PropostaComMaoDeObra, PropostaDupla, atributo, registro, tipo_proposta
+
+SIMPLES = {
+    "Nome do Cliente": " fulano de tal ", "N° da Proposta": "12", "Data": "01/02/2025",
+    "Cidade": "Divinópolis", "Estado": "mg", "Quantidade de Painéis": 10,
+    "Potência dos Painéis (W)": 580.0, "Produção Média Mensal": "1.200", "Preço": "R$ 15.000,50",
+    "Número": "123a",
+}
+DUPLA = {
+    "Tipo de Proposta": "2", "Nome do Cliente": "BELTRANO", "Data": "01/02/2025",
+    "Preço": "1.000", "Preço 2": "2000,5", "Produção Média Mensal 2": "cerca de 900",
+}
+MAO_DE_OBRA = {
+    "Nome do Cliente": "CICLANO", "N° da Proposta": "13", "Data": "01/02/2025",
+    "Preço dos Equipamentos": "10.000", "Preço da Mão de Obra": "2.500,25",
+}
+
+
+@pytest.mark.parametrize("rotulo, nome", [
+    ("Nome do Cliente", "cliente"),
+    ("Preço 2", "preco_2"),
+    ("Potência dos Painéis (W) 2", "potencia_paineis_2"),
+    ("Tipo de Telhado", "tipo_de_telhado"),
+])
+def test_atributo(rotulo, nome):
+    assert atributo(rotulo) == nome
+
+
+def test_tipo_proposta():
+    assert tipo_proposta("2") == "2- Proposta Dupla"
+    assert tipo_proposta("") == "1- Proposta Simples"
+    assert tipo_proposta(3.0) == "3- Proposta com Mão de Obra"
+    with pytest.raises(ValueError):
+        tipo_proposta("9")
+
+
+def test_registro_converte_os_campos():
+    proposta = registro("1", SIMPLES)
+    assert proposta.cliente == "FULANO DE TAL"
+    assert proposta.estado == "MG"
+    assert proposta.paineis == "10"
+    assert proposta.potencia_paineis == "580"
+    assert proposta.producao == "1200"
+    assert proposta.preco == dinheiro("15000.50")
+    assert proposta.numero_end == "123A"
+    assert proposta.dados()["Preço"] == "15000.50"
+
+
+def test_producao_aceita_texto_livre():
+    assert registro("2", DUPLA).producao_2 == "CERCA DE 900"
+
+
+def test_total_em_branco_e_a_soma_das_parcelas():
+    proposta = registro("3", MAO_DE_OBRA)
+    assert isinstance(proposta, PropostaComMaoDeObra)
+    assert proposta.preco_total == dinheiro("12500.25")
+    assert proposta.valor == dinheiro("12500.25")
+
+
+def test_erros_de_validacao():
+    with pytest.raises(ValueError, match="Nome do Cliente"):
+        registro("1", {"Preço": "10"})
+    with pytest.raises(PrecoInvalido, match="Preço 2"):
+        registro("2", {**DUPLA, "Preço 2": "dez reais"})
+
+
+def test_registro_sobrevive_ao_pickle():
+    proposta = registro("2", DUPLA)
+    assert isinstance(proposta, PropostaDupla)
+    assert pickle.loads(pickle.dumps(proposta)) == proposta
+
+
+def test_colunas_ida_e_volta():
+    propostas = [registro("1", SIMPLES), registro("2", DUPLA), registro("3", MAO_DE_OBRA)]
+    tabela = Colunas(propostas)
+    assert len(tabela) == 3
+    assert list(tabela) == propostas
+    assert [tabela.tipo(i) for i in range(3)] == [p.TIPO for p in propostas]
+    assert tabela[1].dados() == propostas[1].dados()
+    assert tabela[0].numero_end == "123A" and tabela[1].numero_end is None
+
+
+def test_colunas_total_em_centavos():
+    tabela = Colunas([registro("1", SIMPLES), registro("2", DUPLA), registro("3", MAO_DE_OBRA)])
+    assert tabela.total() == dinheiro("15000.50") + dinheiro("3000.50") + dinheiro("12500.25")
+
+
+def test_colunas_pendentes_e_definir():
+    tabela = Colunas([registro("1", SIMPLES), registro("2", DUPLA), registro("3", MAO_DE_OBRA)])
+    assert tabela.pendentes("N° da Proposta") == [1]
+    assert tabela.pendentes("Produção Média Mensal 2") == []
+    assert tabela.pendentes("Preço 2") == []
+    tabela.definir("N° da Proposta", [1], ["14"])
+    assert tabela.coluna("N° da Proposta") == ["12", "14", "13"]
+    assert tabela.coluna("Preço 2") == [None, dinheiro("2000.50"), None]
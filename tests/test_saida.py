@@ -0,0 +1,67 @@
+import os
+import stat
+
+import pytest
+
+from saida import MAX_NOME, UMASK, caminho_proposta, gravacao_atomica, liberar, nome_proposta, reservar
+
+
+@pytest.mark.parametrize("cliente, nome", [
+    ("FULANO DE TAL", "12PROPOSTA FULANO DE TAL.pdf"),
+    ('A/B\\C:D*E?F"G<H>I|J', "12PROPOSTA A B C D E F G H I J.pdf"),
+    ("  FULANO \t\n SILVA  ", "12PROPOSTA FULANO SILVA.pdf"),
+    ("FULANO LTDA.", "12PROPOSTA FULANO LTDA.pdf"),
+    ("../../etc", "12PROPOSTA etc.pdf"),
+    ("", "12PROPOSTA SEM NOME.pdf"),
+    (None, "12PROPOSTA SEM NOME.pdf"),
+    ("///", "12PROPOSTA SEM NOME.pdf"),
+])
+def test_nome_proposta(cliente, nome):
+    assert nome_proposta(12, cliente) == nome
+
+
+def test_nome_proposta_longo_e_cortado():
+    nome = nome_proposta(12345, "X" * 500)
+    assert len(nome) == MAX_NOME
+    assert nome.startswith("12345PROPOSTA X") and nome.endswith("X.pdf")
+
+
+def test_reservar_nao_repete_nome(tmp_path):
+    (tmp_path / "1PROPOSTA A.pdf").write_bytes(b"%PDF")
+    primeiro = reservar(str(tmp_path), "1PROPOSTA A.pdf")
+    segundo = reservar(str(tmp_path), "1PROPOSTA A.pdf")
+    assert os.path.basename(primeiro) == "1PROPOSTA A (2).pdf"
+    assert os.path.basename(segundo) == "1PROPOSTA A (3).pdf"
+    liberar(primeiro)
+    assert reservar(str(tmp_path), "1PROPOSTA A.pdf") == primeiro
+    liberar(primeiro)
+    liberar(segundo)
+
+
+def test_caminho_proposta(tmp_path):
+    caminho = caminho_proposta(str(tmp_path), 7, "JOÃO/SILVA")
+    assert caminho == os.path.join(str(tmp_path), "7PROPOSTA JOÃO SILVA.pdf")
+    liberar(caminho)
+
+
+def test_gravacao_atomica(tmp_path):
+    destino = tmp_path / "pdfs" / "1PROPOSTA A.pdf"
+    with gravacao_atomica(str(destino)) as temporario:
+        with open(temporario, "wb") as f:
+            f.write(b"%PDF-1.4")
+    assert destino.read_bytes() == b"%PDF-1.4"
+    assert stat.S_IMODE(destino.stat().st_mode) == 0o666 & ~UMASK
+    assert os.listdir(destino.parent) == ["1PROPOSTA A.pdf"]
+
+
+def test_gravacao_atomica_com_erro_nao_deixa_arquivo(tmp_path):
+    destino = tmp_path / "pdfs" / "1PROPOSTA A.pdf"
+    with pytest.raises(RuntimeError):
+        with gravacao_atomica(str(destino)) as temporario:
+            with open(temporario, "wb") as f:
+                f.write(b"%PDF")
+            raise RuntimeError("falhou")
+    with pytest.raises(OSError):
+        with gravacao_atomica(str(destino)):
+            pass   # PDF vazio
+    assert os.listdir(destino.parent) == []